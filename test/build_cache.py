@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+
+"""Content-hash cache of compiled testbenches.
+
+A build is keyed by a SHA-256 over the compiler version, the contents of
+every source file, every file in the include directories, the defines,
+parameters and remaining command-line flags.  Paths do not enter the key,
+so the same sources compiled from another checkout or build directory hit
+the same entry.  Entries live under ``LIF_CACHE_DIR/build`` and are copied
+into place on a hit, which skips re-parsing the sg13g2 cell library on
+every gate-level iteration.
+
+Run as a script, this is a drop-in ``iverilog`` that consults the cache
+first; the Makefile uses it as the compile command (``BUILD_CACHE=no``
+turns that off)::
+
+    build_cache.py -o sim_build/rtl/sim.vvp -s tb -g2012 ... sources.v
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from sources import CACHE_DIR
+
+BUILD_CACHE_DIR = CACHE_DIR / "build"
+
+# iverilog flags followed by a value, either joined (-Ifoo) or separate (-I foo)
+_VALUE_FLAGS = set("DIPWTYcdfgilmopsy")
+_FILE_FLAGS = set("cfl")     # the value is a file whose contents matter
+_DIR_FLAGS = set("Iy")       # the value is a directory searched for sources
+
+
+def iverilog_path():
+    """The real iverilog, honouring ``ICARUS_BIN_DIR`` like cocotb does."""
+    bin_dir = os.environ.get("ICARUS_BIN_DIR")
+    path = str(Path(bin_dir) / "iverilog") if bin_dir else shutil.which("iverilog")
+    if not path or not os.access(path, os.X_OK):
+        raise FileNotFoundError("iverilog not found")
+    return path
+
+
+def tool_version(tool):
+    """First line of ``<tool> -V``; changes to the compiler invalidate the cache."""
+    result = subprocess.run([tool, "-V"], capture_output=True, text=True)
+    lines = (result.stdout or result.stderr).splitlines()
+    return lines[0] if lines else tool
+
+
+def _update_file(digest, path):
+    path = Path(path)
+    digest.update(path.name.encode() + b"\0")
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(b"\0")
+
+
+def _update_dir(digest, path):
+    for child in sorted(Path(path).iterdir()):
+        if child.is_file():
+            _update_file(digest, child)
+
+
+def build_key(sources, includes=(), defines=None, parameters=None, flags=(), tool="iverilog"):
+    """Cache key for compiling *sources* with the given settings."""
+    digest = hashlib.sha256()
+    for text in [tool, *flags,
+                 *(f"-D{name}={value}" for name, value in sorted((defines or {}).items())),
+                 *(f"-P{name}={value}" for name, value in sorted((parameters or {}).items()))]:
+        digest.update(str(text).encode() + b"\0")
+    for include in includes:
+        _update_dir(digest, include)
+    for source in sources:
+        _update_file(digest, source)
+    return digest.hexdigest()
+
+
+def fetch(key, out_path, cache_dir=BUILD_CACHE_DIR):
+    """Copy a cached artefact to *out_path*; returns False on a miss."""
+    entry = Path(cache_dir) / key
+    if not entry.is_file():
+        return False
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    # A fresh mtime keeps make from considering the copy older than its sources.
+    shutil.copyfile(entry, out_path)
+    return True
+
+
+def store(key, path, cache_dir=BUILD_CACHE_DIR):
+    """Add a freshly built artefact to the cache."""
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = cache_dir / f"{key}.{os.getpid()}.tmp"
+    shutil.copyfile(path, tmp)
+    os.replace(tmp, cache_dir / key)
+
+
+def iverilog_key(argv, tool):
+    """Split an iverilog command line into ``(key, output path)``."""
+    flags, files, dirs = [], [], []
+    out_path = "a.out"
+    args = iter(argv)
+    for arg in args:
+        letter = arg[1:2] if arg.startswith("-") else ""
+        if letter in _VALUE_FLAGS:
+            value = arg[2:] or next(args)
+            if letter == "o":
+                out_path = value
+            elif letter in _FILE_FLAGS:
+                flags.append(f"-{letter}")
+                files.append(value)
+            elif letter in _DIR_FLAGS:
+                flags.append(f"-{letter}")
+                dirs.append(value)
+            else:
+                flags.append(f"-{letter}{value}")
+        elif letter:
+            flags.append(arg)
+        else:
+            files.append(arg)
+    return build_key(files, dirs, flags=flags, tool=tool_version(tool)), out_path
+
+
+def cached_iverilog(argv, log=print):
+    """Run ``iverilog *argv*`` unless an identical build is cached."""
+    tool = iverilog_path()
+    key, out_path = iverilog_key(argv, tool)
+    if fetch(key, out_path):
+        log(f"build_cache: reusing {key[:12]} for {out_path}")
+        return 0
+    returncode = subprocess.run([tool, *argv]).returncode
+    if returncode == 0:
+        store(key, out_path)
+    return returncode
+
+
+if __name__ == "__main__":
+    sys.exit(cached_iverilog(sys.argv[1:]))
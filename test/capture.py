@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Bulk capture of the design outputs instead of per-cycle reads.
+
+While ``capture_en`` is high, tb.v appends ``{uio_out, uo_out}`` to
+``CAPTURE_FILE`` (``capture.hex`` by default) on every falling edge, as four
+hex digits and a newline.  Row *i* therefore holds the outputs produced by
+the *i*-th rising edge after capture started.  :func:`decode_capture` turns
+the file into NumPy arrays in one pass; digits printed as ``x``/``z`` (or
+``X``/``Z`` when only some bits are unknown) mark all four bits of that
+nibble as unknown in the ``*_xz`` masks.
+"""
+
+import os
+from typing import NamedTuple
+
+import cocotb
+import numpy as np
+from cocotb.triggers import Timer
+
+LINE_BYTES = 5
+UNKNOWN = 0x10
+
+_DIGITS = np.full(256, 0xFF, np.uint8)
+for _value, _char in enumerate(b"0123456789abcdef"):
+    _DIGITS[_char] = _value
+    _DIGITS[ord(chr(_char).upper())] = _value
+for _char in b"xXzZ":
+    _DIGITS[_char] = UNKNOWN
+
+
+class Capture(NamedTuple):
+    """Decoded outputs, one row per cycle; ``*_xz`` bits are set where unknown."""
+
+    uo_out: np.ndarray
+    uio_out: np.ndarray
+    uo_xz: np.ndarray
+    uio_xz: np.ndarray
+
+    @property
+    def known(self):
+        """True for cycles without any unknown output bit."""
+        return (self.uo_xz == 0) & (self.uio_xz == 0)
+
+
+def decode_capture(data):
+    """Decode complete lines of capture file contents (bytes-like)."""
+    raw = np.frombuffer(data, np.uint8)
+    rows = raw[:len(raw) // LINE_BYTES * LINE_BYTES].reshape(-1, LINE_BYTES)
+    digits = _DIGITS[rows[:, :4]]
+    if (digits == 0xFF).any() or (rows[:, 4] != ord("\n")).any():
+        raise ValueError("malformed capture data")
+    unknown = digits == UNKNOWN
+    nibbles = np.where(unknown, 0, digits).astype(np.uint8)
+    masks = np.where(unknown, 0xF, 0).astype(np.uint8)
+    return Capture(
+        uo_out=(nibbles[:, 2] << 4) | nibbles[:, 3],
+        uio_out=(nibbles[:, 0] << 4) | nibbles[:, 1],
+        uo_xz=(masks[:, 2] << 4) | masks[:, 3],
+        uio_xz=(masks[:, 0] << 4) | masks[:, 1],
+    )
+
+
+def load_capture(path):
+    """Decode a whole capture file."""
+    with open(path, "rb") as f:
+        return decode_capture(f.read())
+
+
+class CaptureReader:
+    """Incrementally decode a capture file that is still being written."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+
+    def read_new(self):
+        """Decode the complete rows appended since the previous call."""
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        usable = len(data) // LINE_BYTES * LINE_BYTES
+        self.offset += usable
+        return decode_capture(data[:usable])
+
+
+def capture_path():
+    """The file tb.v writes, relative to the simulator's working directory."""
+    return cocotb.plusargs.get("CAPTURE_FILE", "capture.hex")
+
+
+def fresh_reader(dut):
+    """A :class:`CaptureReader` that skips rows captured before now."""
+    reader = CaptureReader(capture_path())
+    # tb.v truncates the file on the first capture of a run and appends after that.
+    if int(dut.capture_fd.value) != 0:
+        reader.offset = os.path.getsize(reader.path)
+    return reader
+
+
+def start_capture(dut):
+    """Start logging outputs from the next falling edge on."""
+    dut.capture_en.value = 1
+
+
+async def stop_capture(dut):
+    """Stop logging and flush the file so it can be read from Python."""
+    dut.capture_en.value = 0
+    await Timer(1, "ns")
+
+
+async def flush_capture(dut):
+    """Flush the capture file without interrupting the capture."""
+    dut.capture_flush.value = 1
+    await Timer(1, "ns")
+    dut.capture_flush.value = 0
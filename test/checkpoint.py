@@ -0,0 +1,127 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Snapshot and restore the design registers of a running simulation.
+
+Long scenarios (threshold adaptation over millions of cycles) need not be
+simulated from reset every time.  :func:`snapshot` reads every register of
+``alif_dual_unileak_neuron`` and ``alif_dual_unileak_data_loader`` (the
+``DUT_REGISTERS`` of scoreboard.py) into a :class:`Checkpoint`, and
+:func:`restore` deposits them back by writing ``.value``, so a simulation
+can resume or branch from that point.
+
+Checkpoints also convert to and from :class:`system_model.SystemModel`
+state.  :func:`fast_forward` advances the model under held inputs with
+:func:`neuron_orbit.skip_ahead`, so the DUT can be handed the state it
+would reach after 10**6 cycles without simulating them.
+
+Restore after a falling edge (where :func:`scoreboard.run_lockstep`
+returns, or after ``await FallingEdge(dut.clk)``), so the next rising edge
+starts from the restored values.  ``wait_cycles`` returns on a rising edge,
+where the registers are still being updated.
+RTL only: the gate-level netlist has no named registers.
+"""
+
+import json
+from typing import NamedTuple
+
+import numpy as np
+
+from loader_model import IDLE
+from neuron_orbit import skip_ahead
+from scoreboard import DUT_REGISTERS
+from sources import rtl_hash
+from pins import decode_inputs, decode_outputs
+from system_model import SystemModel
+
+
+class Checkpoint(NamedTuple):
+    """Register values keyed ``neuron.<reg>`` / ``loader.<reg>`` at stimulus cycle *cycle*.
+
+    Values are the raw register bits, so the signed ``v_mem`` is stored as
+    its 9-bit two's complement.
+    """
+
+    cycle: int
+    registers: dict
+    rtl_hash: str = ""
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump({"cycle": self.cycle, "rtl_hash": self.rtl_hash, "registers": self.registers}, f, indent=1)
+
+    @classmethod
+    def load(cls, path, check_rtl=True):
+        """Read a checkpoint written by :meth:`save`.
+
+        Raises ValueError if it was taken from different RTL sources, unless
+        *check_rtl* is false.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        if check_rtl and data["rtl_hash"] and data["rtl_hash"] != rtl_hash():
+            raise ValueError(f"{path} was saved from different RTL sources")
+        return cls(data["cycle"], data["registers"], data["rtl_hash"])
+
+
+def _handles(dut):
+    system = dut.user_project.system_inst
+    blocks = {"neuron": system.neuron, "loader": system.loader}
+    return {f"{block}.{name}": getattr(handle, name)
+            for block, handle in blocks.items() for name in DUT_REGISTERS[block]}
+
+
+def snapshot(dut, cycle=0):
+    """Read every neuron and loader register of the DUT into a :class:`Checkpoint`.
+
+    Raises ValueError if a register holds x/z bits.
+    """
+    registers = {}
+    for key, handle in _handles(dut).items():
+        value = handle.value
+        if not value.is_resolvable:
+            raise ValueError(f"{key} is {value.binstr}, cannot checkpoint")
+        registers[key] = int(value)
+    return Checkpoint(cycle, registers, rtl_hash())
+
+
+def restore(dut, checkpoint):
+    """Deposit the registers of *checkpoint* into the DUT."""
+    for key, handle in _handles(dut).items():
+        handle.value = checkpoint.registers[key] & ((1 << len(handle)) - 1)
+
+
+def from_model(model, cycle=0, index=0):
+    """Checkpoint of copy *index* of a :class:`system_model.SystemModel`."""
+    registers = {key: int(value[index]) for key, value in model.state().items()}
+    registers["neuron.v_mem"] &= 0x1FF
+    return Checkpoint(cycle, registers, rtl_hash())
+
+
+def to_model(checkpoint, model=None):
+    """Load *checkpoint* into every copy of *model* (a new single-copy model by default)."""
+    model = model or SystemModel(1)
+    registers = dict(checkpoint.registers)
+    v_mem = registers["neuron.v_mem"]
+    registers["neuron.v_mem"] = v_mem - ((v_mem >> 8) << 9)
+    model.load_state({key: np.full(model.n, value) for key, value in registers.items()})
+    return model
+
+
+def fast_forward(model, cycles, ui_in, uio_in=0, cache=None):
+    """Advance *model* by *cycles* edges with the pins held at *ui_in*/*uio_in*.
+
+    The loader is stepped normally until it settles in IDLE with
+    ``load_mode`` low; after that it cannot change and the neuron is
+    advanced with :func:`neuron_orbit.skip_ahead` (sharing *cache* if
+    given).  Returns the number of spikes each copy emitted.
+    """
+    input_enable, load_mode, _, chan_a, chan_b = decode_inputs(ui_in, uio_in)
+    if load_mode:
+        uo_out, _ = model.run(np.full(cycles, ui_in, np.uint8), np.full(cycles, uio_in, np.uint8))
+        return decode_outputs(uo_out).spike_out.sum(axis=0, dtype=np.int64)
+    spikes = np.zeros(model.n, np.int64)
+    while cycles and ((model.loader.current_state != IDLE) | ~model.loader.params_ready).any():
+        model.step(ui_in, uio_in)
+        spikes += model.neuron.spike_out
+        cycles -= 1
+    return spikes + skip_ahead(model.neuron, cycles, chan_a, chan_b, input_enable, cache)
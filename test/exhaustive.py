@@ -0,0 +1,234 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Check one clock edge of the neuron for every state and input.
+
+The neuron has only 25 bits of state, so a single enabled edge can be
+checked exhaustively.  :func:`state_space` lists the states to cover: by
+default every state reachable after reset and one configuration load
+(found by breadth-first search over the model), or all ``2**25`` register
+values.  :func:`batches` crosses them with every ``chan_a`` x ``chan_b``
+(x ``input_enable``) input.
+
+:func:`check_dut` loads the configuration into all ``N_INST`` copies of
+tb.v, then for each batch deposits one state per copy through the
+``state_in_all`` bus, clocks once and reads every copy back through
+``state_out_all``, comparing against :func:`neuron_model.next_state`.  A
+batch costs a handful of GPI calls however many copies there are.
+:func:`check_generated` runs the same comparison against the model that
+:mod:`rtl_codegen` derives from the RTL, without a simulator, which makes
+the full register space practical.
+"""
+
+import argparse
+from typing import NamedTuple
+
+import numpy as np
+from cocotb.triggers import FallingEdge
+
+from loader_model import IDLE, encode_frames
+from multi import instance_count, run_instances, to_bus
+from neuron_model import DEFAULT_PARAMS, STATE_BITS, NeuronParams, next_state, pack_state, unpack_state
+from pins import encode_inputs
+
+# Bits per copy on the state_out_all bus: spike_out above the packed state
+WORD_BITS = STATE_BITS + 1
+
+STATE_MASK = (1 << STATE_BITS) - 1
+
+# Every (chan_a, chan_b) pair, chan_a in the high bits
+CHANNELS = np.arange(64)
+
+
+class Cases(NamedTuple):
+    """One edge to check per row: packed start state and inputs."""
+
+    state: np.ndarray
+    chan_a: np.ndarray
+    chan_b: np.ndarray
+    input_enable: np.ndarray
+
+
+def expected(cases, params):
+    """``spike_out << 25 | packed state`` after the edge, per case."""
+    v_mem, threshold, refr_cnt, leak_counter = unpack_state(cases.state)
+    *state, spike = next_state(v_mem, threshold, refr_cnt, leak_counter, cases.chan_a, cases.chan_b,
+                               params, cases.input_enable)
+    return pack_state(*state) | (spike.astype(np.int64) << STATE_BITS)
+
+
+def batches(states, input_enable=(0, 1), size=1 << 20):
+    """Yield :class:`Cases` of at most *size* rows covering *states* x all inputs."""
+    states = np.asarray(states, np.int64)
+    input_enable = np.asarray(input_enable, np.int64)
+    inputs = len(CHANNELS) * len(input_enable)
+    channels = np.tile(CHANNELS, len(input_enable))
+    enables = np.repeat(input_enable, len(CHANNELS))
+    per_batch = max(1, size // inputs)
+    for start in range(0, len(states), per_batch):
+        chunk = states[start:start + per_batch]
+        index = np.arange(len(chunk) * inputs)
+        case = index % inputs
+        yield Cases(chunk[index // inputs], channels[case] >> 3, channels[case] & 7, enables[case])
+
+
+def state_space(params, reachable=True):
+    """Sorted packed states to check under *params*.
+
+    With *reachable*, the states reachable from reset followed by loading
+    *params*: the neuron resets with the threshold_min the loader held
+    before the load (the power-on default or *params* itself) and is frozen
+    while ``params_ready`` is low, so the search starts from both.
+    Otherwise every ``2**25`` register value, most of which the design can
+    never enter.
+    """
+    if not reachable:
+        return np.arange(1 << STATE_BITS, dtype=np.int64)
+    seen = np.zeros(1 << STATE_BITS, bool)
+    frontier = np.unique([pack_state(0, DEFAULT_PARAMS.threshold_min, 0, 0),
+                          pack_state(0, params.threshold_min & 0xFF, 0, 0)]).astype(np.int64)
+    while len(frontier):
+        seen[frontier] = True
+        following = np.unique(np.concatenate(
+            [expected(cases, params) & STATE_MASK for cases in batches(frontier)]))
+        frontier = following[~seen[following]]
+    return np.flatnonzero(seen)
+
+
+def show(word, spike=True):
+    """Register fields of a ``spike_out << 25 | packed state`` word."""
+    fields = ("v_mem", "threshold", "refr_cnt", "leak_counter")
+    text = " ".join(f"{name}={int(v)}" for name, v in zip(fields, unpack_state(word & STATE_MASK)))
+    return f"{text} spike_out={word >> STATE_BITS}" if spike else text
+
+
+def describe(cases, index, params, actual=None):
+    """One line per side of a case: state, inputs, expected and actual registers."""
+    one = Cases(*(np.asarray(column[index:index + 1]) for column in cases))
+    lines = [f"  state    {show(int(one.state[0]), spike=False)}",
+             f"  inputs   chan_a={int(one.chan_a[0])} chan_b={int(one.chan_b[0])} "
+             f"input_enable={int(one.input_enable[0])} params={tuple(int(p) for p in params)}",
+             f"  expected {show(int(expected(one, params)[0]))}"]
+    if actual is not None:
+        lines.append(f"  actual   {actual}")
+    return "\n".join(lines)
+
+
+def to_words(values, bits):
+    """Pack *bits* wide words into a bus integer, word 0 in the low bits."""
+    values = np.asarray(values, np.uint64)
+    planes = (values[:, None] >> np.arange(bits, dtype=np.uint64)) & np.uint64(1)
+    return int.from_bytes(np.packbits(planes.astype(np.uint8).ravel(), bitorder="little").tobytes(), "little")
+
+
+def from_words(binstr, n, bits):
+    """Split a bus ``binstr`` into *n* words of *bits* and their x/z masks."""
+    chars = np.frombuffer(binstr.encode(), np.uint8)[::-1].reshape(n, bits)
+    weights = np.uint64(1) << np.arange(bits, dtype=np.uint64)
+    values = ((chars == ord("1")) * weights).sum(axis=1, dtype=np.uint64)
+    unknown = (((chars != ord("0")) & (chars != ord("1"))) * weights).sum(axis=1, dtype=np.uint64)
+    return values.astype(np.int64), unknown
+
+
+def pin_inputs(cases):
+    """``(ui_in, uio_in)`` bytes that present *cases* with load_mode low."""
+    return encode_inputs(cases.input_enable, 0, 0, cases.chan_a, cases.chan_b)
+
+
+async def check_dut(dut, params, states, input_enable=(0, 1), log=None):
+    """Check every case of *states* x inputs in the simulator, ``N_INST`` per clock.
+
+    The DUT must be reset and clocked; *params* are loaded into every copy
+    through the serial loader first.  Raises AssertionError on the first
+    mismatch and returns the number of cases checked.
+    """
+    n = instance_count(dut)
+    await run_instances(dut, encode_frames(NeuronParams(*(np.full(n, p) for p in params))))
+
+    checked = 0
+    phase = 1
+    for cases in batches(states, input_enable):
+        for start in range(0, len(cases.state), n):
+            batch = Cases(*(column[start:start + n] for column in cases))
+            rows = len(batch.state)
+            # Spare copies repeat the first case
+            padded = Cases(*(np.concatenate([column, np.full(n - rows, column[0])]) for column in batch))
+            ui_in, uio_in = pin_inputs(padded)
+            dut.ui_in.value = int(ui_in[0])
+            dut.uio_in.value = int(uio_in[0])
+            if n > 1:
+                dut.ui_in_all.value = to_bus(ui_in)
+                dut.uio_in_all.value = to_bus(uio_in)
+            dut.state_in_all.value = to_words(padded.state, STATE_BITS)
+            dut.state_load.value = phase
+            phase ^= 1
+            await FallingEdge(dut.clk)
+
+            actual, unknown = from_words(dut.state_out_all.value.binstr, n, WORD_BITS)
+            bad = np.flatnonzero((actual[:rows] != expected(batch, params)) | (unknown[:rows] != 0))
+            if len(bad):
+                copy = bad[0]
+                bits = dut.state_out_all.value.binstr[::-1][copy * WORD_BITS:(copy + 1) * WORD_BITS][::-1]
+                actual = show(int(actual[copy])) if not unknown[copy] else f"{bits} (x/z bits)"
+                raise AssertionError(f"neuron mismatch after {checked + copy} cases (copy {copy}):\n"
+                                     + describe(batch, copy, params, actual))
+            checked += rows
+        if log is not None:
+            log(f"{checked} cases match")
+    return checked
+
+
+def check_generated(params, states, input_enable=(0, 1), model=None, log=print):
+    """Compare :func:`expected` with the :mod:`rtl_codegen` model for every case.
+
+    Returns the number of cases checked, or raises AssertionError.
+    """
+    from rtl_codegen import CompiledSystem, load_model
+
+    model = model or load_model()
+    checked = 0
+    for cases in batches(states, input_enable):
+        n = len(cases.state)
+        system = CompiledSystem(n, model)
+        v_mem, threshold, refr_cnt, leak_counter = unpack_state(cases.state)
+        system.state.update({
+            "neuron.v_mem": v_mem & 0x1FF, "neuron.threshold": threshold,
+            "neuron.refr_cnt": refr_cnt, "neuron.leak_counter": leak_counter,
+            "loader.params_ready": np.ones(n, np.int64), "loader.current_state": np.full(n, IDLE, np.int64),
+        })
+        system.state.update((f"loader.{name}", np.full(n, value, np.int64))
+                            for name, value in zip(NeuronParams._fields, params))
+        system.step(clk=0, reset=0, enable=1, input_enable=cases.input_enable, chan_a=cases.chan_a,
+                    chan_b=cases.chan_b, load_mode=0, serial_data=0)
+        state = system.state
+        actual = (pack_state(state["neuron.v_mem"], state["neuron.threshold"], state["neuron.refr_cnt"],
+                             state["neuron.leak_counter"]) | (state["neuron.spike_out"] << STATE_BITS))
+        bad = np.flatnonzero(actual != expected(cases, params))
+        if len(bad):
+            raise AssertionError(f"generated model mismatch after {checked + bad[0]} cases:\n"
+                                 + describe(cases, bad[0], params, show(int(actual[bad[0]]))))
+        checked += n
+    log(f"{checked} cases match")
+    return checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--params", type=int, nargs=5, default=list(DEFAULT_PARAMS),
+                        metavar=("WA", "WB", "LEAK_RATE", "THR_MIN", "LEAK_CYCLES"))
+    parser.add_argument("--all-states", action="store_true", help="every 2**25 register value, not just reachable ones")
+    parser.add_argument("--json", help="Yosys JSON export for rtl_codegen instead of running yosys")
+    args = parser.parse_args()
+
+    from rtl_codegen import load_model
+
+    params = NeuronParams(*args.params)
+    states = state_space(params, reachable=not args.all_states)
+    print(f"{len(states)} states x {2 * len(CHANNELS)} inputs")
+    try:
+        check_generated(params, states, model=load_model(args.json))
+    except AssertionError as error:
+        raise SystemExit(str(error))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Functional coverage of ``alif_dual_unileak_neuron`` and its loader.
+
+Bins are boolean NumPy bitmaps, one per group:
+
+============== ============ ==================================================
+group          shape        hit on an edge where ...
+============== ============ ==================================================
+weighted_sum   (127,)       the neuron integrates ``weighted_sum`` (-63..63)
+product_a      (8, 8)       it integrates ``chan_a x weight_a``; products of
+                            32 and up wrap negative in ``contrib_a``
+product_b      (8, 8)       the same for ``chan_b x weight_b``
+threshold_max  (8,)         a spike sets ``threshold`` to ``threshold_max``,
+                            per ``threshold_min >> 5`` (4..7: it overflowed)
+refractory     (3,)         refractory entry, exit, and re-entry on the
+                            first edge after an exit
+leak           (16, 2)      a leak is applied, per ``leak_cycles`` and
+                            whether ``leak_counter`` had run past it
+loader_abort   (5, 8)       ``load_mode`` drops in LOAD_WA..LOAD_LEAK_CYCLES,
+                            per ``bit_count``
+============== ============ ==================================================
+
+Nothing is sampled per cycle from the simulator.  A stimulus (or a trace
+written by :mod:`trace_file`) is replayed through
+:meth:`system_model.SystemModel.history`, which the scoreboard has already
+shown to match the DUT, and every bin is updated in bulk from the register
+arrays.  The replay holds ``ena`` high, as every cocotb test does, and
+traces do not record it: coverage of a run that lowers ``ena`` is not
+meaningful.  :attr:`GOALS` excludes the bins the RTL cannot reach, so
+:attr:`Coverage.complete` means every reachable bin was hit; runner.py
+merges per-job coverage and stops issuing seeds once it is.
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from loader_model import LOAD_LEAK_CYCLES, LOAD_WA
+from neuron_model import _signed, threshold_max, unpack_state
+from pins import decode_inputs, decode_outputs, encode_outputs
+from system_model import SystemModel
+from trace_file import TraceReader
+
+SHAPES = {
+    "weighted_sum": (127,),
+    "product_a": (8, 8),
+    "product_b": (8, 8),
+    "threshold_max": (8,),
+    "refractory": (3,),
+    "leak": (16, 2),
+    "loader_abort": (5, 8),
+}
+
+ENTRY, EXIT, REENTRY = range(3)
+
+_STATE_NAMES = ("LOAD_WA", "LOAD_WB", "LOAD_LEAK_RATE", "LOAD_THR_MIN", "LOAD_LEAK_CYCLES")
+
+
+def _goals():
+    goals = {name: np.ones(shape, bool) for name, shape in SHAPES.items()}
+    contrib = np.unique(_signed(np.arange(8)[:, None] * np.arange(8), 6))
+    goals["weighted_sum"][:] = False
+    goals["weighted_sum"][(contrib[:, None] - contrib).ravel() + 63] = True
+    # leak_counter is 4 bits, so it cannot run past leak_cycles = 15.
+    goals["leak"][15, 1] = False
+    return goals
+
+
+# Reachable bins
+GOALS = _goals()
+
+
+def label(group, index):
+    """Readable name of bin *index* (a tuple) of *group*."""
+    index = tuple(int(i) for i in np.atleast_1d(index))
+    if group == "weighted_sum":
+        return f"weighted_sum={index[0] - 63}"
+    if group in ("product_a", "product_b"):
+        side = group[-1]
+        return f"chan_{side}={index[0]} x weight_{side}={index[1]}"
+    if group == "threshold_max":
+        return f"threshold_max with threshold_min={index[0] << 5}..{(index[0] << 5) + 31}"
+    if group == "refractory":
+        return f"refractory {('entry', 'exit', 're-entry')[index[0]]}"
+    if group == "leak":
+        return f"leak at leak_cycles={index[0]}" + (" after leak_counter ran past it" if index[1] else "")
+    if group == "loader_abort":
+        return f"abort in {_STATE_NAMES[index[0]]} at bit_count={index[1]}"
+    raise KeyError(group)
+
+
+class Coverage:
+    """Bitmaps of every group in :data:`SHAPES`."""
+
+    def __init__(self, bins=None):
+        self.bins = {name: np.zeros(shape, bool) for name, shape in SHAPES.items()}
+        for name, bitmap in (bins or {}).items():
+            self.bins[name] |= np.asarray(bitmap, bool)
+
+    @classmethod
+    def from_stimulus(cls, ui_in, uio_in=0, model=None):
+        """Coverage of playing *ui_in*/*uio_in* from the state of *model* (reset by default)."""
+        coverage = cls()
+        coverage.sample(ui_in, uio_in, (model or SystemModel(1)).history(ui_in, uio_in))
+        return coverage
+
+    @classmethod
+    def from_trace(cls, path):
+        """Coverage of a :mod:`trace_file` trace recorded from reset.
+
+        Raises ValueError if the recorded outputs differ from the replayed
+        model, as the bins would then describe a different run.
+        """
+        with TraceReader(path) as reader:
+            pins = reader.read()
+        history = SystemModel(1).history(pins.ui_in, pins.uio_in)
+        v_mem = unpack_state(history["neuron.state"][1:])[0]
+        uo_out, uio_out = encode_outputs(history["neuron.spike_out"][1:], np.where(v_mem > 0, v_mem & 0x7F, 0),
+                                         history["loader.params_ready"][1:])
+        params_ready = decode_outputs(pins.uo_out, pins.uio_out).params_ready
+        bad = np.flatnonzero((uo_out != pins.uo_out) | (decode_outputs(uo_out, uio_out).params_ready != params_ready))
+        if len(bad):
+            raise ValueError(f"{path}: recorded outputs differ from the model at cycle {bad[0]}")
+        coverage = cls()
+        coverage.sample(pins.ui_in, pins.uio_in, history)
+        return coverage
+
+    def sample(self, ui_in, uio_in, history):
+        """Hit every bin reached by the edges of *history* (see :meth:`SystemModel.history`), with ``ena`` high."""
+        input_enable, load_mode, _, chan_a, chan_b = decode_inputs(ui_in, uio_in)
+        before = {key: value[:-1] for key, value in history.items()}
+        after = {key: value[1:] for key, value in history.items()}
+        v_mem, threshold, refr_cnt, leak_counter = unpack_state(before["neuron.state"])
+        threshold_next, refr_next = unpack_state(after["neuron.state"])[1:3]
+        weight_a, weight_b = before["loader.weight_a"], before["loader.weight_b"]
+        threshold_min, leak_cycles = before["loader.threshold_min"], before["loader.leak_cycles"]
+        spike = after["neuron.spike_out"]
+        bins = self.bins
+
+        integrate = before["loader.params_ready"].astype(bool) & (refr_cnt == 0) & (input_enable != 0)
+        contrib_a = _signed(chan_a * weight_a, 6)
+        contrib_b = _signed(chan_b * weight_b, 6)
+        bins["weighted_sum"][(contrib_a - contrib_b)[integrate] + 63] = True
+        bins["product_a"][chan_a[integrate], weight_a[integrate]] = True
+        bins["product_b"][chan_b[integrate], weight_b[integrate]] = True
+
+        at_max = spike & (threshold_next == threshold_max(threshold_min))
+        bins["threshold_max"][threshold_min[at_max] >> 5] = True
+
+        entry = (refr_cnt == 0) & (refr_next != 0)
+        exit_ = (refr_cnt == 1) & (refr_next == 0)
+        bins["refractory"][ENTRY] |= entry.any()
+        bins["refractory"][EXIT] |= exit_.any()
+        bins["refractory"][REENTRY] |= (entry[1:] & exit_[:-1]).any()
+
+        leak = integrate & (leak_counter >= leak_cycles)
+        bins["leak"][leak_cycles[leak], (leak_counter > leak_cycles)[leak].astype(int)] = True
+
+        state = before["loader.current_state"]
+        abort = (state >= LOAD_WA) & (state <= LOAD_LEAK_CYCLES) & (load_mode == 0)
+        bins["loader_abort"][state[abort] - LOAD_WA, before["loader.bit_count"][abort]] = True
+        return self
+
+    def merge(self, *others):
+        """OR *others* into this coverage; returns the number of goal bins newly hit."""
+        before = self.hit
+        for other in others:
+            for name, bitmap in other.bins.items():
+                self.bins[name] |= bitmap
+        return self.hit - before
+
+    @property
+    def hit(self):
+        return int(sum((self.bins[name] & GOALS[name]).sum() for name in SHAPES))
+
+    @property
+    def goal(self):
+        return int(sum(GOALS[name].sum() for name in SHAPES))
+
+    @property
+    def complete(self):
+        return self.hit == self.goal
+
+    def missing(self):
+        """Unhit goal bins as ``{group: array of indices}``, one row per bin."""
+        return {name: np.argwhere(GOALS[name] & ~self.bins[name]) for name in SHAPES}
+
+    def report(self, limit=8):
+        """One line per group, naming up to *limit* missing bins."""
+        lines = []
+        for name, indices in self.missing().items():
+            total = int(GOALS[name].sum())
+            text = f"{name:14} {total - len(indices):4}/{total}"
+            if len(indices):
+                names = ", ".join(label(name, index) for index in indices[:limit])
+                text += f"  missing {names}" + (", ..." if len(indices) > limit else "")
+            lines.append(text)
+        lines.append(f"{'total':14} {self.hit:4}/{self.goal}")
+        return "\n".join(lines)
+
+    def save(self, path):
+        np.savez_compressed(path, **self.bins)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls({name: data[name] for name in data.files})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("inputs", nargs="+", help="traces (.trace) or saved coverage (.npz) to merge")
+    parser.add_argument("--out", help="save the merged coverage to this .npz file")
+    args = parser.parse_args()
+
+    coverage = Coverage()
+    for path in args.inputs:
+        coverage.merge(Coverage.load(path) if Path(path).suffix == ".npz" else Coverage.from_trace(path))
+    print(coverage.report())
+    if args.out:
+        coverage.save(args.out)
+
+
+if __name__ == "__main__":
+    main()
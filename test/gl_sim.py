@@ -0,0 +1,513 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Bit-parallel cycle-based simulator for the sg13g2 gate-level netlist.
+
+:class:`GateLevelSim` parses the structural ``gate_level_netlist.v`` written
+by the GDS flow, levelizes the combinational cells between flip-flops and
+evaluates them on ``uint64`` words, so each net carries 64 independent test
+vectors per word and NumPy works across as many words as there are vectors.
+Cells of the same type on the same level are evaluated together with one
+gather and one bitwise expression.
+
+The simulation is two-valued and cycle based: flip-flops start at 0, every
+call to :meth:`GateLevelSim.step` is one rising clock edge, and timing is
+ignored.  That is exactly what is needed to check the netlist against
+:class:`system_model.SystemModel`::
+
+    python gl_sim.py gate_level_netlist.v --vectors 4096 --cycles 2000
+
+Flip-flops may be clocked through the clock tree (``clknet_*`` nets behind
+buffers and inverters): each clock pin is traced back to the top-level
+clock and must see its rising edge.  Directives such as ``timescale`` are
+skipped; ``ifdef``, ``include`` and macros raise :class:`NetlistError`, so
+run a preprocessor (``iverilog -E``) over such a netlist first.
+"""
+
+import argparse
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from sources import GL_NETLIST
+
+ONES = np.uint64(0xFFFF_FFFF_FFFF_FFFF)
+
+
+# Combinational cells by name without the ``sg13g2_`` prefix and drive
+# strength suffix: (output pin, function of the input pin words).
+COMBINATIONAL = {
+    "inv": ("Y", lambda p: ~p["A"]),
+    "buf": ("X", lambda p: p["A"]),
+    "dlygate4sd1": ("X", lambda p: p["A"]),
+    "dlygate4sd2": ("X", lambda p: p["A"]),
+    "dlygate4sd3": ("X", lambda p: p["A"]),
+    "dlygate4sd4": ("X", lambda p: p["A"]),
+    "and2": ("X", lambda p: p["A"] & p["B"]),
+    "and3": ("X", lambda p: p["A"] & p["B"] & p["C"]),
+    "and4": ("X", lambda p: p["A"] & p["B"] & p["C"] & p["D"]),
+    "nand2": ("Y", lambda p: ~(p["A"] & p["B"])),
+    "nand2b": ("Y", lambda p: ~(~p["A_N"] & p["B"])),
+    "nand3": ("Y", lambda p: ~(p["A"] & p["B"] & p["C"])),
+    "nand3b": ("Y", lambda p: ~(~p["A_N"] & p["B"] & p["C"])),
+    "nand4": ("Y", lambda p: ~(p["A"] & p["B"] & p["C"] & p["D"])),
+    "or2": ("X", lambda p: p["A"] | p["B"]),
+    "or3": ("X", lambda p: p["A"] | p["B"] | p["C"]),
+    "or4": ("X", lambda p: p["A"] | p["B"] | p["C"] | p["D"]),
+    "nor2": ("Y", lambda p: ~(p["A"] | p["B"])),
+    "nor2b": ("Y", lambda p: ~(p["A"] | ~p["B_N"])),
+    "nor3": ("Y", lambda p: ~(p["A"] | p["B"] | p["C"])),
+    "nor4": ("Y", lambda p: ~(p["A"] | p["B"] | p["C"] | p["D"])),
+    "xor2": ("X", lambda p: p["A"] ^ p["B"]),
+    "xnor2": ("Y", lambda p: ~(p["A"] ^ p["B"])),
+    "a21o": ("X", lambda p: (p["A1"] & p["A2"]) | p["B1"]),
+    "a21oi": ("Y", lambda p: ~((p["A1"] & p["A2"]) | p["B1"])),
+    "a22oi": ("Y", lambda p: ~((p["A1"] & p["A2"]) | (p["B1"] & p["B2"]))),
+    "a221oi": ("Y", lambda p: ~((p["A1"] & p["A2"]) | (p["B1"] & p["B2"]) | p["C1"])),
+    "o21ai": ("Y", lambda p: ~((p["A1"] | p["A2"]) & p["B1"])),
+    "mux2": ("X", lambda p: (p["A0"] & ~p["S"]) | (p["A1"] & p["S"])),
+    "mux4": ("X", lambda p: (((p["A0"] & ~p["S0"]) | (p["A1"] & p["S0"])) & ~p["S1"])
+                            | (((p["A2"] & ~p["S0"]) | (p["A3"] & p["S0"])) & p["S1"])),
+    "tiehi": ("L_HI", lambda p: ONES),
+    "tielo": ("L_LO", lambda p: np.uint64(0)),
+}
+
+# Flip-flops: next Q from the pin words, before asynchronous set/reset.
+SEQUENTIAL = {
+    "dfrbp": lambda p: p["D"],
+    "dfrbpq": lambda p: p["D"],
+    "sdfbbp": lambda p: (p["D"] & ~p["SCE"]) | (p["SCD"] & p["SCE"]),
+}
+
+# Physical-only cells without logic outputs
+IGNORED = {"fill", "decap", "antennanp", "sighold", "filler"}
+
+# Cells a clock tree is built from: kind -> inverts
+CLOCK_TREE = {"buf": False, "inv": True, "dlygate4sd1": False, "dlygate4sd2": False,
+              "dlygate4sd3": False, "dlygate4sd4": False}
+
+# Compiler directives that leave the netlist unchanged; any other is rejected.
+HARMLESS_DIRECTIVES = {"timescale", "default_nettype", "celldefine", "endcelldefine", "resetall"}
+
+_TOKEN = re.compile(r"\\\S+|[A-Za-z_][\w$]*|\d+'[bBhHdD][0-9a-fA-FxXzZ_]+|\d+|//[^\n]*|/\*.*?\*/|`[^\n]*|\S", re.S)
+
+
+class NetlistError(ValueError):
+    """The netlist uses a construct or cell the simulator does not handle."""
+
+
+def cell_kind(cell_type):
+    """``sg13g2_a21oi_2`` -> ``a21oi``."""
+    return re.sub(r"_\d+$", "", cell_type.removeprefix("sg13g2_"))
+
+
+def _directive(token):
+    """Whether *token* is a compiler directive line; raises for those that change the netlist."""
+    if not token.startswith("`"):
+        return False
+    name = re.match(r"`(\w*)", token)[1]
+    if name not in HARMLESS_DIRECTIVES:
+        raise NetlistError(f"compiler directive `{name} is not supported; preprocess the netlist first")
+    return True
+
+
+class _Parser:
+    """Just enough structural Verilog for flattened netlists."""
+
+    def __init__(self, text):
+        text = re.sub(r"\(\*.*?\*\)", " ", text, flags=re.S)     # (* attributes *)
+        self.tokens = [t for t in _TOKEN.findall(text) if not t.startswith(("//", "/*")) and not _directive(t)]
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def next(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def expect(self, token):
+        if self.next() != token:
+            raise NetlistError(f"expected {token!r} near token {self.pos}")
+
+    def range(self):
+        """``[msb:lsb]`` if present, as a list of bit indices from msb to lsb."""
+        if self.peek() != "[":
+            return None
+        self.next()
+        msb = int(self.next())
+        self.expect(":")
+        lsb = int(self.next())
+        self.expect("]")
+        return list(range(msb, lsb - 1, -1) if msb >= lsb else range(msb, lsb + 1))
+
+    def modules(self):
+        while self.peek() is not None:
+            if self.next() == "module":
+                yield self.module()
+
+    def module(self):
+        name = self.next()
+        module = {"name": name, "ports": {}, "buses": {}, "cells": [], "assigns": []}
+        while self.next() != ";":
+            pass
+        while (token := self.next()) != "endmodule":
+            if token in ("input", "output", "inout", "wire"):
+                bits = self.range()
+                while True:
+                    net = self.next().lstrip("\\")
+                    if bits is not None:
+                        module["buses"][net] = bits
+                    if token != "wire":
+                        module["ports"][net] = (token, bits)
+                    if self.next() == ";":
+                        break
+            elif token == "assign":
+                lhs = self.expression(module)
+                self.expect("=")
+                rhs = self.expression(module)
+                self.expect(";")
+                module["assigns"].append((lhs, rhs))
+            else:
+                cell_type, instance = token, self.next()
+                self.expect("(")
+                pins = {}
+                while self.peek() != ")":
+                    if self.peek() == ",":
+                        self.next()
+                        continue
+                    if self.next() != ".":
+                        raise NetlistError(f"positional connections are not supported ({instance})")
+                    pin = self.next()
+                    self.expect("(")
+                    nets = self.expression(module) if self.peek() != ")" else []
+                    self.expect(")")
+                    if len(nets) > 1:
+                        raise NetlistError(f"multi-bit connection on {instance}.{pin}")
+                    if nets:
+                        pins[pin] = nets[0]
+                self.expect(")")
+                self.expect(";")
+                module["cells"].append((cell_type, instance, pins))
+        return module
+
+    def expression(self, module):
+        """Bit nets (MSB first) of a net, bit or part select, constant or concatenation."""
+        token = self.next()
+        if token == "{":
+            bits = []
+            while True:
+                bits += self.expression(module)
+                if self.next() == "}":
+                    return bits
+        if "'" in token:
+            width, value = token.split("'")
+            digits = value[1:].replace("_", "")
+            base = {"b": 2, "h": 16, "d": 10}[value[0].lower()]
+            number = int(digits, base)
+            return [f"1'b{(number >> i) & 1}" for i in reversed(range(int(width)))]
+        net = token.lstrip("\\")
+        if self.peek() == "[":
+            self.next()
+            msb = lsb = int(self.next())
+            if self.peek() == ":":
+                self.next()
+                lsb = int(self.next())
+            self.expect("]")
+            step = -1 if msb >= lsb else 1
+            return [f"{net}[{i}]" for i in range(msb, lsb + step, step)]
+        if net in module["buses"]:
+            return [f"{net}[{i}]" for i in module["buses"][net]]
+        return [net]
+
+
+def parse_netlist(text, top=None):
+    """The module named *top* (by default the ``tt_um_`` one) of a netlist."""
+    modules = {m["name"]: m for m in _Parser(text).modules()}
+    if top is None:
+        top = next((name for name in modules if name.startswith("tt_um_")), list(modules)[-1])
+    return modules[top]
+
+
+class GateLevelSim:
+    """Cycle-based two-valued simulation of a flattened sg13g2 netlist."""
+
+    def __init__(self, text, top=None, clock="clk"):
+        module = parse_netlist(text, top)
+        self.name = module["name"]
+        self.clock = clock
+        self.inputs = {}
+        self.outputs = {}
+        for port, (direction, bits) in module["ports"].items():
+            nets = [port] if bits is None else [f"{port}[{i}]" for i in sorted(bits)]
+            if direction == "input" and port != clock:
+                self.inputs[port] = nets
+            elif direction == "output":
+                self.outputs[port] = nets
+
+        self.index = {"1'b0": 0, "1'b1": 1}
+        for nets in self.inputs.values():
+            for net in nets:
+                self._net(net)
+
+        clock_tree = _clock_tree(module)
+        comb = []       # (kind, output net, {pin: net})
+        flops = []      # (kind, {pin: net}, q, q_n)
+        for cell_type, instance, pins in module["cells"]:
+            kind = cell_kind(cell_type)
+            if kind in IGNORED:
+                continue
+            if kind in SEQUENTIAL:
+                root, inverted = _clock_root(pins.get("CLK"), clock_tree)
+                if root != clock:
+                    raise NetlistError(f"{instance} is not clocked by {clock}")
+                if inverted:
+                    raise NetlistError(f"{instance} is clocked on the falling edge of {clock}")
+                flops.append((kind, {p: self._net(n) for p, n in pins.items() if p not in ("Q", "Q_N", "CLK")},
+                              self._net(pins["Q"]) if "Q" in pins else None,
+                              self._net(pins["Q_N"]) if "Q_N" in pins else None))
+            elif kind in COMBINATIONAL:
+                out_pin = COMBINATIONAL[kind][0]
+                if out_pin not in pins:
+                    continue
+                comb.append((kind, self._net(pins[out_pin]),
+                             {p: self._net(n) for p, n in pins.items() if p != out_pin}))
+            else:
+                raise NetlistError(f"unsupported cell {cell_type} ({instance})")
+        for lhs, rhs in module["assigns"]:
+            if len(lhs) != len(rhs):
+                raise NetlistError(f"width mismatch in assign to {lhs[0]}")
+            comb += [("buf", self._net(l), {"A": self._net(r)}) for l, r in zip(lhs, rhs)]
+
+        self._program = self._levelize(comb)
+        self._flops = self._group_flops(flops)
+        outputs = [self.index[n] for nets in self.outputs.values() for n in nets if n in self.index]
+        self._output_program = self._cone(self._program, outputs)
+        self.resize(64)
+
+    def _net(self, name):
+        return self.index.setdefault(name, len(self.index))
+
+    def _levelize(self, comb):
+        """Group cells into ``(kind, out indices, {pin: in indices})`` steps in dependency order."""
+        driver = {}
+        for i, (_, out, _) in enumerate(comb):
+            if out in driver:
+                raise NetlistError(f"net {out} has several drivers")
+            driver[out] = i
+        fanout = defaultdict(list)
+        pending = [0] * len(comb)
+        for i, (_, _, pins) in enumerate(comb):
+            for net in set(pins.values()):
+                if net in driver:
+                    fanout[driver[net]].append(i)
+                    pending[i] += 1
+
+        level = [0] * len(comb)
+        ready = [i for i in range(len(comb)) if not pending[i]]
+        done = 0
+        while ready:
+            i = ready.pop()
+            done += 1
+            for j in fanout[i]:
+                level[j] = max(level[j], level[i] + 1)
+                pending[j] -= 1
+                if not pending[j]:
+                    ready.append(j)
+        if done != len(comb):
+            raise NetlistError("combinational loop")
+
+        groups = defaultdict(list)
+        for i, (kind, _, _) in enumerate(comb):
+            groups[level[i], kind].append(i)
+        program = []
+        for (_, kind), cells in sorted(groups.items()):
+            pins = {pin: np.array([comb[i][2][pin] for i in cells]) for pin in comb[cells[0]][2]}
+            program.append((kind, np.array([comb[i][1] for i in cells]), pins))
+        return program
+
+    def _group_flops(self, flops):
+        """Per flip-flop kind: ``(kind, {pin: in indices}, reset_b, set_b, q, q_n)`` index arrays.
+
+        Missing Q/Q_N outputs write to a scratch net; missing set/reset pins
+        read the constant nets.
+        """
+        scratch = self._net("$scratch")
+        groups = defaultdict(list)
+        for flop in flops:
+            groups[flop[0]].append(flop)
+        grouped = []
+        for kind, members in groups.items():
+            pins = {pin: np.array([m[1][pin] for m in members])
+                    for pin in members[0][1] if pin not in ("RESET_B", "SET_B")}
+            reset_b = np.array([m[1].get("RESET_B", 1) for m in members])
+            set_b = np.array([m[1].get("SET_B", 1) for m in members])
+            q = np.array([scratch if m[2] is None else m[2] for m in members])
+            q_n = np.array([scratch if m[3] is None else m[3] for m in members])
+            grouped.append((kind, pins, reset_b, set_b, q, q_n))
+        return grouped
+
+    @staticmethod
+    def _cone(program, nets):
+        """The part of *program* that the given nets depend on."""
+        needed = set(nets)
+        steps = []
+        for kind, outs, pins in reversed(program):
+            keep = np.isin(outs, list(needed))
+            if keep.any():
+                steps.append((kind, outs[keep], {pin: idx[keep] for pin, idx in pins.items()}))
+                for idx in pins.values():
+                    needed.update(idx[keep].tolist())
+        return steps[::-1]
+
+    def resize(self, vectors):
+        """Simulate *vectors* independent copies (rounded up to 64); resets all state to 0."""
+        self.vectors = vectors
+        self.words = -(-vectors // 64)
+        self.values = np.zeros((len(self.index), self.words), np.uint64)
+        self.values[1] = ONES
+
+    def _evaluate(self, program):
+        values = self.values
+        for kind, outs, pins in program:
+            values[outs] = COMBINATIONAL[kind][1]({pin: values[idx] for pin, idx in pins.items()})
+
+    def _set_inputs(self, inputs):
+        for port, value in inputs.items():
+            self.values[[self.index[n] for n in self.inputs[port]]] = pack_bits(value, len(self.inputs[port]),
+                                                                                self.words)
+
+    def _clock(self):
+        values = self.values
+        updates = []
+        for kind, pins, reset_b, set_b, q, q_n in self._flops:
+            d = SEQUENTIAL[kind]({pin: values[idx] for pin, idx in pins.items()})
+            updates.append((q, q_n, (d & values[reset_b]) | ~values[set_b]))
+        for q, q_n, d in updates:
+            values[q_n] = ~d
+            values[q] = d
+
+    def step(self, **inputs):
+        """Apply *inputs* (port -> per-vector ints), clock once, return the outputs after the edge."""
+        self._set_inputs(inputs)
+        self._evaluate(self._program)
+        self._clock()
+        self._evaluate(self._output_program)
+        return {port: self.read(port) for port in self.outputs}
+
+    def read(self, port):
+        """Current per-vector value of an output (or input) port."""
+        nets = self.outputs.get(port) or self.inputs[port]
+        return unpack_bits(self.values[[self.index.get(n, 0) for n in nets]], self.vectors)
+
+    def run(self, **inputs):
+        """Step once per row of each ``(cycles, vectors)`` input; returns ``(cycles, vectors)`` outputs."""
+        cycles = max(len(value) for value in inputs.values() if np.ndim(value))
+        inputs = {port: np.broadcast_to(value, (cycles, self.vectors)) for port, value in inputs.items()}
+        outputs = {port: np.zeros((cycles, self.vectors), np.uint64) for port in self.outputs}
+        for t in range(cycles):
+            for port, value in self.step(**{port: value[t] for port, value in inputs.items()}).items():
+                outputs[port][t] = value
+        return outputs
+
+
+def _clock_tree(module):
+    """``net -> (input net, inverts)`` for every buffer, inverter and single-bit assign."""
+    tree = {}
+    for cell_type, _, pins in module["cells"]:
+        kind = cell_kind(cell_type)
+        if kind in CLOCK_TREE and "A" in pins:
+            out = pins.get(COMBINATIONAL[kind][0])
+            if out is not None:
+                tree[out] = (pins["A"], CLOCK_TREE[kind])
+    for lhs, rhs in module["assigns"]:
+        for l, r in zip(lhs, rhs):
+            tree[l] = (r, False)
+    return tree
+
+
+def _clock_root(net, tree):
+    """The net a clock pin is driven from through *tree*, and whether it is inverted."""
+    inverted = False
+    seen = set()
+    while net in tree and net not in seen:
+        seen.add(net)
+        net, inverts = tree[net]
+        inverted ^= inverts
+    return net, inverted
+
+
+def pack_bits(values, width, words):
+    """``(width, words)`` uint64 planes of per-vector integers (bit *i* in row *i*)."""
+    values = np.broadcast_to(np.asarray(values, np.uint64), (np.size(values) if np.ndim(values) else 1,))
+    padded = np.zeros(words * 64, np.uint64)
+    padded[:] = values[0] if len(values) == 1 else np.pad(values, (0, words * 64 - len(values)))
+    bits = (padded[None, :] >> np.arange(width, dtype=np.uint64)[:, None]) & np.uint64(1)
+    return np.packbits(bits.astype(np.uint8), axis=1, bitorder="little").view(np.uint64)
+
+
+def unpack_bits(planes, vectors):
+    """Inverse of :func:`pack_bits`: per-vector integers from ``(width, words)`` planes."""
+    bits = np.unpackbits(np.ascontiguousarray(planes).view(np.uint8), axis=1, bitorder="little")[:, :vectors]
+    weights = np.uint64(1) << np.arange(len(planes), dtype=np.uint64)
+    return (bits.astype(np.uint64) * weights[:, None]).sum(axis=0, dtype=np.uint64)
+
+
+def load(path=GL_NETLIST, top=None):
+    return GateLevelSim(Path(path).read_text(), top)
+
+
+def compare_with_model(sim, cycles, rng, log=print):
+    """Random reset/config/stimulus runs on every vector, checked against the system model."""
+    from loader_model import FRAME_CYCLES, encode_frames
+    from neuron_model import NeuronParams
+    from pins import input_mask
+    from system_model import SystemModel
+
+    n = sim.vectors
+    params = NeuronParams(*(rng.integers(0, 1 << bits, n) for bits in (3, 3, 8, 8, 4)))
+    ui_in = rng.integers(0, 256, (cycles, n)).astype(np.uint8)
+    ui_in &= ~input_mask("load_mode", "serial_data")[0]   # no loader activity after the frame
+    ui_in[:FRAME_CYCLES] = encode_frames(params).T
+    uio_in = rng.integers(0, 256, (cycles, n)).astype(np.uint8)
+    rst_n = np.ones(cycles, np.uint8)
+    reset = 2
+    ui_in, uio_in, rst_n = (np.concatenate([np.zeros((reset,) + a.shape[1:], np.uint8), a])
+                            for a in (ui_in, uio_in, rst_n))
+
+    start = time.perf_counter()
+    gl = sim.run(ui_in=ui_in, uio_in=uio_in, rst_n=rst_n[:, None], ena=1)
+    elapsed = time.perf_counter() - start
+    model = SystemModel(n)
+    uo_out, uio_out = model.run(ui_in, uio_in, rst_n)
+
+    mismatch = (gl["uo_out"][reset:] != uo_out[reset:]) | (gl["uio_out"][reset:] != uio_out[reset:])
+    log(f"{n} vectors x {len(ui_in)} cycles in {elapsed:.2f}s "
+        f"({n * len(ui_in) / elapsed:,.0f} vector-cycles/s)")
+    if mismatch.any():
+        cycle, vector = np.argwhere(mismatch)[0]
+        log(f"MISMATCH: vector {vector} cycle {cycle}: params {tuple(int(p[vector]) for p in params)}, "
+            f"gl uo_out={int(gl['uo_out'][reset + cycle, vector]):#04x}, "
+            f"model uo_out={int(uo_out[reset + cycle, vector]):#04x}")
+    return int(mismatch.sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("netlist", nargs="?", default=str(GL_NETLIST))
+    parser.add_argument("--vectors", type=int, default=4096)
+    parser.add_argument("--cycles", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sim = load(args.netlist)
+    sim.resize(args.vectors)
+    mismatches = compare_with_model(sim, args.cycles, np.random.default_rng(args.seed))
+    raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
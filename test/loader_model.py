@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Cycle-accurate NumPy model of ``alif_dual_unileak_data_loader``.
+
+The serial loader (src/lif_data_loader.v) shifts in five 8-bit fields MSB
+first while ``load_enable`` is high and keeps only the low 3/3/8/8/4 bits of
+each.  The model reproduces its quirks:
+
+* The first cycle with ``load_enable`` high only moves IDLE -> LOAD_WA; its
+  serial bit is ignored.
+* Dropping ``load_enable`` in any LOAD state aborts to IDLE with
+  ``params_ready`` high, keeping the fields captured so far.
+* After the last bit the FSM waits in READY until ``load_enable`` drops.
+
+:func:`encode_frames` turns arrays of parameter tuples into the exact
+``ui_in`` sequences that load them, and :func:`decode_frames` recovers the
+parameters by running such sequences through the model.
+"""
+
+import numpy as np
+
+from neuron_model import DEFAULT_PARAMS, NeuronParams
+from pins import decode_inputs, encode_inputs, input_mask
+
+IDLE = 0
+LOAD_WA = 1
+LOAD_WB = 2
+LOAD_LEAK_RATE = 3
+LOAD_THR_MIN = 4
+LOAD_LEAK_CYCLES = 5
+READY = 6
+
+# Bits kept from each 8-bit serial field, in load order
+FIELD_BITS = (3, 3, 8, 8, 4)
+FIELD_CYCLES = 8
+
+# One start cycle, five fields, one cycle with load_enable low to leave READY
+FRAME_CYCLES = 1 + FIELD_CYCLES * len(FIELD_BITS) + 1
+
+
+class LoaderArray:
+    """Structure-of-arrays state for *n* independent serial loaders."""
+
+    def __init__(self, n):
+        self.n = n
+        self.current_state = np.zeros(n, np.int16)
+        self.shift_reg = np.zeros(n, np.int16)
+        self.bit_count = np.zeros(n, np.int16)
+        self.fields = [np.zeros(n, np.int16) for _ in FIELD_BITS]
+        self.params_ready = np.zeros(n, bool)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Apply the synchronous reset, optionally only where *mask* is set."""
+        if mask is None:
+            mask = np.ones(self.n, bool)
+        self.current_state[mask] = IDLE
+        self.shift_reg[mask] = 0
+        self.bit_count[mask] = 0
+        for field, default in zip(self.fields, DEFAULT_PARAMS):
+            field[mask] = default
+        self.params_ready[mask] = True
+
+    @property
+    def params(self):
+        """Current outputs as :class:`neuron_model.NeuronParams` of arrays."""
+        return NeuronParams(*self.fields)
+
+    def state(self):
+        """Return copies of the registers keyed by RTL name."""
+        regs = {
+            "current_state": self.current_state.copy(),
+            "shift_reg": self.shift_reg.copy(),
+            "bit_count": self.bit_count.copy(),
+            "params_ready": self.params_ready.copy(),
+        }
+        regs.update((name, field.copy()) for name, field in zip(NeuronParams._fields, self.fields))
+        return regs
+
+    def step(self, serial_data_in, load_enable, enable=1):
+        """Advance every loader by one clock edge."""
+        active = np.broadcast_to(np.asarray(enable) != 0, (self.n,))
+        load = np.broadcast_to(np.asarray(load_enable) != 0, (self.n,)) & active
+        serial = np.broadcast_to(np.asarray(serial_data_in, np.int16) & 1, (self.n,))
+        state = self.current_state
+        loading = (state >= LOAD_WA) & (state <= LOAD_LEAK_CYCLES) & active
+
+        start = (state == IDLE) & load
+        shift = loading & load
+        last = shift & (self.bit_count == FIELD_CYCLES - 1)
+        abort = loading & ~load
+        leave = active & (((state == READY) & ~load) | (state > READY))
+        shifted = ((self.shift_reg << 1) | serial) & 0xFF
+
+        for index, (field, bits) in enumerate(zip(self.fields, FIELD_BITS)):
+            capture = last & (state == LOAD_WA + index)
+            field[capture] = shifted[capture] & ((1 << bits) - 1)
+
+        # The LOAD_LEAK_CYCLES branch does not clear shift_reg; bit_count
+        # wraps from 7 to 0 on its own.
+        clear_shift = start | (last & (state != LOAD_LEAK_CYCLES))
+        self.shift_reg = np.where(clear_shift, 0, np.where(shift, shifted, self.shift_reg))
+        self.bit_count = np.where(start, 0, np.where(shift, (self.bit_count + 1) & 7, self.bit_count))
+        self.params_ready = np.where(
+            start, False, np.where(abort | (last & (state == LOAD_LEAK_CYCLES)), True, self.params_ready))
+        self.current_state = np.where(
+            start, LOAD_WA, np.where(last, state + 1, np.where(abort | leave, IDLE, state))
+        ).astype(np.int16)
+
+    def run(self, ui_in, enable=1):
+        """Step once per column of ``ui_in`` (shape ``(n, cycles)``)."""
+        ui_in = np.broadcast_to(np.asarray(ui_in), (self.n, np.shape(ui_in)[-1]))
+        for t in range(ui_in.shape[1]):
+            pins = decode_inputs(ui_in[:, t])
+            self.step(pins.serial_data, pins.load_mode, enable)
+
+
+def frame_bits(params):
+    """Serial bits (shape ``(n, 40)``) that load *params*, MSB first per field."""
+    values = np.stack([np.atleast_1d(np.asarray(p, np.int64)) for p in np.broadcast_arrays(*params)],
+                      axis=-1)
+    shifts = np.arange(FIELD_CYCLES - 1, -1, -1)
+    bits = (values[..., None] >> shifts) & 1
+    return bits.reshape(values.shape[0], -1).astype(np.uint8)
+
+
+def encode_frames(params, ui_in_base=0):
+    """``ui_in`` sequences (shape ``(n, FRAME_CYCLES)``) that load *params*.
+
+    *params* is a :class:`neuron_model.NeuronParams` (or tuple) of scalars
+    or equal-length arrays.  Values are sent zero-padded to 8 bits, so only
+    their low ``FIELD_BITS`` survive, exactly as in the RTL.  ``ui_in_base``
+    supplies the other ``ui_in`` bits (input_enable and chan_a/chan_b);
+    the loader pins are overwritten.
+    """
+    bits = frame_bits(params)
+    n = bits.shape[0]
+    load = np.ones((n, FRAME_CYCLES), np.uint8)
+    load[:, -1] = 0
+    serial = np.zeros((n, FRAME_CYCLES), np.uint8)
+    serial[:, 1:-1] = bits
+    base = np.uint8(ui_in_base) & ~input_mask("load_mode", "serial_data")[0]
+    return base | encode_inputs(load_mode=load, serial_data=serial)[0]
+
+
+def decode_frames(ui_in, loaders=None):
+    """Parameters left in the loaders after playing ``ui_in`` (shape ``(n, cycles)``).
+
+    Starts from reset unless existing *loaders* are given, so aborted or
+    truncated frames decode to exactly what the RTL would hold.
+    """
+    ui_in = np.atleast_2d(ui_in)
+    loaders = loaders if loaders is not None else LoaderArray(ui_in.shape[0])
+    loaders.run(ui_in)
+    return loaders.params
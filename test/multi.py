@@ -0,0 +1,81 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Drive the ``N_INST`` design copies of tb.v as one batch.
+
+Build with ``make N_INST=<n>`` and each copy gets its own byte of the
+``ui_in_all``/``uio_in_all`` buses (copy 0 is the usual ``user_project``
+driven by ``ui_in``/``uio_in``).  :func:`run_instances` writes one column of
+an ``(n, cycles)`` stimulus per clock for all copies at once and returns the
+outputs as ``(n, cycles)`` arrays, so the number of GPI calls per cycle does
+not depend on *n*.
+
+Like playback and capture, inputs are driven on the falling edge and
+outputs are sampled on the next falling edge, so output column *t* is the
+response to input column *t*.
+"""
+
+import numpy as np
+from cocotb.triggers import FallingEdge
+
+from capture import Capture
+from loader_model import encode_frames
+
+
+def instance_count(dut):
+    return int(dut.N_INST.value)
+
+
+def to_bus(values):
+    """Pack one byte per copy into a bus integer (copy 0 in the low byte)."""
+    return int.from_bytes(np.asarray(values, np.uint8).tobytes(), "little")
+
+
+def from_bus(binstr, n):
+    """Split a bus ``binstr`` into per-copy bytes and x/z masks."""
+    chars = np.frombuffer(binstr.encode(), np.uint8)[::-1].reshape(n, 8)
+    weights = np.uint8(1) << np.arange(8, dtype=np.uint8)
+    values = ((chars == ord("1")) * weights).sum(axis=1, dtype=np.uint8)
+    unknown = (((chars != ord("0")) & (chars != ord("1"))) * weights).sum(axis=1, dtype=np.uint8)
+    return values, unknown
+
+
+def config_stimulus(params, ui_in, uio_in=0):
+    """Prefix per-copy stimulus with the loader frames for *params*.
+
+    *params* holds one parameter set per copy; *ui_in*/*uio_in* have shape
+    ``(n, cycles)``.  ``uio_in`` is held at 0 while the frames load.
+    """
+    frames = encode_frames(params)
+    ui_in = np.asarray(ui_in, np.uint8)
+    uio_in = np.broadcast_to(np.asarray(uio_in, np.uint8), ui_in.shape)
+    return (np.concatenate([frames, ui_in], axis=1),
+            np.concatenate([np.zeros_like(frames), uio_in], axis=1))
+
+
+async def run_instances(dut, ui_in, uio_in=0):
+    """Play ``(n, cycles)`` stimulus into all copies and return a :class:`~capture.Capture`."""
+    n = instance_count(dut)
+    ui_in = np.asarray(ui_in, np.uint8)
+    if ui_in.shape[0] != n:
+        raise ValueError(f"stimulus has {ui_in.shape[0]} rows but tb has {n} instances")
+    uio_in = np.broadcast_to(np.asarray(uio_in, np.uint8), ui_in.shape)
+    cycles = ui_in.shape[1]
+
+    uo_out = np.zeros((n, cycles), np.uint8)
+    uio_out = np.zeros((n, cycles), np.uint8)
+    uo_xz = np.zeros((n, cycles), np.uint8)
+    uio_xz = np.zeros((n, cycles), np.uint8)
+
+    await FallingEdge(dut.clk)
+    for t in range(cycles + 1):
+        if t:
+            uo_out[:, t - 1], uo_xz[:, t - 1] = from_bus(dut.uo_out_all.value.binstr, n)
+            uio_out[:, t - 1], uio_xz[:, t - 1] = from_bus(dut.uio_out_all.value.binstr, n)
+        if t < cycles:
+            dut.ui_in.value = int(ui_in[0, t])
+            dut.uio_in.value = int(uio_in[0, t])
+            if n > 1:
+                dut.ui_in_all.value = to_bus(ui_in[:, t])
+                dut.uio_in_all.value = to_bus(uio_in[:, t])
+            await FallingEdge(dut.clk)
+    return Capture(uo_out, uio_out, uo_xz, uio_xz)
@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Binary-lifting jump tables for arbitrary-horizon neuron evolution.
+
+For one fixed ``(params, chan_a, chan_b, input_enable)`` the neuron is a
+function on the packed state space of :func:`neuron_model.pack_state`.
+:class:`JumpTable` tabulates that function once, then composes it with
+itself so that level *k* maps a state to the state ``2**k`` cycles later
+together with the number of spikes emitted on the way.  Jumping *N* cycles
+is then one gather per set bit of *N*, vectorized over any number of start
+states.
+
+The table covers either the whole 2**25-entry state space (about 270 MB per
+level) or only the states reachable from a given set of start states, which
+is usually a few thousand entries and is the recommended mode for long
+horizons.
+"""
+
+import numpy as np
+
+from neuron_model import STATE_BITS, NeuronParams, next_state, pack_state, unpack_state
+
+# Each spike is followed by REFRAC_PERIOD silent cycles, so uint32 spike
+# counts cannot overflow below this horizon.
+MAX_LEVELS = 34
+
+
+def transition(packed, params, chan_a, chan_b, input_enable=1, chunk=1 << 20):
+    """Return ``(next_packed, spike_out)`` for an array of packed states."""
+    packed = np.asarray(packed, np.int64)
+    result = np.empty(packed.shape, np.int64)
+    spikes = np.empty(packed.shape, bool)
+    for lo in range(0, packed.size, chunk):
+        v, thr, refr, leak = unpack_state(packed[lo:lo + chunk])
+        v, thr, refr, leak, spike = next_state(v, thr, refr, leak, chan_a, chan_b, params, input_enable)
+        result[lo:lo + chunk] = pack_state(v, thr, refr, leak)
+        spikes[lo:lo + chunk] = spike
+    return result, spikes
+
+
+def reachable(states, params, chan_a, chan_b, input_enable=1):
+    """Sorted array of every packed state reachable from *states*."""
+    seen = np.unique(np.asarray(states, np.int64))
+    frontier = seen
+    while frontier.size:
+        following = np.unique(transition(frontier, params, chan_a, chan_b, input_enable)[0])
+        frontier = np.setdiff1d(following, seen, assume_unique=True)
+        seen = np.union1d(seen, frontier)
+    return seen
+
+
+class JumpTable:
+    """Power-of-two compositions of the neuron transition function.
+
+    *states* restricts the table to the closure of those start states;
+    ``None`` tabulates the full packed state space.  Levels beyond the first
+    are built lazily the first time a jump needs them.
+    """
+
+    def __init__(self, params, chan_a, chan_b, input_enable=1, states=None):
+        self.params = NeuronParams(*(int(p) for p in params))
+        self.chan_a = int(chan_a)
+        self.chan_b = int(chan_b)
+        self.input_enable = int(input_enable)
+
+        if states is None:
+            self.domain = np.arange(1 << STATE_BITS, dtype=np.int64)
+        else:
+            self.domain = reachable(states, self.params, self.chan_a, self.chan_b, self.input_enable)
+        following, spikes = transition(self.domain, self.params, self.chan_a, self.chan_b,
+                                       self.input_enable)
+        self._next = [np.searchsorted(self.domain, following).astype(np.int32)]
+        self._spikes = [spikes.astype(np.uint32)]
+        self._spike_out = spikes
+
+    @property
+    def levels(self):
+        return len(self._next)
+
+    def _level(self, k):
+        while len(self._next) <= k:
+            step, spikes = self._next[-1], self._spikes[-1]
+            self._next.append(step[step])
+            self._spikes.append(spikes + spikes[step])
+        return self._next[k], self._spikes[k]
+
+    def index(self, states):
+        """Map packed states to table indices, rejecting states outside the domain."""
+        states = np.asarray(states, np.int64)
+        idx = np.searchsorted(self.domain, states)
+        idx_clipped = np.minimum(idx, self.domain.size - 1)
+        if not np.array_equal(self.domain[idx_clipped], states):
+            raise ValueError("state outside the jump table domain; rebuild with these start states")
+        return idx_clipped
+
+    def jump(self, states, n):
+        """Advance packed *states* by *n* cycles (scalar or per-state).
+
+        Returns ``(states, spike_count, spike_out)`` where ``spike_out`` is the
+        value driven after the last edge (0 where *n* is 0).
+        """
+        idx = self.index(states)
+        n = np.broadcast_to(np.asarray(n, np.int64), idx.shape)
+        if n.size and (n.min() < 0 or n.max() >= 1 << MAX_LEVELS):
+            raise ValueError(f"jump length must be in [0, 2**{MAX_LEVELS})")
+
+        # Jump n - 1 cycles through the tables, then take the final edge
+        # from level 0 so that its spike_out is known.
+        moving = n > 0
+        remaining = np.where(moving, n - 1, 0)
+        count = np.zeros(idx.shape, np.int64)
+        k = 0
+        while remaining.any():
+            step, spikes = self._level(k)
+            bit = (remaining & 1).astype(bool)
+            count += np.where(bit, spikes[idx], 0)
+            idx = np.where(bit, step[idx], idx)
+            remaining >>= 1
+            k += 1
+
+        spike_out = moving & self._spike_out[idx]
+        count += spike_out
+        idx = np.where(moving, self._next[0][idx], idx)
+        return self.domain[idx], count, spike_out
+
+    def advance(self, neurons, n):
+        """Advance a :class:`neuron_model.NeuronArray` in place and return spike counts.
+
+        Every neuron must share this table's parameters.
+        """
+        for p, own in zip(neurons.params, self.params):
+            if np.any(p != own):
+                raise ValueError("neurons do not share the jump table parameters")
+        states, count, spike_out = self.jump(neurons.packed(), n)
+        neurons.load_packed(states, np.where(np.asarray(n) > 0, spike_out, neurons.spike_out))
+        return count
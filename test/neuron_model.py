@@ -0,0 +1,209 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Bit-exact NumPy model of ``alif_dual_unileak_neuron`` (src/lif_neuron.v).
+
+State is kept as structure-of-arrays so that one call to
+:meth:`NeuronArray.step` advances thousands of independent neurons by one
+clock edge.  Every width and signedness rule of the RTL is reproduced:
+
+* ``contrib_a``/``contrib_b`` are the 6-bit truncation of the unsigned
+  product, reinterpreted as signed (``7 * 7 = 49`` becomes ``-15``).
+* ``new_v`` is 9-bit signed, so ``v_mem + weighted_sum`` above 255 wraps
+  negative and is then clamped to 0; the ``new_v > 255`` guard never fires.
+* The leak check compares the *old* ``leak_counter`` against
+  ``leak_cycles`` and the counter keeps running during refractory and
+  while ``input_enable`` is low.
+* ``threshold_max``, ``threshold + THR_UP`` and ``threshold_min + THR_DN``
+  are all evaluated in 8 bits, so they wrap for large ``threshold_min``.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+V_BITS = 8
+THR_UP = 4
+THR_DN = 1
+REFRAC_PERIOD = 4
+
+# Width of the packed state produced by pack_state()
+STATE_BITS = 25
+
+
+class NeuronParams(NamedTuple):
+    """Configuration driven by the serial loader (scalars or arrays)."""
+
+    weight_a: int = 2
+    weight_b: int = 2
+    leak_rate: int = 2
+    threshold_min: int = 30
+    leak_cycles: int = 1
+
+
+# Power-on values of alif_dual_unileak_data_loader
+DEFAULT_PARAMS = NeuronParams()
+
+
+def _signed(x, bits):
+    """Reinterpret the low *bits* of *x* as a two's complement value."""
+    x = x & ((1 << bits) - 1)
+    return x - ((x >> (bits - 1)) << bits)
+
+
+def pack_state(v_mem, threshold, refr_cnt, leak_counter):
+    """Pack the neuron registers into one integer (25 bits).
+
+    Layout, MSB first: 9-bit two's complement ``v_mem``, 8-bit ``threshold``,
+    4-bit ``refr_cnt``, 4-bit ``leak_counter``.  Works on scalars and arrays.
+    """
+    return (((v_mem & 0x1FF) << 16) | ((threshold & 0xFF) << 8)
+            | ((refr_cnt & 0xF) << 4) | (leak_counter & 0xF))
+
+
+def unpack_state(packed):
+    """Inverse of :func:`pack_state`, returning ``(v_mem, threshold, refr_cnt, leak_counter)``."""
+    return _signed(packed >> 16, V_BITS + 1), (packed >> 8) & 0xFF, (packed >> 4) & 0xF, packed & 0xF
+
+
+def threshold_max(threshold_min):
+    """``threshold_min << 1`` truncated to 8 bits, as in the RTL."""
+    return (threshold_min << 1) & 0xFF
+
+
+def weighted_sum(chan_a, chan_b, weight_a, weight_b):
+    """Signed ``contrib_a - contrib_b`` including the 6-bit wraparound."""
+    return _signed(chan_a * weight_a, 6) - _signed(chan_b * weight_b, 6)
+
+
+def next_state(v_mem, threshold, refr_cnt, leak_counter, chan_a, chan_b,
+               params, input_enable=1):
+    """Evaluate one enabled clock edge (``enable && params_ready``).
+
+    All arguments broadcast against each other.  Returns the tuple
+    ``(v_mem, threshold, refr_cnt, leak_counter, spike_out)`` after the edge.
+    """
+    weight_a, weight_b, leak_rate, threshold_min, leak_cycles = params
+    leak_due = leak_counter >= leak_cycles
+
+    new_v = _signed(v_mem + weighted_sum(chan_a, chan_b, weight_a, weight_b), V_BITS + 1)
+    new_v = np.where(leak_due, _signed(new_v - leak_rate, V_BITS + 1), new_v)
+    new_v = np.maximum(new_v, 0)
+
+    fire = new_v >= threshold
+    thr_up = (threshold + THR_UP) & 0xFF
+    thr_max = threshold_max(threshold_min)
+    thr_fire = np.where(thr_up <= thr_max, thr_up, thr_max)
+    thr_floor = (threshold_min + THR_DN) & 0xFF
+    thr_quiet = np.where(threshold > thr_floor, threshold - THR_DN, threshold_min)
+    thr_quiet = np.where(leak_due, thr_quiet, threshold)
+
+    refractory = refr_cnt != 0
+    integrate = (refr_cnt == 0) & (input_enable != 0)
+    spike = integrate & fire
+
+    v_next = np.where(integrate, np.where(fire, 0, new_v), v_mem)
+    thr_next = np.where(integrate, np.where(fire, thr_fire, thr_quiet), threshold)
+    refr_next = np.where(refractory, refr_cnt - 1, np.where(spike, REFRAC_PERIOD, refr_cnt))
+    leak_next = np.where(integrate & leak_due, 0, (leak_counter + 1) & 0xF)
+    return v_next, thr_next, refr_next, leak_next, spike
+
+
+class NeuronArray:
+    """Structure-of-arrays state for *n* independent neurons.
+
+    The model starts in the state left by a reset.  Parameters may be given
+    per neuron (arrays of length *n*) or shared (scalars).
+    """
+
+    def __init__(self, n, params=DEFAULT_PARAMS):
+        self.n = n
+        self.set_params(params)
+        self.v_mem = np.zeros(n, np.int16)
+        self.threshold = np.zeros(n, np.int16)
+        self.refr_cnt = np.zeros(n, np.int16)
+        self.leak_counter = np.zeros(n, np.int16)
+        self.spike_out = np.zeros(n, bool)
+        self.reset()
+
+    def set_params(self, params):
+        """Load new loader outputs; neuron state is left untouched."""
+        self.params = NeuronParams(
+            *(np.broadcast_to(np.asarray(p, np.int16), (self.n,)) for p in params))
+
+    def reset(self, mask=None):
+        """Apply the synchronous reset, optionally only where *mask* is set."""
+        if mask is None:
+            mask = np.ones(self.n, bool)
+        self.v_mem[mask] = 0
+        self.threshold[mask] = self.params.threshold_min[mask]
+        self.refr_cnt[mask] = 0
+        self.leak_counter[mask] = 0
+        self.spike_out[mask] = False
+
+    @property
+    def v_mem_out(self):
+        """The 7-bit ``v_mem_out`` port (low bits of a positive ``v_mem``)."""
+        return np.where(self.v_mem > 0, self.v_mem & 0x7F, 0)
+
+    def state(self):
+        """Return copies of the state vectors keyed by RTL register name."""
+        return {
+            "v_mem": self.v_mem.copy(),
+            "threshold": self.threshold.copy(),
+            "refr_cnt": self.refr_cnt.copy(),
+            "leak_counter": self.leak_counter.copy(),
+            "spike_out": self.spike_out.copy(),
+        }
+
+    def packed(self):
+        """Return the state of every neuron packed with :func:`pack_state`."""
+        return pack_state(self.v_mem.astype(np.int32), self.threshold.astype(np.int32),
+                          self.refr_cnt.astype(np.int32), self.leak_counter.astype(np.int32))
+
+    def load_packed(self, packed, spike_out=None):
+        """Overwrite the state from :func:`pack_state` values."""
+        self.v_mem[:], self.threshold[:], self.refr_cnt[:], self.leak_counter[:] = \
+            unpack_state(np.asarray(packed, np.int64))
+        if spike_out is not None:
+            self.spike_out[:] = spike_out
+
+    def step(self, chan_a, chan_b, input_enable=1, enable=1, params_ready=1):
+        """Advance every neuron by one clock edge and return ``spike_out``.
+
+        Inputs are scalars or arrays of length *n*.  Where ``enable`` or
+        ``params_ready`` is low the neuron holds its state and drives
+        ``spike_out`` low, as in the RTL.
+        """
+        v, thr, refr, leak, spike = next_state(
+            self.v_mem, self.threshold, self.refr_cnt, self.leak_counter,
+            np.asarray(chan_a, np.int16), np.asarray(chan_b, np.int16),
+            self.params, np.asarray(input_enable))
+        active = np.broadcast_to((np.asarray(enable) != 0) & (np.asarray(params_ready) != 0),
+                                 (self.n,))
+        if active.all():
+            self.v_mem[:] = v
+            self.threshold[:] = thr
+            self.refr_cnt[:] = refr
+            self.leak_counter[:] = leak
+            self.spike_out[:] = spike
+        else:
+            np.copyto(self.v_mem, v, where=active, casting="unsafe")
+            np.copyto(self.threshold, thr, where=active, casting="unsafe")
+            np.copyto(self.refr_cnt, refr, where=active, casting="unsafe")
+            np.copyto(self.leak_counter, leak, where=active, casting="unsafe")
+            self.spike_out[:] = spike & active
+        return self.spike_out
+
+    def run(self, chan_a, chan_b, input_enable=1):
+        """Step once per row of *chan_a*/*chan_b* and return the spike raster.
+
+        The inputs have shape ``(cycles,)`` or ``(cycles, n)``; the result is
+        a boolean array of shape ``(cycles, n)``.
+        """
+        chan_a = np.asarray(chan_a)
+        chan_b = np.broadcast_to(np.asarray(chan_b), chan_a.shape)
+        input_enable = np.broadcast_to(np.asarray(input_enable), chan_a.shape)
+        spikes = np.zeros((len(chan_a), self.n), bool)
+        for t in range(len(chan_a)):
+            spikes[t] = self.step(chan_a[t], chan_b[t], input_enable[t])
+        return spikes
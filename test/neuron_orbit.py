@@ -0,0 +1,171 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Skip-ahead simulation of the neuron by cycle detection.
+
+With ``chan_a``, ``chan_b``, ``input_enable`` and the loader parameters held
+constant, the neuron is a deterministic machine over a finite state (see
+:func:`neuron_model.pack_state`), so every trajectory is a transient followed
+by a periodic orbit.  :class:`Orbit` walks a trajectory once, hashing each
+packed state until one repeats, and afterwards answers "state and spike count
+after N cycles" with two list lookups for any N.
+"""
+
+import numpy as np
+
+from neuron_model import NeuronParams, next_state, pack_state, unpack_state
+
+
+def reset_state(params):
+    """Packed state left by a reset under *params*."""
+    return int(pack_state(0, NeuronParams(*params).threshold_min, 0, 0))
+
+
+class Orbit:
+    """Transient and period of one trajectory under constant inputs.
+
+    ``states[i]`` is the packed state after *i* cycles for
+    ``i < transient + period``; after that the sequence repeats from
+    ``states[transient]``.  ``spikes[i]`` is ``spike_out`` produced by the
+    edge leaving ``states[i]``.
+    """
+
+    def __init__(self, params, chan_a, chan_b, state=None, input_enable=1):
+        self.params = NeuronParams(*(int(p) for p in params))
+        self.chan_a = int(chan_a)
+        self.chan_b = int(chan_b)
+        self.input_enable = int(input_enable)
+        if state is None:
+            state = reset_state(self.params)
+
+        self.index = {}
+        self.states = []
+        self.spikes = []
+        state = int(state)
+        while state not in self.index:
+            self.index[state] = len(self.states)
+            self.states.append(state)
+            v, thr, refr, leak, spike = next_state(
+                *unpack_state(state), self.chan_a, self.chan_b, self.params, self.input_enable)
+            self.spikes.append(int(spike))
+            state = int(pack_state(int(v), int(thr), int(refr), int(leak)))
+
+        self.transient = self.index[state]
+        self.period = len(self.states) - self.transient
+        self._cumulative = np.concatenate(([0], np.cumsum(self.spikes)))
+        self.spikes_per_period = int(self._cumulative[-1] - self._cumulative[self.transient])
+
+    def _fold(self, m):
+        """Map an absolute cycle count onto an index into ``states``."""
+        if m < self.transient:
+            return m
+        return self.transient + (m - self.transient) % self.period
+
+    def _spike_total(self, m):
+        """Spikes emitted in the first *m* cycles from ``states[0]``."""
+        if m <= self.transient:
+            return int(self._cumulative[m])
+        laps, rest = divmod(m - self.transient, self.period)
+        return (int(self._cumulative[self.transient + rest])
+                + laps * self.spikes_per_period)
+
+    def state_at(self, n, start=0):
+        """Packed state *n* cycles after ``states[start]``."""
+        return self.states[self._fold(start + n)]
+
+    def spike_count(self, n, start=0):
+        """Number of spikes in the *n* cycles following ``states[start]``."""
+        return self._spike_total(start + n) - self._spike_total(start)
+
+    def spike_out(self, n, start=0):
+        """``spike_out`` after *n* cycles (0 when *n* is 0)."""
+        if n == 0:
+            return 0
+        return self.spikes[self._fold(start + n - 1)]
+
+    @property
+    def rate(self):
+        """Steady-state spikes per cycle."""
+        return self.spikes_per_period / self.period
+
+
+class OrbitCache:
+    """Reuse orbits across neurons whose trajectories share a state.
+
+    Any state visited by a cached orbit is resolved without stepping again,
+    since the trajectory from it is a suffix of that orbit.
+    """
+
+    def __init__(self):
+        self._orbits = {}
+
+    def lookup(self, params, chan_a, chan_b, state, input_enable=1):
+        """Return ``(orbit, start)`` such that ``orbit.states[start] == state``."""
+        key = (tuple(int(p) for p in params), int(chan_a), int(chan_b), int(input_enable))
+        orbits = self._orbits.setdefault(key, [])
+        state = int(state)
+        for orbit in orbits:
+            start = orbit.index.get(state)
+            if start is not None:
+                return orbit, start
+        orbit = Orbit(params, chan_a, chan_b, state, input_enable)
+        orbits.append(orbit)
+        return orbit, 0
+
+
+class _Transitions(dict):
+    """Packed state -> ``(next_state, spike_out)``, filled in on first use."""
+
+    def __init__(self, params, chan_a, chan_b, input_enable):
+        super().__init__()
+        self.inputs = (NeuronParams(*params), chan_a, chan_b, input_enable)
+
+    def __missing__(self, state):
+        params, chan_a, chan_b, input_enable = self.inputs
+        v, thr, refr, leak, spike = next_state(*unpack_state(state), chan_a, chan_b, params, input_enable)
+        result = self[state] = (int(pack_state(int(v), int(thr), int(refr), int(leak))), int(spike))
+        return result
+
+
+class TransitionMemo:
+    """Memoised single-neuron transitions for replaying long stimuli.
+
+    ``memo.transitions(params, chan_a, chan_b)[state]`` returns
+    ``(next_state, spike_out)``.  Each distinct state is evaluated once, so
+    replaying a periodic or repeated stimulus costs a dict lookup per cycle.
+    """
+
+    def __init__(self):
+        self._tables = {}
+
+    def transitions(self, params, chan_a, chan_b, input_enable=1):
+        key = (tuple(int(p) for p in params), int(chan_a), int(chan_b), int(input_enable))
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = _Transitions(*key)
+        return table
+
+
+def skip_ahead(neurons, n, chan_a, chan_b, input_enable=1, cache=None):
+    """Advance a :class:`neuron_model.NeuronArray` by *n* cycles in place.
+
+    Inputs are held constant for the whole span and may be scalars or
+    per-neuron arrays.  Returns the number of spikes each neuron emitted.
+    """
+    cache = cache if cache is not None else OrbitCache()
+    count = neurons.n
+    chan_a = np.broadcast_to(chan_a, (count,))
+    chan_b = np.broadcast_to(chan_b, (count,))
+    input_enable = np.broadcast_to(input_enable, (count,))
+    params = np.stack(neurons.params, axis=1)
+    packed = neurons.packed()
+
+    new_state = np.empty(count, np.int64)
+    spike_out = np.empty(count, bool)
+    spikes = np.empty(count, np.int64)
+    for i in range(count):
+        orbit, start = cache.lookup(params[i], chan_a[i], chan_b[i], packed[i], input_enable[i])
+        new_state[i] = orbit.state_at(n, start)
+        spike_out[i] = orbit.spike_out(n, start) if n else neurons.spike_out[i]
+        spikes[i] = orbit.spike_count(n, start)
+    neurons.load_packed(new_state, spike_out)
+    return spikes
@@ -0,0 +1,173 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Pin mapping of ``tt_um_alif_dual_unileak`` as vectorized NumPy codecs.
+
+src/project.v scatters the design signals over the Tiny Tapeout pins::
+
+    ui_in[0]    input_enable      uo_out[0]    spike_out
+    ui_in[1]    load_mode         uo_out[7:1]  v_mem_out
+    ui_in[2]    serial_data       uio_out[0]   params_ready
+    ui_in[5:3]  chan_a
+    ui_in[7:6]  chan_b[2:1]
+    uio_in[0]   chan_b[0]
+
+``uio[0]`` is an output (``uio_oe[0]`` is 1), so on silicon ``chan_b[0]``
+reads back ``params_ready``; the testbench drives ``uio_in[0]`` directly.
+
+:data:`INPUT_PINS` and :data:`OUTPUT_PINS` hold this table once; every
+driver, monitor and file format goes through :func:`encode_inputs`,
+:func:`decode_inputs`, :func:`encode_outputs` and :func:`decode_outputs`,
+which work on whole arrays of cycles.  Decoding is a 256-entry table
+lookup per field and port.  ``python pins.py --check`` compares the
+``pinout`` section of info.yaml with the table.
+"""
+
+import argparse
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+INFO_YAML = Path(__file__).resolve().parent.parent / "info.yaml"
+
+# Field -> (port, pin) per field bit, LSB first
+INPUT_PINS = {
+    "input_enable": [("ui_in", 0)],
+    "load_mode": [("ui_in", 1)],
+    "serial_data": [("ui_in", 2)],
+    "chan_a": [("ui_in", 3), ("ui_in", 4), ("ui_in", 5)],
+    "chan_b": [("uio_in", 0), ("ui_in", 6), ("ui_in", 7)],
+}
+
+OUTPUT_PINS = {
+    "spike_out": [("uo_out", 0)],
+    "v_mem_out": [("uo_out", pin) for pin in range(1, 8)],
+    "params_ready": [("uio_out", 0)],
+}
+
+# info.yaml names the ports ui/uo/uio; bidirectional pins are listed once.
+_YAML_PORTS = {"ui_in": "ui", "uo_out": "uo", "uio_in": "uio", "uio_out": "uio"}
+
+
+class Inputs(NamedTuple):
+    input_enable: np.ndarray
+    load_mode: np.ndarray
+    serial_data: np.ndarray
+    chan_a: np.ndarray
+    chan_b: np.ndarray
+
+
+class Outputs(NamedTuple):
+    spike_out: np.ndarray
+    v_mem_out: np.ndarray
+    params_ready: np.ndarray
+
+
+def _encode(table, ports, values):
+    """Pin bytes for each port of *ports* from field *values* (broadcast)."""
+    fields = np.broadcast_arrays(*(np.asarray(values[name], np.int64) for name in table))
+    shape = fields[0].shape
+    encoded = {port: np.zeros(shape, np.uint8) for port in ports}
+    for field, bits in zip(fields, table.values()):
+        for bit, (port, pin) in enumerate(bits):
+            encoded[port] |= (((field >> bit) & 1) << pin).astype(np.uint8)
+    return tuple(encoded[port] for port in ports)
+
+
+def _decoders(table, ports):
+    """Per field, a 256-entry lookup table for each port it draws bits from."""
+    codes = np.arange(256)
+    decoders = {}
+    for name, bits in table.items():
+        luts = {port: np.zeros(256, np.int16) for port in ports}
+        for bit, (port, pin) in enumerate(bits):
+            luts[port] |= ((codes >> pin) & 1) << bit
+        decoders[name] = [(ports.index(port), lut) for port, lut in luts.items() if lut.any()]
+    return decoders
+
+
+_INPUT_DECODERS = _decoders(INPUT_PINS, ("ui_in", "uio_in"))
+_OUTPUT_DECODERS = _decoders(OUTPUT_PINS, ("uo_out", "uio_out"))
+
+
+def _decode(decoders, *ports):
+    ports = np.broadcast_arrays(*(np.asarray(port, np.uint8) for port in ports))
+    fields = []
+    for parts in decoders.values():
+        value = parts[0][1][ports[parts[0][0]]]
+        for index, lut in parts[1:]:
+            value = value | lut[ports[index]]
+        fields.append(value)
+    return fields
+
+
+def encode_inputs(input_enable=0, load_mode=0, serial_data=0, chan_a=0, chan_b=0):
+    """``(ui_in, uio_in)`` uint8 arrays that drive the given fields."""
+    return _encode(INPUT_PINS, ("ui_in", "uio_in"), {"input_enable": input_enable, "load_mode": load_mode,
+                                                     "serial_data": serial_data, "chan_a": chan_a,
+                                                     "chan_b": chan_b})
+
+
+def decode_inputs(ui_in, uio_in=0):
+    """Split pin bytes into :class:`Inputs` (int16 arrays)."""
+    return Inputs(*_decode(_INPUT_DECODERS, ui_in, uio_in))
+
+
+def encode_outputs(spike_out=0, v_mem_out=0, params_ready=0):
+    """``(uo_out, uio_out)`` uint8 arrays the design drives for the given fields."""
+    return _encode(OUTPUT_PINS, ("uo_out", "uio_out"),
+                   {"spike_out": spike_out, "v_mem_out": v_mem_out, "params_ready": params_ready})
+
+
+def decode_outputs(uo_out, uio_out=0):
+    """Split output bytes into :class:`Outputs` (int16 arrays)."""
+    return Outputs(*_decode(_OUTPUT_DECODERS, uo_out, uio_out))
+
+
+def input_mask(*fields):
+    """``(ui_in, uio_in)`` masks covering the pins of *fields*."""
+    return encode_inputs(**{name: (1 << len(INPUT_PINS[name])) - 1 for name in fields})
+
+
+def pinout():
+    """The info.yaml ``pinout`` entries implied by the table, e.g. ``{"ui[3]": "CHAN_A_BIT0"}``.
+
+    Unused pins map to ``""``; ``uio[0]`` is named after its output.
+    """
+    names = {f"{port}[{pin}]": "" for port in ("ui", "uo", "uio") for pin in range(8)}
+    for table in (INPUT_PINS, OUTPUT_PINS):
+        for field, bits in table.items():
+            for bit, (port, pin) in enumerate(bits):
+                suffix = f"_BIT{bit}" if len(bits) > 1 else ""
+                names[f"{_YAML_PORTS[port]}[{pin}]"] = field.upper() + suffix
+    return names
+
+
+def check_info_yaml(path=INFO_YAML):
+    """Pins whose info.yaml name differs from :func:`pinout`, as ``{pin: (yaml, expected)}``."""
+    text = Path(path).read_text()
+    listed = dict(re.findall(r'^\s*(u[io]{1,2}\[\d\]):\s*"([^"]*)"', text, re.M))
+    return {pin: (listed.get(pin, ""), name) for pin, name in pinout().items() if listed.get(pin) != name}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--check", action="store_true", help="compare the pinout in info.yaml with the codec")
+    parser.add_argument("--info-yaml", default=INFO_YAML)
+    args = parser.parse_args()
+
+    if not args.check:
+        for pin, name in pinout().items():
+            print(f'  {pin}: "{name}"')
+        return
+    mismatches = check_info_yaml(args.info_yaml)
+    for pin, (listed, name) in mismatches.items():
+        print(f"{pin}: info.yaml says {listed or '(missing)'!r}, the design has {name!r}")
+    if mismatches:
+        raise SystemExit(1)
+    print("info.yaml pinout matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Replay stimulus from a ROM inside tb.v instead of writing ui_in per cycle.
+
+:func:`write_stimulus` packs ``ui_in``/``uio_in`` arrays into the hex file
+read by ``$readmemh`` in tb.v, and :func:`play_stimulus` starts playback
+with a single trigger.  Words are driven on the falling edge, so word *i* is
+sampled by the design on the *i*-th rising edge after playback starts.
+Playback may start at any point of the clock cycle: when the clock is low
+(right after a falling edge) the ROM cannot drive word 0 before the next
+rising edge, so word 0 is written to the pins directly and the ROM starts
+at word 1.  Sequences longer than the ROM (``2**STIM_ADDR_BITS`` words) are
+played in back-to-back chunks without a gap.
+"""
+
+import cocotb
+import numpy as np
+from cocotb.triggers import FallingEdge, RisingEdge
+
+HEX_DIGITS = np.frombuffer(b"0123456789abcdef", np.uint8)
+
+
+def pack_words(ui_in, uio_in=0):
+    """``{uio_in, ui_in}`` as 16-bit ROM words."""
+    ui_in = np.asarray(ui_in, np.uint16)
+    uio_in = np.broadcast_to(np.asarray(uio_in, np.uint16), ui_in.shape)
+    return (uio_in << 8) | ui_in
+
+
+def write_stimulus(path, words):
+    """Write 16-bit *words* as one 4-digit hex number per line."""
+    words = np.asarray(words, np.uint16)
+    text = np.empty((len(words), 5), np.uint8)
+    for digit in range(4):
+        text[:, digit] = HEX_DIGITS[(words >> (12 - 4 * digit)) & 0xF]
+    text[:, 4] = ord("\n")
+    with open(path, "wb") as f:
+        f.write(text.tobytes())
+
+
+def stimulus_path():
+    """The file tb.v reads, relative to the simulator's working directory."""
+    return cocotb.plusargs.get("STIM_FILE", "stimulus.hex")
+
+
+async def play_stimulus(dut, ui_in, uio_in=0, wait=True):
+    """Replay ``ui_in``/``uio_in`` arrays through the ROM in tb.v.
+
+    With *wait* the coroutine returns after the rising edge that samples the
+    last word; otherwise it returns once the first chunk is playing (only
+    valid for sequences that fit the ROM).
+    """
+    words = pack_words(ui_in, uio_in)
+    depth = 1 << int(dut.STIM_ADDR_BITS.value)
+    if not wait and len(words) > depth:
+        raise ValueError(f"{len(words)} words do not fit the {depth}-word stimulus ROM")
+
+    start = 0
+    if len(words) and dut.clk.value.binstr == "0":
+        # Word 0 must be on the pins for the next rising edge; the ROM only
+        # drives on the falling edge after it.
+        dut.ui_in.value = int(words[0]) & 0xFF
+        dut.uio_in.value = int(words[0]) >> 8
+        start = 1
+    for lo in range(start, len(words), depth):
+        chunk = words[lo:lo + depth]
+        write_stimulus(stimulus_path(), chunk)
+        dut.stim_len.value = len(chunk)
+        dut.stim_start.value = 1
+        await FallingEdge(dut.clk)
+        dut.stim_start.value = 0
+        if not wait:
+            return
+        if len(chunk) > 1:
+            await FallingEdge(dut.stim_busy)
+    if wait:
+        await RisingEdge(dut.clk)
@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Cached firing-rate (f-I) maps over every ``chan_a`` x ``chan_b`` input.
+
+For a loader configuration, :func:`compute_rate_map` finds the orbit that
+starts from reset for each of the 64 input combinations and records its
+exact steady-state spike rate, inter-spike interval, transient length and
+period.  :class:`RateMap` stores the result under ``LIF_CACHE_DIR``
+(``test/.lif_cache`` by default), keyed by a hash of the RTL sources and the
+parameters, so a configuration is only ever computed once per design
+revision.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+from neuron_model import NeuronParams
+from neuron_orbit import Orbit
+from sources import CACHE_DIR, rtl_hash
+
+# Bump when the layout or meaning of RATE_DTYPE changes
+FORMAT_VERSION = 1
+
+RATE_DTYPE = np.dtype([
+    ("rate", np.float64),           # spikes per cycle in steady state
+    ("isi", np.float64),            # mean steady-state inter-spike interval (inf if silent)
+    ("transient", np.int64),        # cycles from reset until the orbit is periodic
+    ("period", np.int64),           # length of the periodic orbit
+    ("spikes_per_period", np.int64),
+    ("first_spike", np.int64),      # cycles from reset to the first spike (-1 if none)
+])
+
+
+def compute_rate_map(params, input_enable=1):
+    """Return an (8, 8) ``RATE_DTYPE`` array indexed by ``[chan_a, chan_b]``."""
+    params = NeuronParams(*(int(p) for p in params))
+    table = np.zeros((8, 8), RATE_DTYPE)
+    for chan_a in range(8):
+        for chan_b in range(8):
+            orbit = Orbit(params, chan_a, chan_b, input_enable=input_enable)
+            entry = table[chan_a, chan_b]
+            entry["rate"] = orbit.rate
+            entry["isi"] = (orbit.period / orbit.spikes_per_period
+                            if orbit.spikes_per_period else np.inf)
+            entry["transient"] = orbit.transient
+            entry["period"] = orbit.period
+            entry["spikes_per_period"] = orbit.spikes_per_period
+            entry["first_spike"] = orbit.spikes.index(1) + 1 if 1 in orbit.spikes else -1
+    return table
+
+
+def cache_key(params, input_enable=1, source_hash=None):
+    """Cache file stem for *params* under the current (or given) RTL hash."""
+    source_hash = source_hash or rtl_hash()
+    text = f"v{FORMAT_VERSION}:{source_hash}:{tuple(int(p) for p in params)}:{int(input_enable)}"
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class RateMap:
+    """In-memory and on-disk cache of :func:`compute_rate_map` results."""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = Path(cache_dir) / "rate_map"
+        self._source_hash = rtl_hash()
+        self._tables = {}
+
+    def table(self, params, input_enable=1):
+        """The (8, 8) rate table for *params*, computing it on a cache miss."""
+        key = cache_key(params, input_enable, self._source_hash)
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+        path = self.cache_dir / f"{key}.npy"
+        if path.exists():
+            table = np.load(path)
+        else:
+            table = compute_rate_map(params, input_enable)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, table)
+            os.replace(tmp, path)
+        self._tables[key] = table
+        return table
+
+    def lookup(self, params, chan_a, chan_b, input_enable=1):
+        """One ``RATE_DTYPE`` record for an input combination."""
+        return self.table(params, input_enable)[chan_a, chan_b]
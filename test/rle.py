@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Run-length encoded stimulus: ``(ui_in, uio_in, duration)`` runs.
+
+Rate-coded inputs hold ``chan_a``/``chan_b`` for hundreds of cycles, so a
+stimulus is stored as :class:`Runs` rather than one word per cycle.
+:func:`drive_runs` applies each run with one write and one
+:func:`tb_clock.wait_cycles` (two callbacks however long the run), and
+:func:`run_model` feeds the same runs to :class:`system_model.SystemModel`,
+skipping ahead through long runs with :func:`checkpoint.fast_forward`.
+
+Files are ``.npz`` archives with the three columns; durations are counted
+in rising edges and must be positive.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from checkpoint import fast_forward
+from neuron_orbit import OrbitCache
+from pins import decode_outputs
+from tb_clock import wait_cycles
+
+# Shorter runs are stepped cycle by cycle; finding an orbit costs more.
+SKIP_MIN = 256
+
+
+class Runs(NamedTuple):
+    ui_in: np.ndarray
+    uio_in: np.ndarray
+    duration: np.ndarray
+
+    @property
+    def cycles(self):
+        return int(self.duration.sum())
+
+
+def make_runs(ui_in, uio_in=0, duration=1):
+    """:class:`Runs` from columns, broadcasting scalars."""
+    ui_in, uio_in, duration = np.broadcast_arrays(np.atleast_1d(ui_in), uio_in, duration)
+    if (duration <= 0).any():
+        raise ValueError("run durations must be positive")
+    return Runs(ui_in.astype(np.uint8), uio_in.astype(np.uint8), duration.astype(np.int64))
+
+
+def encode(ui_in, uio_in=0):
+    """Compress per-cycle pin arrays into runs of equal ``(ui_in, uio_in)``."""
+    ui_in = np.asarray(ui_in, np.uint8)
+    uio_in = np.broadcast_to(np.asarray(uio_in, np.uint8), ui_in.shape)
+    words = (uio_in.astype(np.uint16) << 8) | ui_in
+    starts = np.flatnonzero(np.concatenate(([True], words[1:] != words[:-1]))) if len(words) else np.zeros(0, int)
+    return Runs(ui_in[starts], uio_in[starts], np.diff(np.append(starts, len(words))).astype(np.int64))
+
+
+def decode(runs):
+    """Per-cycle ``(ui_in, uio_in)`` arrays."""
+    return np.repeat(runs.ui_in, runs.duration), np.repeat(runs.uio_in, runs.duration)
+
+
+def save(path, runs):
+    np.savez(path, ui_in=runs.ui_in, uio_in=runs.uio_in, duration=runs.duration)
+
+
+def load(path):
+    with np.load(path) as data:
+        return make_runs(data["ui_in"], data["uio_in"], data["duration"])
+
+
+async def drive_runs(dut, runs):
+    """Apply each run to the pins and wait out its duration.
+
+    Returns on the rising edge that samples the last run's final cycle.
+    Outputs are best collected with :func:`capture.start_capture`.
+    """
+    for ui_in, uio_in, duration in zip(runs.ui_in.tolist(), runs.uio_in.tolist(), runs.duration.tolist()):
+        dut.ui_in.value = ui_in
+        dut.uio_in.value = uio_in
+        await wait_cycles(dut, duration)
+
+
+def run_model(model, runs, cache=None):
+    """Advance *model* through *runs*.
+
+    Returns ``(spikes, uo_out, uio_out)``: spikes per run and copy, and the
+    outputs after the last edge of each run, all of shape ``(runs, n)``.
+    """
+    cache = cache if cache is not None else OrbitCache()
+    spikes = np.zeros((len(runs.duration), model.n), np.int64)
+    uo_out = np.zeros((len(runs.duration), model.n), np.uint8)
+    uio_out = np.zeros((len(runs.duration), model.n), np.uint8)
+    for i, (ui_in, uio_in, duration) in enumerate(zip(*runs)):
+        if duration >= SKIP_MIN:
+            spikes[i] = fast_forward(model, int(duration), ui_in, uio_in, cache)
+        else:
+            out, _ = model.run(np.full(duration, ui_in, np.uint8), np.full(duration, uio_in, np.uint8))
+            spikes[i] = decode_outputs(out).spike_out.sum(axis=0)
+        uo_out[i], uio_out[i] = model.uo_out, model.uio_out
+    return spikes, uo_out, uio_out
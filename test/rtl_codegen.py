@@ -0,0 +1,474 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Generate a NumPy model of ``alif_dual_unileak_system`` from the RTL.
+
+Yosys elaborates the design (``prep -flatten``) and exports it as JSON;
+:func:`generate` turns the word-level cells of that export into Python
+source with one NumPy expression per cell, ordered topologically, so the
+resulting ``next_state``/``outputs`` functions run across any number of
+instances at once.  Nothing about the neuron is written by hand: the model
+follows the Verilog.
+
+:func:`load_model` keys the generated module on a hash of the RTL sources
+and regenerates it (running Yosys) whenever they change, so a stale model
+is never used.  Generated modules live under ``LIF_CACHE_DIR/rtl_model``.
+
+:class:`CompiledSystem` wraps the generated functions with the port names
+of the Verilog module; ``python rtl_codegen.py --check`` compares it with
+the hand-written :class:`system_model.SystemModel` on random stimulus.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from sources import CACHE_DIR, SRC_DIR, rtl_hash
+
+TOP = "alif_dual_unileak_system"
+SYSTEM_SOURCES = ["lif_neuron.v", "lif_neuron_system.v", "lif_data_loader.v"]
+MODEL_DIR = CACHE_DIR / "rtl_model"
+
+# Bump when the generated code changes for the same JSON
+GENERATOR_VERSION = 1
+
+YOSYS_SCRIPT = "read_verilog {sources}; prep -flatten -top {top}; write_json {out}"
+
+_BINARY = {"$add": "+", "$sub": "-", "$mul": "*", "$and": "&", "$or": "|", "$xor": "^"}
+_COMPARE = {"$eq": "==", "$eqx": "==", "$ne": "!=", "$nex": "!=",
+            "$lt": "<", "$le": "<=", "$gt": ">", "$ge": ">="}
+_FLOPS = {"$dff", "$dffe", "$sdff", "$sdffe", "$sdffce", "$adff", "$adffe"}
+# Cells with no logic: flatten leaves a $scopeinfo per instance (Yosys 0.34+)
+_IGNORED = {"$scopeinfo"}
+
+_PRELUDE = '''\
+import numpy as np
+
+
+def _b(condition):
+    return np.asarray(condition, np.int64)
+
+
+def _s(v, w):
+    """Two's complement value of the low *w* bits of *v*."""
+    return v - (((v >> (w - 1)) & 1) << w)
+
+
+def _shl(v, n):
+    n = np.asarray(n)
+    return np.where(n < 63, v << np.minimum(n, 62), 0)
+
+
+def _shr(v, n):
+    n = np.asarray(n)
+    return np.where(n < 63, v >> np.minimum(n, 62), np.where(v < 0, -1, 0))
+
+
+def _shift(v, n):
+    n = np.asarray(n)
+    return np.where(n >= 0, _shr(v, n), _shl(v, -n))
+'''
+
+
+class CodegenError(ValueError):
+    """The Yosys export uses a cell the generator does not handle."""
+
+
+def _int_param(value):
+    """Yosys JSON parameters are binary strings (or plain ints)."""
+    return int(value, 2) if isinstance(value, str) else int(value)
+
+
+def _mask(width):
+    return (1 << width) - 1
+
+
+def run_yosys(out_path, sources=None, top=TOP):
+    """Export *top* as JSON with Yosys; needs ``yosys`` on PATH."""
+    if shutil.which("yosys") is None:
+        raise FileNotFoundError("yosys is needed to (re)generate the RTL model")
+    sources = sources or [SRC_DIR / name for name in SYSTEM_SOURCES]
+    script = YOSYS_SCRIPT.format(sources=" ".join(str(s) for s in sources), top=top, out=out_path)
+    subprocess.run(["yosys", "-q", "-p", script], check=True)
+
+
+class _Generator:
+    def __init__(self, module):
+        self.module = module
+        self.bits = {}          # bit id -> (variable, position)
+        self.flops = []         # (state name, cell)
+        self.inputs = {}
+        self.outputs = {}
+        self.names = {}
+        self._order = None
+        for name, net in module["netnames"].items():
+            if not net.get("hide_name"):
+                self.names.setdefault(tuple(net["bits"]), []).append(name)
+
+        for name, port in module["ports"].items():
+            if port["direction"] == "input":
+                self.inputs[name] = len(port["bits"])
+                self._define(f"i_{_ident(name)}", port["bits"])
+            elif port["direction"] == "output":
+                self.outputs[name] = port["bits"]
+
+        for cell_name, cell in module["cells"].items():
+            if cell["type"] in _FLOPS:
+                q = cell["connections"]["Q"]
+                state = self.register_name(cell_name, q)
+                self._define(f"s{len(self.flops)}", q)
+                self.flops.append((state, cell))
+
+    def register_name(self, cell_name, q):
+        """Name of the register a flip-flop implements, e.g. ``neuron.v_mem``.
+
+        A register is usually aliased by the ports it drives (``spike_out``,
+        ``neuron.weight_a``), so the name is taken from the scope of the
+        flip-flop cell (``$flatten\\neuron.$procdff$441`` is in ``neuron``)
+        rather than from whichever alias comes first in the export.
+        """
+        aliases = sorted(self.names.get(tuple(q), []))
+        scope = ""
+        if cell_name.startswith("$flatten\\"):
+            scope = cell_name[len("$flatten\\"):].rsplit(".$", 1)[0]
+        local = [name for name in aliases if name.rpartition(".")[0] == scope]
+        if local:
+            return local[0]
+        if aliases:
+            return min(aliases, key=lambda name: (name.count("."), name))
+        return cell_name
+
+    def _define(self, var, bits):
+        for position, bit in enumerate(bits):
+            if isinstance(bit, int):
+                self.bits[bit] = (var, position)
+
+    def operand(self, bits):
+        """Expression for the unsigned value of a bit list (LSB first)."""
+        terms = []
+        constant = 0
+        i = 0
+        while i < len(bits):
+            bit = bits[i]
+            if not isinstance(bit, int):
+                constant |= (bit == "1") << i
+                i += 1
+                continue
+            if bit not in self.bits:
+                raise CodegenError(f"bit {bit} has no driver")
+            var, start = self.bits[bit]
+            run = 1
+            while (i + run < len(bits) and isinstance(bits[i + run], int)
+                   and self.bits.get(bits[i + run]) == (var, start + run)):
+                run += 1
+            term = var if start == 0 else f"({var} >> {start})"
+            term = f"({term} & {_mask(run)})"
+            terms.append(term if i == 0 else f"({term} << {i})")
+            i += run
+        if constant or not terms:
+            terms.append(str(constant))
+        return " | ".join(terms)
+
+    def signed_operand(self, cell, port):
+        bits = cell["connections"][port]
+        value = f"({self.operand(bits)})"
+        if _int_param(cell["parameters"].get(f"{port}_SIGNED", 0)):
+            return f"_s({value}, {len(bits)})"
+        return value
+
+    def expression(self, cell):
+        kind = cell["type"]
+        conn = cell["connections"]
+        params = cell["parameters"]
+        y_width = len(conn["Y"])
+        y_mask = _mask(y_width)
+        both_signed = (_int_param(params.get("A_SIGNED", 0)) and _int_param(params.get("B_SIGNED", 0)))
+
+        def ab(port):
+            # Binary operands are sign-extended only when both are signed.
+            return self.signed_operand(cell, port) if both_signed else f"({self.operand(conn[port])})"
+
+        if kind in _BINARY:
+            return f"(({ab('A')}) {_BINARY[kind]} ({ab('B')})) & {y_mask}"
+        if kind == "$xnor":
+            return f"~(({ab('A')}) ^ ({ab('B')})) & {y_mask}"
+        if kind in _COMPARE:
+            return f"_b(({ab('A')}) {_COMPARE[kind]} ({ab('B')}))"
+        a = self.signed_operand(cell, "A") if "A" in conn else None
+        if kind == "$not":
+            return f"~({a}) & {y_mask}"
+        if kind == "$neg":
+            return f"(-({a})) & {y_mask}"
+        if kind == "$pos":
+            return f"({a}) & {y_mask}"
+        if kind in ("$reduce_or", "$reduce_bool"):
+            return f"_b(({self.operand(conn['A'])}) != 0)"
+        if kind == "$reduce_and":
+            return f"_b(({self.operand(conn['A'])}) == {_mask(len(conn['A']))})"
+        if kind in ("$reduce_xor", "$reduce_xnor"):
+            parity = f"(_b(np.bitwise_count(_b({self.operand(conn['A'])}))) & 1)"
+            return parity if kind == "$reduce_xor" else f"1 - {parity}"
+        if kind == "$logic_not":
+            return f"_b(({self.operand(conn['A'])}) == 0)"
+        if kind in ("$logic_and", "$logic_or"):
+            op = "&" if kind == "$logic_and" else "|"
+            return (f"_b((({self.operand(conn['A'])}) != 0) {op} "
+                    f"(({self.operand(conn['B'])}) != 0))")
+        if kind in ("$shl", "$sshl"):
+            return f"_shl({a}, {self.operand(conn['B'])}) & {y_mask}"
+        if kind in ("$shr", "$sshr"):
+            # Logical shifts see the operand zero-extended
+            value = a if kind == "$sshr" else f"(({a}) & {_mask(max(len(conn['A']), y_width))})"
+            return f"_shr({value}, {self.operand(conn['B'])}) & {y_mask}"
+        if kind in ("$shift", "$shiftx"):
+            b = self.signed_operand(cell, "B")
+            return f"_shift(({a}) & {_mask(len(conn['A']))}, {b}) & {y_mask}"
+        if kind == "$mux":
+            return (f"np.where(({self.operand(conn['S'])}) != 0, {self.operand(conn['B'])}, "
+                    f"{self.operand(conn['A'])})")
+        if kind == "$pmux":
+            width = len(conn["A"])
+            expr = self.operand(conn["A"])
+            for i in reversed(range(len(conn["S"]))):
+                word = conn["B"][i * width:(i + 1) * width]
+                expr = f"np.where({self.operand([conn['S'][i]])} != 0, {self.operand(word)}, {expr})"
+            return expr
+        raise CodegenError(f"unsupported cell type {kind}")
+
+    def next_state(self, cell):
+        kind = cell["type"]
+        conn = cell["connections"]
+        params = cell["parameters"]
+        if not _int_param(params.get("CLK_POLARITY", 1)):
+            raise CodegenError("negative-edge flip-flops are not supported")
+        q = self.operand(conn["Q"])
+        d = self.operand(conn["D"])
+        expr = d
+        if "EN" in conn:
+            enabled = f"(({self.operand(conn['EN'])}) == {_int_param(params['EN_POLARITY'])})"
+        for reset in ("SRST", "ARST"):
+            if reset in conn:
+                active = f"(({self.operand(conn[reset])}) == {_int_param(params[reset + '_POLARITY'])})"
+                value = _int_param(params[reset + "_VALUE"])
+        if kind == "$dffe":
+            expr = f"np.where({enabled}, {d}, {q})"
+        elif kind in ("$sdff", "$adff"):
+            expr = f"np.where({active}, {value}, {d})"
+        elif kind in ("$sdffe", "$adffe"):
+            expr = f"np.where({active}, {value}, np.where({enabled}, {d}, {q}))"
+        elif kind == "$sdffce":
+            expr = f"np.where({enabled}, np.where({active}, {value}, {d}), {q})"
+        return expr
+
+    def ordered_cells(self):
+        """Combinational cells in dependency order."""
+        if self._order is not None:
+            return self._order
+        cells = {name: cell for name, cell in self.module["cells"].items()
+                 if cell["type"] not in _FLOPS | _IGNORED}
+        producer = {}
+        for name, cell in cells.items():
+            for bit in cell["connections"]["Y"]:
+                producer[bit] = name
+        pending = {}
+        users = defaultdict(list)
+        for name, cell in cells.items():
+            needs = {producer[bit] for port, bits in cell["connections"].items() if port != "Y"
+                     for bit in bits if isinstance(bit, int) and bit in producer}
+            pending[name] = len(needs)
+            for need in needs:
+                users[need].append(name)
+        ready = sorted(name for name, count in pending.items() if not count)
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for user in users[name]:
+                pending[user] -= 1
+                if not pending[user]:
+                    ready.append(user)
+        if len(order) != len(cells):
+            raise CodegenError("combinational loop")
+        self._order = [(name, cells[name]) for name in order]
+        return self._order
+
+    def function(self, name, doc, results, needed_bits):
+        """A function computing *results* (expressions) from only the cells they need."""
+        cells = self.ordered_cells()
+        producer = {bit: name for name, cell in cells for bit in cell["connections"]["Y"]}
+        needed = set()
+        stack = [producer[b] for b in needed_bits if b in producer]
+        by_name = dict(cells)
+        while stack:
+            cell_name = stack.pop()
+            if cell_name in needed:
+                continue
+            needed.add(cell_name)
+            stack += [producer[bit] for port, bits in by_name[cell_name]["connections"].items() if port != "Y"
+                      for bit in bits if isinstance(bit, int) and bit in producer]
+
+        lines = [f"def {name}(state, inputs):", f'    """{doc}"""']
+        for port, width in self.inputs.items():
+            lines.append(f"    i_{_ident(port)} = np.asarray(inputs.get({port!r}, 0), np.int64) & {_mask(width)}")
+        for index, (state, _) in enumerate(self.flops):
+            lines.append(f"    s{index} = state[{state!r}]")
+        for cell_name, cell in cells:
+            if cell_name in needed:
+                lines.append(f"    # {cell['type']} {cell_name}")
+                lines.append(f"    {self.bits[cell['connections']['Y'][0]][0]} = {self.expression(cell)}")
+        lines.append("    return {")
+        lines += [f"        {key!r}: {value}," for key, value in results]
+        lines.append("    }")
+        return lines
+
+    def generate(self, header):
+        for index, (name, cell) in enumerate(self.ordered_cells()):
+            self._define(f"c{index}", cell["connections"]["Y"])
+
+        widths = {state: len(cell["connections"]["Q"]) for state, cell in self.flops}
+        init = {}
+        for state, cell in self.flops:
+            aliases = [self.module["netnames"][name] for name in self.names.get(tuple(cell["connections"]["Q"]), [])]
+            values = [net["attributes"]["init"] for net in aliases if "init" in net.get("attributes", {})]
+            value = values[0] if values else None
+            init[state] = int(value.replace("x", "0"), 2) if isinstance(value, str) else 0
+
+        flop_bits = [bit for _, cell in self.flops for port in cell["connections"] if port != "Q"
+                     for bit in cell["connections"][port]]
+        output_bits = [bit for bits in self.outputs.values() for bit in bits]
+        lines = [header, _PRELUDE,
+                 f"INPUTS = {self.inputs!r}",
+                 f"STATE = {widths!r}",
+                 f"INIT = {init!r}",
+                 f"OUTPUTS = { {name: len(bits) for name, bits in self.outputs.items()}!r}",
+                 "", ""]
+        lines += self.function("next_state", "Register values after one rising clock edge.",
+                               [(state, self.next_state(cell)) for state, cell in self.flops], flop_bits)
+        lines += ["", ""]
+        lines += self.function("outputs", "Output port values for the current state and inputs.",
+                               [(name, self.operand(bits)) for name, bits in self.outputs.items()], output_bits)
+        return "\n".join(lines) + "\n"
+
+
+def _ident(name):
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+def generate(netlist, top=TOP, source_hash=""):
+    """Python source of the model of *top* in a parsed Yosys JSON export."""
+    header = (f"# Generated by rtl_codegen.py (version {GENERATOR_VERSION}) from {top}, "
+              f"RTL hash {source_hash or 'unknown'}.\n# Do not edit.\n")
+    return _Generator(netlist["modules"][top]).generate(header)
+
+
+def model_key(sources=None):
+    sources = sources or [SRC_DIR / name for name in SYSTEM_SOURCES]
+    text = f"v{GENERATOR_VERSION}:{TOP}:{rtl_hash(sources)}"
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def load_model(json_path=None, model_dir=MODEL_DIR):
+    """Import the generated model for the current RTL, regenerating it if needed.
+
+    With *json_path* the given Yosys export is used instead of running Yosys;
+    its model is cached under a hash of the JSON itself, never under the RTL
+    key, so it neither reuses nor replaces the model of the current sources.
+    """
+    model_dir = Path(model_dir)
+    source_hash = ""
+    if json_path is None:
+        key = source_hash = model_key()
+    else:
+        digest = hashlib.sha256(Path(json_path).read_bytes()).hexdigest()
+        key = hashlib.sha256(f"v{GENERATOR_VERSION}:{TOP}:json:{digest}".encode()).hexdigest()
+    path = model_dir / f"{key}.py"
+    if not path.exists():
+        model_dir.mkdir(parents=True, exist_ok=True)
+        if json_path is None:
+            json_path = model_dir / f"{key}.json"
+            run_yosys(json_path)
+        with open(json_path) as f:
+            source = generate(json.load(f), source_hash=source_hash)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(source)
+        os.replace(tmp, path)
+    spec = importlib.util.spec_from_file_location(f"rtl_model_{key[:12]}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class CompiledSystem:
+    """*n* instances of the generated model, starting from the register init values."""
+
+    def __init__(self, n=1, model=None):
+        self.n = n
+        self.model = model or load_model()
+        self.state = {name: np.full(n, self.model.INIT[name], np.int64) for name in self.model.STATE}
+
+    def outputs(self, **inputs):
+        return self.model.outputs(self.state, inputs)
+
+    def step(self, **inputs):
+        """One rising edge with *inputs* (port name -> per-instance values); returns outputs after it."""
+        self.state = self.model.next_state(self.state, inputs)
+        return self.model.outputs(self.state, inputs)
+
+
+def compare_with_model(n, cycles, rng, model=None, log=print):
+    """Random stimulus through :class:`CompiledSystem` and :class:`system_model.SystemModel`."""
+    from loader_model import FRAME_CYCLES, encode_frames
+    from neuron_model import NeuronParams
+    from pins import decode_inputs
+    from system_model import SystemModel
+
+    params = NeuronParams(*(rng.integers(0, 1 << bits, n) for bits in (3, 3, 8, 8, 4)))
+    ui_in = rng.integers(0, 256, (cycles, n)).astype(np.uint8) & np.uint8(0b11111001)
+    # The generated registers start at 0 where the RTL has x, so the first
+    # reset edge copies threshold_min = 0 into the neuron; a second one
+    # starts both models from the state a reset held for several cycles leaves.
+    ui_in[2:2 + FRAME_CYCLES] = encode_frames(params).T
+    uio_in = rng.integers(0, 2, (cycles, n)).astype(np.uint8)
+    rst_n = np.ones(cycles, np.uint8)
+    rst_n[:2] = 0
+
+    reference = SystemModel(n)
+    compiled = CompiledSystem(n, model)
+    for t in range(cycles):
+        out = compiled.step(clk=0, reset=1 - rst_n[t], enable=1, **decode_inputs(ui_in[t], uio_in[t])._asdict())
+        reference.step(ui_in[t], uio_in[t], rst_n[t])
+        expected = {"spike_out": reference.neuron.spike_out, "v_mem_out": reference.neuron.v_mem_out,
+                    "params_ready": reference.loader.params_ready}
+        for port, value in expected.items():
+            bad = np.flatnonzero(out[port] != value)
+            if len(bad):
+                log(f"MISMATCH: {port} at cycle {t}, instance {bad[0]}: "
+                    f"generated {int(out[port][bad[0]])}, hand-written {int(value[bad[0]])}")
+                return False
+    log(f"{n} instances x {cycles} cycles match")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--json", help="use this Yosys JSON export instead of running yosys")
+    parser.add_argument("--check", action="store_true", help="compare with system_model.SystemModel")
+    parser.add_argument("--instances", type=int, default=4096)
+    parser.add_argument("--cycles", type=int, default=500)
+    args = parser.parse_args()
+
+    model = load_model(args.json)
+    print(f"model: {model.__file__}")
+    if args.check and not compare_with_model(args.instances, args.cycles, np.random.default_rng(0), model):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
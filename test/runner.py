@@ -0,0 +1,276 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Parallel cocotb regression on the cocotb Python runner API.
+
+The testbench is compiled once into ``sim_build/<rtl|gl>``.  Every
+(testcase, seed) pair then runs as its own simulator process on a process
+pool, in a private directory under ``sim_build/<rtl|gl>/runs`` holding a
+copy of the compiled ``sim.vvp``, the stimulus/capture files, the waveform,
+the simulator log and its ``results.xml``.  When all jobs are done their
+JUnit files are merged into one ``results.xml`` (``test/results.xml`` by
+default, where CI looks for failures).
+
+Every ``*.trace`` a job writes (see trace_file.py) is turned into
+functional coverage in the worker and saved as ``coverage.npz`` in the job
+directory.  With ``--until-covered`` seeds are issued one job at a time and
+the regression stops once the merged coverage (saved next to
+``results.xml``) hits every reachable bin, or after ``--plateau`` jobs in
+a row that hit nothing new; ``--seeds`` is then the upper bound.  Jobs get
+the coverage merged so far as ``+COVERAGE_FILE`` so that ``test_directed``
+aims at the bins still missing.
+
+Usage::
+
+    python runner.py [--seeds 8] [--seed-base 0] [--tests test_lockstep ...]
+                     [--gates] [--processes N] [--clk-period-ns 10000]
+                     [--until-covered [--plateau 16]]
+"""
+
+import argparse
+import ast
+import itertools
+import multiprocessing
+import os
+import queue
+import shutil
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from cocotb.runner import get_runner
+
+from build_cache import build_key, fetch, iverilog_path, store, tool_version
+from func_coverage import Coverage
+from sources import GL_DEFINES, SRC_DIR, TEST_DIR, verilog_sources
+
+SIM = os.environ.get("SIM", "icarus")
+TOPLEVEL = "tb"
+TEST_MODULE = "test"
+
+_job_config = {}
+
+
+def list_tests(module=TEST_MODULE):
+    """Names of the ``@cocotb.test()`` coroutines in *module*, in file order."""
+    tree = ast.parse((TEST_DIR / f"{module}.py").read_text())
+    names = []
+    for node in tree.body:
+        if not isinstance(node, ast.AsyncFunctionDef):
+            continue
+        for decorator in node.decorator_list:
+            target = decorator.func if isinstance(decorator, ast.Call) else decorator
+            if ast.unparse(target) == "cocotb.test":
+                names.append(node.name)
+    return names
+
+
+def build(gates=False, parameters=None, clean=False):
+    """Compile the testbench once; returns the build directory.
+
+    Icarus builds go through the content-hash cache in build_cache.py.
+    """
+    build_dir = TEST_DIR / "sim_build" / ("gl" if gates else "rtl")
+    sources = verilog_sources(gates)
+    defines = GL_DEFINES if gates else {}
+    parameters = parameters or {}
+
+    key = None
+    if SIM == "icarus" and not clean:
+        key = build_key(sources, [SRC_DIR], defines, parameters, flags=["runner", TOPLEVEL],
+                        tool=tool_version(iverilog_path()))
+        if fetch(key, build_dir / "sim.vvp"):
+            return build_dir
+
+    get_runner(SIM).build(
+        verilog_sources=sources,
+        includes=[SRC_DIR],
+        defines=defines,
+        parameters=parameters,
+        hdl_toplevel=TOPLEVEL,
+        build_dir=build_dir,
+        always=True,
+        clean=clean,
+    )
+    if key:
+        store(key, build_dir / "sim.vvp")
+    return build_dir
+
+
+def _init_worker(build_dir, plusargs):
+    _job_config.update(build_dir=Path(build_dir), plusargs=list(plusargs))
+    # The runner passes sys.path on as PYTHONPATH, which must find test.py.
+    if str(TEST_DIR) not in sys.path:
+        sys.path.insert(0, str(TEST_DIR))
+
+
+def job_dir(build_dir, test, seed):
+    return Path(build_dir) / "runs" / f"{test}-{seed}"
+
+
+def _run_job(job):
+    """Run one testcase with one seed in its own directory."""
+    test, seed = job
+    build_dir = _job_config["build_dir"]
+    work = job_dir(build_dir, test, seed)
+    if work.exists():
+        shutil.rmtree(work)
+    work.mkdir(parents=True)
+    shutil.copy2(build_dir / "sim.vvp", work / "sim.vvp")
+
+    results = work / "results.xml"
+    try:
+        get_runner(SIM).test(
+            test_module=TEST_MODULE,
+            hdl_toplevel=TOPLEVEL,
+            testcase=test,
+            seed=seed,
+            plusargs=_job_config["plusargs"],
+            build_dir=work,
+            test_dir=work,
+            results_xml=str(results),
+            log_file=work / "sim.log",
+        )
+    except Exception as exc:    # simulator crashed or exited non-zero
+        (work / "runner_error.txt").write_text(f"{exc!r}\n")
+    return test, seed, results if results.is_file() else None, job_coverage(work)
+
+
+def job_coverage(work):
+    """Save the coverage of every trace in *work* as ``coverage.npz``; returns its path or None."""
+    traces = sorted(Path(work).glob("*.trace"))
+    if not traces:
+        return None
+    coverage = Coverage()
+    for trace in traces:
+        try:
+            coverage.merge(Coverage.from_trace(trace))
+        except ValueError as exc:   # not a trace, or the run failed its scoreboard
+            with open(Path(work) / "runner_error.txt", "a") as f:
+                f.write(f"{trace.name}: {exc}\n")
+    path = Path(work) / "coverage.npz"
+    coverage.save(path)
+    return path
+
+
+def merge_results(jobs, out_path, tag_seeds=True):
+    """Merge per-job JUnit files into *out_path*; returns ``(tests, failures)``.
+
+    *jobs* yields ``(test, seed, results_path)``.  A job without a results
+    file is recorded as a failed testcase so a crashed simulator cannot
+    pass silently.
+    """
+    root = ET.Element("testsuites", name="results")
+    tests = failures = 0
+    for test, seed, path in jobs:
+        if path is None:
+            suite = ET.Element("testsuite", name="all", package="all")
+            case = ET.SubElement(suite, "testcase", name=test, classname=TEST_MODULE)
+            ET.SubElement(case, "failure", message="simulator terminated without writing results.xml")
+            suites = [suite]
+        else:
+            suites = list(ET.parse(path).getroot().iter("testsuite"))
+        root.extend(suites)
+        for case in (case for suite in suites for case in suite.iter("testcase")):
+            if tag_seeds:
+                case.set("name", f"{case.get('name')}[seed={seed}]")
+            tests += 1
+            failures += any(True for _ in case.iter("failure"))
+    ET.ElementTree(root).write(out_path, encoding="UTF-8", xml_declaration=True)
+    return tests, failures
+
+
+def save_atomic(coverage, path):
+    """Save *coverage* so that a job loading *path* never sees a partial file."""
+    partial = Path(path).with_suffix(".partial.npz")
+    coverage.save(partial)
+    os.replace(partial, path)
+
+
+def run_regression(tests=None, seeds=(0,), gates=False, processes=None, plusargs=(),
+                   parameters=None, out_path=TEST_DIR / "results.xml", log=print,
+                   until_covered=False, plateau=16):
+    """Compile once, run every (test, seed) pair in parallel and merge the results.
+
+    With *until_covered*, jobs are issued only while the merged coverage is
+    incomplete and the last *plateau* jobs added a bin.
+    """
+    tests = tests or list_tests()
+    jobs = [(test, seed) for seed in seeds for test in tests]
+    build_dir = build(gates, parameters)
+
+    processes = min(processes or os.cpu_count(), len(jobs))
+    log(f"{len(jobs)} jobs on {processes} processes")
+    finished = []
+    coverage = Coverage()
+    coverage_path = Path(out_path).with_name("coverage.npz")
+    if until_covered:
+        coverage.save(coverage_path)
+        plusargs = [*plusargs, f"+COVERAGE_FILE={coverage_path}"]
+    stale = 0
+    done = queue.SimpleQueue()
+    pending = iter(jobs)
+    running = 0
+    with multiprocessing.Pool(processes, _init_worker, (build_dir, plusargs)) as pool:
+        def submit(count=1):
+            nonlocal running
+            for job in itertools.islice(pending, count):
+                pool.apply_async(_run_job, (job,), callback=done.put, error_callback=done.put)
+                running += 1
+
+        submit(len(jobs) if not until_covered else processes)
+        while running:
+            outcome = done.get()
+            running -= 1
+            if isinstance(outcome, BaseException):
+                raise outcome
+            test, seed, results, job_coverage_path = outcome
+            finished.append((test, seed, results))
+            new = coverage.merge(Coverage.load(job_coverage_path)) if job_coverage_path else 0
+            stale = 0 if new else stale + 1
+            if until_covered and new:
+                save_atomic(coverage, coverage_path)
+            status = "done" if results else "CRASHED"
+            log(f"[{len(finished)}/{len(jobs)}] {test} seed={seed} {status}, "
+                f"coverage {coverage.hit}/{coverage.goal} (+{new})")
+            if until_covered and not coverage.complete and stale < plateau:
+                submit()
+
+    if until_covered and len(finished) < len(jobs):
+        reason = "coverage complete" if coverage.complete else f"no new bins in {plateau} jobs"
+        log(f"stopped after {len(finished)} jobs: {reason}")
+    coverage.save(coverage_path)
+    log(coverage.report())
+
+    order = {job: i for i, job in enumerate(jobs)}
+    finished.sort(key=lambda job: order[job[:2]])
+    total, failures = merge_results(finished, out_path, tag_seeds=len(seeds) > 1)
+    log(f"{total - failures}/{total} passed, results in {out_path}, coverage in {coverage_path}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tests", nargs="*", default=None)
+    parser.add_argument("--seeds", type=int, default=1)
+    parser.add_argument("--seed-base", type=int, default=0)
+    parser.add_argument("--gates", action="store_true")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--clk-period-ns", type=int, default=None)
+    parser.add_argument("--n-inst", type=int, default=None)
+    parser.add_argument("--out", default=str(TEST_DIR / "results.xml"))
+    parser.add_argument("--until-covered", action="store_true",
+                        help="stop issuing seeds once functional coverage is complete")
+    parser.add_argument("--plateau", type=int, default=16,
+                        help="with --until-covered, also stop after this many jobs without a new bin")
+    args = parser.parse_args()
+
+    plusargs = [f"+CLK_PERIOD_NS={args.clk_period_ns}"] if args.clk_period_ns else []
+    parameters = {"N_INST": args.n_inst} if args.n_inst else {}
+    seeds = range(args.seed_base, args.seed_base + args.seeds)
+    failures = run_regression(args.tests, seeds, args.gates, args.processes, plusargs, parameters, args.out,
+                              until_covered=args.until_covered, plateau=args.plateau)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Lockstep scoreboard checking the DUT against :class:`system_model.SystemModel`.
+
+The model predicts ``uo_out`` (spike in bit 0, ``v_mem_out`` in bits 7:1) and
+``uio_out`` for a block of stimulus at once, and captured DUT outputs are
+compared a window of cycles at a time with a single array comparison.  On
+the first divergence a :class:`ScoreboardError` reports the cycle, the
+inputs, expected and actual outputs, and every model register at that cycle.
+
+:func:`run_lockstep` ties this to stimulus playback and response capture so
+that long runs never touch ``dut.uo_out`` from Python.
+"""
+
+import numpy as np
+from cocotb.triggers import FallingEdge
+
+from capture import flush_capture, fresh_reader, start_capture, stop_capture
+from pins import decode_outputs
+from playback import play_stimulus
+from system_model import SystemModel
+from waves import around, plusarg_windows, schedule_windows
+
+# Internal registers shown in mismatch reports when simulating RTL
+DUT_REGISTERS = {
+    "neuron": ("v_mem", "threshold", "refr_cnt", "leak_counter", "spike_out"),
+    "loader": ("current_state", "shift_reg", "bit_count", "weight_a", "weight_b",
+               "leak_rate", "threshold_min", "leak_cycles", "params_ready"),
+}
+
+
+class ScoreboardError(AssertionError):
+    """The DUT diverged from the reference model at stimulus cycle ``cycle``."""
+
+    def __init__(self, message, cycle=None):
+        super().__init__(message)
+        self.cycle = cycle
+
+
+def _describe(uo_out, uio_out):
+    outputs = decode_outputs(uo_out, uio_out)
+    return " ".join(f"{name}={int(value)}" for name, value in zip(outputs._fields, outputs))
+
+
+def dut_registers(dut):
+    """Current internal registers of an RTL DUT (empty for gate-level runs)."""
+    try:
+        system = dut.user_project.system_inst
+        blocks = {"neuron": system.neuron, "loader": system.loader}
+        return {f"{block}.{name}": str(getattr(handle, name).value)
+                for block, handle in blocks.items() for name in DUT_REGISTERS[block]}
+    except AttributeError:
+        return {}
+
+
+class Scoreboard:
+    """Compare observed outputs with the model in windows of *window* cycles."""
+
+    def __init__(self, window=1024, model=None, dut=None):
+        self.window = window
+        self.model = model or SystemModel(1)
+        self.dut = dut
+        self.compared = 0
+        self._pending = []      # (first cycle, model state, ui_in, uio_in) per expect() call
+        self._expected = []
+        self._observed = []
+        self._buffered = 0
+        self._expected_cycles = 0
+
+    def expect(self, ui_in, uio_in=0):
+        """Feed stimulus to the model and queue its predicted outputs."""
+        ui_in = np.asarray(ui_in, np.uint8)
+        uio_in = np.broadcast_to(np.asarray(uio_in, np.uint8), ui_in.shape)
+        self._pending.append((self._expected_cycles, self.model.state(), ui_in, uio_in))
+        uo_out, uio_out = self.model.run(ui_in, uio_in)
+        self._expected.append((uo_out[:, 0], uio_out[:, 0]))
+        self._expected_cycles += len(ui_in)
+
+    def observe(self, capture):
+        """Queue captured outputs and compare every complete window."""
+        self._observed.append(capture)
+        self._buffered += len(capture.uo_out)
+        while self._buffered >= self.window:
+            self._compare(self.window)
+
+    def finish(self):
+        """Compare whatever is left; every expected cycle must have been observed."""
+        if self._buffered:
+            self._compare(self._buffered)
+        if self.compared != self._expected_cycles:
+            raise ScoreboardError(f"observed {self.compared} cycles but expected {self._expected_cycles}")
+
+    def _take(self, queue, count):
+        """Pop *count* rows from a queue of column tuples."""
+        columns = []
+        while sum(len(c[0]) for c in columns) < count:
+            columns.append(queue.pop(0))
+        merged = [np.concatenate(parts) for parts in zip(*columns)]
+        spill = sum(len(c[0]) for c in columns) - count
+        if spill:
+            queue.insert(0, tuple(column[-spill:] for column in merged))
+        return [column[:count] for column in merged]
+
+    def _compare(self, count):
+        if self._expected_cycles - self.compared < count:
+            raise ScoreboardError(f"observed outputs for cycle {self._expected_cycles} with no stimulus")
+        uo_exp, uio_exp = self._take(self._expected, count)
+        uo_out, uio_out, uo_xz, uio_xz = self._take(self._observed, count)
+        self._buffered -= count
+        bad = (uo_out != uo_exp) | (uio_out != uio_exp) | (uo_xz != 0) | (uio_xz != 0)
+        if bad.any():
+            offset = int(np.argmax(bad))
+            self._report(self.compared + offset, uo_exp[offset], uio_exp[offset],
+                         uo_out[offset], uio_out[offset], uo_xz[offset], uio_xz[offset])
+        self.compared += count
+        while len(self._pending) > 1 and self._pending[1][0] <= self.compared:
+            self._pending.pop(0)
+
+    def _report(self, cycle, uo_exp, uio_exp, uo_out, uio_out, uo_xz, uio_xz):
+        # Replay the model from the last saved state up to the divergent edge.
+        start, regs, ui_in, uio_in = next(p for p in reversed(self._pending) if p[0] <= cycle)
+        replay = SystemModel(1)
+        replay.load_state(regs)
+        replay.run(ui_in[:cycle - start], uio_in[:cycle - start])
+        before = replay.state()
+        replay.step(ui_in[cycle - start], uio_in[cycle - start])
+        after = replay.state()
+
+        lines = [
+            f"DUT diverged from the model at cycle {cycle}",
+            f"  inputs:   ui_in=0x{ui_in[cycle - start]:02x} uio_in=0x{uio_in[cycle - start]:02x}",
+            f"  expected: {_describe(uo_exp, uio_exp)}",
+            f"  actual:   {_describe(uo_out, uio_out)}"
+            + (f" (x/z bits uo_out=0x{uo_xz:02x} uio_out=0x{uio_xz:02x})" if uo_xz or uio_xz else ""),
+            "  model registers before -> after the edge:",
+        ]
+        lines += [f"    {name} = {int(before[name][0])} -> {int(after[name][0])}" for name in before]
+        if self.dut is not None:
+            regs = dut_registers(self.dut)
+            if regs:
+                lines.append(f"  DUT registers now (up to {self.window} cycles later):")
+                lines += [f"    {name} = {value}" for name, value in regs.items()]
+        start, stop = around(cycle)
+        lines.append(f"  trace it with: make DUMP=tb.fst DUMP_WINDOWS={start}:{stop} (same seed)")
+        raise ScoreboardError("\n".join(lines), cycle)
+
+
+async def run_lockstep(dut, ui_in, uio_in=0, window=4096, scoreboard=None, dump_windows=None, trace=None):
+    """Play stimulus through the ROM while checking captured outputs.
+
+    The DUT and ``scoreboard.model`` must be in the same state on entry,
+    e.g. both just out of reset.  Stimulus is played and checked one window
+    at a time, so a divergence is reported at most one window late.
+    *dump_windows* (default: ``+DUMP_WINDOWS``) are waveform windows in
+    stimulus cycles; see waves.py.  Each checked cycle is also appended to
+    *trace* (a :class:`trace_file.TraceWriter`) if given, before it is
+    compared, so a failing run keeps the cycles up to the divergence.
+    """
+    scoreboard = scoreboard or Scoreboard(window, dut=dut)
+    ui_in = np.asarray(ui_in, np.uint8)
+    uio_in = np.broadcast_to(np.asarray(uio_in, np.uint8), ui_in.shape)
+
+    # With the clock high on entry, the first captured row holds the outputs
+    # from before the stimulus.  With it low, play_stimulus puts word 0 on
+    # the pins for the coming rising edge, so the first row is already its
+    # response.
+    skip = 0 if dut.clk.value.binstr == "0" else 1
+    reader = fresh_reader(dut)
+
+    schedule_windows(dut, plusarg_windows() if dump_windows is None else dump_windows)
+    start_capture(dut)
+    done = 0
+
+    def observe(rows):
+        nonlocal done
+        if trace is not None:
+            end = done + len(rows.uo_out)
+            trace.append(ui_in[done:end], uio_in[done:end], rows.uo_out, rows.uio_out)
+        done += len(rows.uo_out)
+        scoreboard.observe(rows)
+
+    for lo in range(0, len(ui_in), window):
+        scoreboard.expect(ui_in[lo:lo + window], uio_in[lo:lo + window])
+        await play_stimulus(dut, ui_in[lo:lo + window], uio_in[lo:lo + window])
+        await flush_capture(dut)
+        rows = reader.read_new()
+        observe(type(rows)(*(column[skip:] for column in rows)))
+        skip = 0
+
+    # The response to the last word is written on the next falling edge.
+    await FallingEdge(dut.clk)
+    await stop_capture(dut)
+    observe(reader.read_new())
+    scoreboard.finish()
+    return scoreboard
@@ -0,0 +1,50 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Locations of the RTL sources shared by the Python tooling."""
+
+import hashlib
+import os
+from pathlib import Path
+
+TEST_DIR = Path(__file__).resolve().parent
+SRC_DIR = TEST_DIR.parent / "src"
+
+# Results derived from the design (rate maps, compiled testbenches, ...)
+CACHE_DIR = Path(os.environ.get("LIF_CACHE_DIR", TEST_DIR / ".lif_cache"))
+
+# Keep in sync with PROJECT_SOURCES in the Makefile
+PROJECT_SOURCES = ["project.v", "lif_neuron.v", "lif_neuron_system.v", "lif_data_loader.v"]
+
+# Gate-level simulation, as selected by GATES=yes in the Makefile
+GL_DEFINES = {"GL_TEST": 1, "FUNCTIONAL": 1, "SIM": 1}
+GL_NETLIST = TEST_DIR / "gate_level_netlist.v"
+
+
+def gl_cell_sources():
+    """The sg13g2 cell models under ``$PDK_ROOT`` used by the netlist."""
+    libs = Path(os.environ["PDK_ROOT"]) / "ihp-sg13g2" / "libs.ref"
+    return [libs / "sg13g2_io" / "verilog" / "sg13g2_io.v",
+            libs / "sg13g2_stdcell" / "verilog" / "sg13g2_stdcell.v"]
+
+
+def verilog_sources(gates=False):
+    """Everything compiled for the ``tb`` toplevel, in Makefile order."""
+    if gates:
+        design = gl_cell_sources() + [GL_NETLIST]
+    else:
+        design = [SRC_DIR / name for name in PROJECT_SOURCES]
+    return design + [TEST_DIR / "tb.v"]
+
+
+def rtl_hash(files=None):
+    """SHA-256 over the contents of the RTL sources (all of them by default).
+
+    Used to key caches of results derived from the RTL, so that any edit to
+    the design invalidates them.
+    """
+    digest = hashlib.sha256()
+    for path in files or [SRC_DIR / name for name in PROJECT_SOURCES]:
+        path = Path(path)
+        digest.update(path.name.encode() + b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
@@ -0,0 +1,230 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Coverage-directed constrained-random stimulus and configurations.
+
+Pure random stimulus keeps re-hitting the same :mod:`func_coverage` bins;
+the corners (a ``chan_a x weight_a`` product of 32 or more wrapping
+``contrib_a``, ``leak_cycles = 0``, ``threshold_min >= 128`` where
+``threshold_max`` overflows, a load aborted at a given bit) are rare.
+:func:`generate` builds the stimulus one segment at a time instead:
+
+1. pick an unhit goal bin and draw a :class:`Segment` constrained to reach
+   it, a configuration frame (possibly cut short to abort the load in a
+   given state and bit) followed by a few held-input runs;
+2. replay each of *tries* such candidates through a copy of
+   :class:`system_model.SystemModel` from the state the previous segments
+   left, and keep the one that hits the most new bins;
+3. drop the segment if none hits anything, so simulator time is only spent
+   on stimulus the model has shown to add coverage.
+
+The result is one ``ui_in``/``uio_in`` stream, played from reset, e.g.
+through :func:`scoreboard.run_lockstep`.
+"""
+
+import argparse
+from typing import NamedTuple
+
+import numpy as np
+
+from func_coverage import GOALS, SHAPES, Coverage, label
+from loader_model import FIELD_CYCLES, encode_frames
+from neuron_model import NeuronParams, _signed
+from pins import encode_inputs
+from system_model import SystemModel
+
+# Bounds on the held-input runs of one segment
+RUNS = (1, 6)
+RUN_CYCLES = (1, 48)
+
+
+def _weighted_sums():
+    """``weighted_sum`` -> array of ``(chan_a, weight_a, chan_b, weight_b)`` forming it."""
+    combos = np.stack(np.meshgrid(*[np.arange(8)] * 4, indexing="ij"), axis=-1).reshape(-1, 4)
+    values = _signed(combos[:, 0] * combos[:, 1], 6) - _signed(combos[:, 2] * combos[:, 3], 6)
+    return {int(v): combos[values == v] for v in np.unique(values)}
+
+
+_WEIGHTED_SUMS = _weighted_sums()
+
+# (chan, weight) pairs whose product is large but does not wrap
+_EXCITE = np.argwhere((np.arange(8)[:, None] * np.arange(8) >= 16) & (np.arange(8)[:, None] * np.arange(8) < 32))
+
+
+class Segment(NamedTuple):
+    """One candidate: the bin it aims at, the configuration and its pins.
+
+    :func:`segment` records the configuration sent; :func:`generate` replaces
+    it with the one the model holds after the segment, which for an aborted
+    load keeps the fields the earlier segments left past the abort.
+    """
+
+    target: str
+    params: NeuronParams
+    ui_in: np.ndarray
+    uio_in: np.ndarray
+
+
+class Directed(NamedTuple):
+    ui_in: np.ndarray
+    uio_in: np.ndarray
+    segments: list
+    coverage: Coverage
+
+
+def _random_params(rng):
+    return dict(weight_a=rng.integers(8), weight_b=rng.integers(8), leak_rate=rng.integers(256),
+                threshold_min=rng.integers(256), leak_cycles=rng.integers(16))
+
+
+def _excite(rng, params):
+    """Drive the neuron hard: a large unwrapped ``contrib_a`` and no inhibition."""
+    chan_a, weight_a = _EXCITE[rng.integers(len(_EXCITE))]
+    params.update(weight_a=weight_a, weight_b=0)
+    return {"chan_a": chan_a}
+
+
+def constrain(group, index, rng):
+    """Parameter and input constraints aimed at bin *index* of *group*.
+
+    Returns ``(params, inputs, abort)``: a parameter dict, fixed input
+    fields for the runs, and the number of loading cycles after which the
+    load is abandoned (None for a complete frame).
+    """
+    params = _random_params(rng)
+    inputs = {"input_enable": 1}
+    abort = None
+    if group in ("product_a", "product_b"):
+        side = group[-1]
+        params[f"weight_{side}"] = index[1]
+        inputs[f"chan_{side}"] = index[0]
+    elif group == "weighted_sum":
+        combos = _WEIGHTED_SUMS[int(index[0]) - 63]
+        chan_a, weight_a, chan_b, weight_b = combos[rng.integers(len(combos))]
+        params.update(weight_a=weight_a, weight_b=weight_b)
+        inputs.update(chan_a=chan_a, chan_b=chan_b)
+    elif group == "threshold_max":
+        inputs.update(_excite(rng, params))
+        # A full 8-bit leak could hold v_mem below the higher thresholds.
+        params["leak_rate"] = rng.integers(3)
+        params["threshold_min"] = (index[0] << 5) | rng.integers(32)
+        params["leak_cycles"] = 15
+    elif group == "refractory":
+        inputs.update(_excite(rng, params))
+        params["leak_rate"] = rng.integers(3)
+        # Re-entry needs a spike on the first edge after the exit.
+        params["threshold_min"] = rng.integers(4) if index[0] == 2 else rng.integers(64)
+    elif group == "leak":
+        params["leak_cycles"] = index[0]
+        if index[1]:
+            # Let leak_counter run on through refractory or with input_enable low.
+            if rng.integers(2):
+                inputs.update(_excite(rng, params))
+                params["leak_rate"] = rng.integers(3)
+            else:
+                inputs["input_enable"] = None
+            params["threshold_min"] = rng.integers(32)
+    elif group == "loader_abort":
+        abort = 1 + FIELD_CYCLES * index[0] + index[1]
+    return params, inputs, abort
+
+
+def segment(group, index, rng):
+    """A random :class:`Segment` drawn under :func:`constrain` for one bin."""
+    params, inputs, abort = constrain(group, index, rng)
+    params = NeuronParams(**{name: int(value) for name, value in params.items()})
+    frame = encode_frames(params)[0]
+    if abort is not None:
+        frame = frame[:abort]
+
+    runs = rng.integers(*RUNS, endpoint=True)
+    lengths = rng.integers(*RUN_CYCLES, runs, endpoint=True)
+    fields = {name: rng.integers(8, size=runs) for name in ("chan_a", "chan_b")}
+    fields["input_enable"] = rng.integers(2, size=runs)
+    for name, value in inputs.items():
+        if value is not None:
+            fields[name] = np.full(runs, value)
+    ui_in, uio_in = encode_inputs(**{name: np.repeat(value, lengths) for name, value in fields.items()})
+    return Segment(label(group, index), params, np.concatenate([frame, ui_in]),
+                   np.concatenate([np.zeros_like(frame), uio_in]))
+
+
+def _pick(missing, rng):
+    """A random unhit bin, each group with an unhit bin equally likely."""
+    groups = [name for name, indices in missing.items() if len(indices)]
+    if not groups:
+        name = list(SHAPES)[rng.integers(len(SHAPES))]
+        return name, tuple(rng.integers(size) for size in SHAPES[name])
+    name = groups[rng.integers(len(groups))]
+    return name, tuple(missing[name][rng.integers(len(missing[name]))])
+
+
+def _gain(coverage, hit):
+    return int(sum((hit.bins[name] & GOALS[name] & ~coverage.bins[name]).sum() for name in SHAPES))
+
+
+def generate(coverage=None, rng=None, cycles=20000, tries=8, patience=64, log=None):
+    """Build up to *cycles* of directed stimulus, played from reset.
+
+    *coverage* (e.g. the merged coverage of earlier jobs) is what counts
+    as already hit; it is not modified.  Each kept segment is the best of
+    *tries* candidates replayed through the model; generation stops at
+    *cycles*, when every goal bin is hit, or after *patience* rounds
+    without a candidate that hits a new bin.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    hit = Coverage(coverage.bins if coverage is not None else None)
+    model = SystemModel(1)
+    segments = []
+    total = stale = 0
+    while total < cycles and not hit.complete and stale < patience:
+        missing = hit.missing()
+        best = None
+        for _ in range(tries):
+            candidate = segment(*_pick(missing, rng), rng)
+            # Replay on a copy so only the kept candidate advances the model.
+            trial = SystemModel(1)
+            trial.memo = model.memo
+            trial.load_state(model.state())
+            reached = Coverage.from_stimulus(candidate.ui_in, candidate.uio_in, trial)
+            gain = _gain(hit, reached)
+            if best is None or gain > best[0]:
+                best = gain, candidate, trial, reached
+        gain, candidate, trial, reached = best
+        if not gain:
+            stale += 1
+            continue
+        stale = 0
+        model = trial
+        candidate = candidate._replace(params=NeuronParams(*(int(field[0]) for field in model.loader.fields)))
+        hit.merge(reached)
+        segments.append(candidate)
+        total += len(candidate.ui_in)
+        if log is not None:
+            log(f"{total:6} cycles  +{gain:3} bins  {hit.hit}/{hit.goal}  {candidate.target}")
+
+    if not segments:
+        return Directed(np.zeros(0, np.uint8), np.zeros(0, np.uint8), segments, hit)
+    return Directed(np.concatenate([part.ui_in for part in segments]),
+                    np.concatenate([part.uio_in for part in segments]), segments, hit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--coverage", help="merged coverage (.npz) to treat as already hit")
+    parser.add_argument("--cycles", type=int, default=20000)
+    parser.add_argument("--tries", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", help="save the stimulus as run-length encoded .npz (see rle.py)")
+    args = parser.parse_args()
+
+    coverage = Coverage.load(args.coverage) if args.coverage else None
+    directed = generate(coverage, np.random.default_rng(args.seed), args.cycles, args.tries, log=print)
+    print(directed.coverage.report())
+    if args.out:
+        from rle import encode, save
+
+        save(args.out, encode(directed.ui_in, directed.uio_in))
+
+
+if __name__ == "__main__":
+    main()
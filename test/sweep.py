@@ -0,0 +1,181 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Exhaustive sweep of the loader parameter space on a process pool.
+
+Every combination of weight_a, weight_b, leak_rate, threshold_min and
+leak_cycles (8 x 8 x 256 x 256 x 16, about 67M configurations in 1024
+shards) is run from reset for ``horizon`` cycles under one constant
+stimulus with the NumPy model.  Results are written by the workers straight
+into memory-mapped ``.npy`` columns of shape ``SWEEP_SHAPE`` in the output
+directory, so nothing but shard numbers travels back through the pool.
+
+A shard takes about 1.6 s per 1000 cycles of horizon on one core, so the
+default sweep is roughly half an hour of CPU time, divided by the number of
+processes; the five columns take 1.3 GB.
+
+A ``done.npy`` mask records finished shards.  Re-running the same command
+on the same directory skips them, so a killed sweep resumes where it
+stopped.
+
+Usage::
+
+    python sweep.py OUT_DIR --chan-a 3 --chan-b 0 [--horizon 1000] [--processes N]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+from pathlib import Path
+
+import numpy as np
+
+from neuron_model import NeuronArray, NeuronParams
+from sources import rtl_hash
+
+# weight_a, weight_b, leak_rate, threshold_min, leak_cycles
+SWEEP_SHAPE = (8, 8, 256, 256, 16)
+
+# A shard fixes weight_a, weight_b and a block of leak_rate values, and
+# covers every threshold_min and leak_cycles: 16 * 256 * 16 configurations.
+SHARD_LEAK_RATES = 16
+SHARD_SHAPE = (8, 8, 256 // SHARD_LEAK_RATES)
+SHARD_COUNT = int(np.prod(SHARD_SHAPE))
+
+COLUMNS = {
+    "spike_count": np.int32,    # spikes within the horizon
+    "first_spike": np.int32,    # cycles from reset to the first spike, -1 if none
+    "first_isi": np.int32,      # first inter-spike interval, -1 if fewer than two spikes
+    "last_isi": np.int32,       # last inter-spike interval, -1 if fewer than two spikes
+    "adaptation": np.float32,   # last_isi / first_isi, NaN if undefined
+}
+
+
+def config_params(index):
+    """Loader parameters for flat index (or indices) into ``SWEEP_SHAPE``."""
+    return NeuronParams(*np.unravel_index(index, SWEEP_SHAPE))
+
+
+def shard_slice(shard):
+    """Index expression selecting a shard in a ``SWEEP_SHAPE`` column."""
+    weight_a, weight_b, block = np.unravel_index(shard, SHARD_SHAPE)
+    leak_lo = block * SHARD_LEAK_RATES
+    return (int(weight_a), int(weight_b), slice(int(leak_lo), int(leak_lo) + SHARD_LEAK_RATES))
+
+
+def simulate_shard(shard, chan_a, chan_b, horizon, input_enable=1):
+    """Run one shard from reset and return its metric columns (shard-shaped)."""
+    weight_a, weight_b, leak_rates = shard_slice(shard)
+    leak_rate, threshold_min, leak_cycles = np.meshgrid(
+        np.arange(leak_rates.start, leak_rates.stop), np.arange(256), np.arange(16), indexing="ij")
+    shape = leak_rate.shape
+    neurons = NeuronArray(leak_rate.size, NeuronParams(
+        weight_a, weight_b, leak_rate.ravel(), threshold_min.ravel(), leak_cycles.ravel()))
+
+    count = np.zeros(neurons.n, np.int32)
+    first = np.full(neurons.n, -1, np.int32)
+    last = np.full(neurons.n, -1, np.int32)
+    first_isi = np.full(neurons.n, -1, np.int32)
+    last_isi = np.full(neurons.n, -1, np.int32)
+    for t in range(horizon):
+        spike = neurons.step(chan_a, chan_b, input_enable)
+        if not spike.any():
+            continue
+        again = spike & (last >= 0)
+        isi = t - last
+        first_isi = np.where(again & (first_isi < 0), isi, first_isi)
+        last_isi = np.where(again, isi, last_isi)
+        first = np.where(spike & (first < 0), t + 1, first)
+        last = np.where(spike, t, last)
+        count += spike
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        adaptation = np.where(first_isi > 0, last_isi / first_isi, np.nan)
+    metrics = {
+        "spike_count": count,
+        "first_spike": first,
+        "first_isi": first_isi,
+        "last_isi": last_isi,
+        "adaptation": adaptation,
+    }
+    return {name: metrics[name].reshape(shape).astype(dtype) for name, dtype in COLUMNS.items()}
+
+
+_worker = {}
+
+
+def _init_worker(out_dir, chan_a, chan_b, horizon, input_enable):
+    _worker["columns"] = {name: np.load(Path(out_dir) / f"{name}.npy", mmap_mode="r+")
+                          for name in COLUMNS}
+    _worker["stimulus"] = (chan_a, chan_b, horizon, input_enable)
+
+
+def _run_shard(shard):
+    metrics = simulate_shard(shard, *_worker["stimulus"])
+    index = shard_slice(shard)
+    for name, column in _worker["columns"].items():
+        column[index] = metrics[name]
+        column.flush()
+    return shard
+
+
+def open_sweep(out_dir, chan_a, chan_b, horizon, input_enable=1):
+    """Create (or validate and reopen) the sweep directory; return the done mask."""
+    out_dir = Path(out_dir)
+    meta = {
+        "chan_a": int(chan_a),
+        "chan_b": int(chan_b),
+        "horizon": int(horizon),
+        "input_enable": int(input_enable),
+        "shape": list(SWEEP_SHAPE),
+        "rtl_hash": rtl_hash(),
+    }
+    meta_path = out_dir / "meta.json"
+    if meta_path.exists():
+        existing = json.loads(meta_path.read_text())
+        if existing != meta:
+            raise ValueError(f"{out_dir} holds a different sweep: {existing}")
+        return np.load(out_dir / "done.npy", mmap_mode="r+")
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, dtype in COLUMNS.items():
+        column = np.lib.format.open_memmap(out_dir / f"{name}.npy", "w+", dtype, SWEEP_SHAPE)
+        del column
+    done = np.lib.format.open_memmap(out_dir / "done.npy", "w+", np.uint8, (SHARD_COUNT,))
+    done.flush()
+    # Written last: its presence marks a fully initialised directory.
+    meta_path.write_text(json.dumps(meta, indent=2))
+    return done
+
+
+def run_sweep(out_dir, chan_a, chan_b, horizon=1000, input_enable=1, processes=None, log=print):
+    """Sweep every configuration not yet marked done in *out_dir*."""
+    done = open_sweep(out_dir, chan_a, chan_b, horizon, input_enable)
+    pending = np.flatnonzero(done == 0).tolist()
+    log(f"{SHARD_COUNT - len(pending)}/{SHARD_COUNT} shards already done")
+    if not pending:
+        return
+
+    with multiprocessing.Pool(processes or os.cpu_count(), _init_worker,
+                              (str(out_dir), chan_a, chan_b, horizon, input_enable)) as pool:
+        for finished, shard in enumerate(pool.imap_unordered(_run_shard, pending), 1):
+            done[shard] = 1
+            done.flush()
+            if finished % 64 == 0 or finished == len(pending):
+                log(f"{SHARD_COUNT - len(pending) + finished}/{SHARD_COUNT} shards done")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--chan-a", type=int, required=True)
+    parser.add_argument("--chan-b", type=int, required=True)
+    parser.add_argument("--horizon", type=int, default=1000)
+    parser.add_argument("--input-enable", type=int, default=1)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+    run_sweep(args.out_dir, args.chan_a, args.chan_b, args.horizon, args.input_enable, args.processes)
+
+
+if __name__ == "__main__":
+    main()
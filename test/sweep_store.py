@@ -0,0 +1,164 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Indexed, memory-mapped access to the results of :mod:`sweep`.
+
+Each sweep directory holds one ``.npy`` column per metric.  For the columns
+in ``INDEXED`` a sorted secondary index is stored next to it
+(``<column>.sorted.npy`` with the sorted values and ``<column>.order.npy``
+with the matching flat configuration indices).  A range query is then two
+binary searches on the memory-mapped sorted values plus a read of the
+matching slice of the order file; further conditions are applied by
+gathering only the candidate rows.  Nothing is loaded in full.
+
+Undefined metrics (-1 in the integer columns, NaN in ``adaptation``) never
+match a range, open-ended or not: ``first_spike=(None, 50)`` does not
+return the configurations that never spiked.
+
+Example::
+
+    store = SweepStore("sweeps")
+    hits = store.sweep(chan_a=3, chan_b=0).query(spike_count=(40, 60), first_spike=(None, 50))
+    params = store.sweep(chan_a=3, chan_b=0).params(hits)
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from sweep import COLUMNS, config_params
+
+INDEXED = ("spike_count", "first_spike", "adaptation")
+
+
+class SweepIndex:
+    """One completed sweep directory and its secondary indexes."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        if not np.load(self.path / "done.npy", mmap_mode="r").all():
+            raise ValueError(f"sweep in {self.path} is not finished")
+        self.columns = {name: np.load(self.path / f"{name}.npy", mmap_mode="r").reshape(-1)
+                        for name in COLUMNS}
+        self.size = len(self.columns["spike_count"])
+        self._indexes = {}
+
+    def _index(self, name):
+        if name not in self._indexes:
+            sorted_path = self.path / f"{name}.sorted.npy"
+            order_path = self.path / f"{name}.order.npy"
+            column_mtime = (self.path / f"{name}.npy").stat().st_mtime
+            if not all(p.exists() and p.stat().st_mtime >= column_mtime
+                       for p in (sorted_path, order_path)):
+                self.build_index(name)
+            self._indexes[name] = (np.load(sorted_path, mmap_mode="r"),
+                                   np.load(order_path, mmap_mode="r"))
+        return self._indexes[name]
+
+    def build_index(self, name):
+        """(Re)write the sorted index files for column *name*."""
+        column = np.asarray(self.columns[name])
+        order = np.argsort(column, kind="stable").astype(np.int32)
+        for suffix, data in (("sorted", column[order]), ("order", order)):
+            tmp = self.path / f"{name}.{suffix}.tmp.npy"
+            np.save(tmp, data)
+            tmp.replace(self.path / f"{name}.{suffix}.npy")
+        self._indexes.pop(name, None)
+
+    def _bounds(self, name, low, high):
+        """Slice of the sorted index of *name* covering ``[low, high]`` (None is open)."""
+        values, _ = self._index(name)
+        # Search with the column's own dtype: a mismatched key makes NumPy
+        # convert the whole memory-mapped array first.  The sentinels are
+        # left out: -1 sorts first and NaN last.
+        # Bounds beyond the dtype's range are clipped so the cast cannot wrap.
+        cast = values.dtype.type
+        if np.issubdtype(values.dtype, np.integer):
+            info = np.iinfo(values.dtype)
+            end = len(values)
+            if low is not None and low > info.max:
+                return end, end
+            low = 0 if low is None else max(np.ceil(low), 0)
+            high = None if high is None else np.clip(np.floor(high), info.min, info.max)
+        else:
+            info = np.finfo(values.dtype)
+            end = int(np.searchsorted(values, cast(np.nan), "left"))
+            low = None if low is None else np.clip(low, info.min, info.max)
+            high = None if high is None else np.clip(high, info.min, info.max)
+        lo = 0 if low is None else int(np.searchsorted(values, cast(low), "left"))
+        hi = end if high is None else min(int(np.searchsorted(values, cast(high), "right")), end)
+        return lo, max(lo, hi)
+
+    def query(self, **ranges):
+        """Flat configuration indices matching every ``column=(low, high)`` range.
+
+        Bounds are inclusive and either may be ``None``.  The most selective
+        indexed column drives the search; the other ranges filter its hits.
+        """
+        if not ranges:
+            return np.arange(self.size)
+        for name in ranges:
+            if name not in COLUMNS:
+                raise KeyError(f"unknown sweep column {name!r}")
+
+        indexed = [name for name in ranges if name in INDEXED]
+        if indexed:
+            bounds = {name: self._bounds(name, *ranges[name]) for name in indexed}
+            driver = min(bounds, key=lambda name: bounds[name][1] - bounds[name][0])
+            lo, hi = bounds[driver]
+            hits = np.sort(self._index(driver)[1][lo:hi])
+        else:
+            driver = None
+            hits = np.arange(self.size)
+
+        for name, (low, high) in ranges.items():
+            if name == driver:
+                continue
+            values = self.columns[name][hits]
+            keep = _defined(values)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            hits = hits[keep]
+        return hits
+
+    def params(self, indices):
+        """Loader parameters of flat configuration *indices*."""
+        return config_params(indices)
+
+    def values(self, indices):
+        """Metric values of flat configuration *indices*, keyed by column."""
+        return {name: column[indices] for name, column in self.columns.items()}
+
+
+def _defined(values):
+    """Mask of the values that are not the column's undefined sentinel."""
+    return values >= 0 if np.issubdtype(values.dtype, np.integer) else ~np.isnan(values)
+
+
+class SweepStore:
+    """A directory of sweep directories, looked up by their stimulus."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._sweeps = {}
+
+    def sweep(self, chan_a, chan_b, horizon=None, input_enable=1):
+        """The completed sweep run under the given stimulus."""
+        matches = []
+        for meta_path in sorted(self.root.glob("*/meta.json")):
+            meta = json.loads(meta_path.read_text())
+            if (meta["chan_a"], meta["chan_b"], meta["input_enable"]) != (chan_a, chan_b, input_enable):
+                continue
+            if horizon is not None and meta["horizon"] != horizon:
+                continue
+            matches.append(meta_path.parent)
+        if len(matches) != 1:
+            raise LookupError(f"expected one sweep for chan_a={chan_a} chan_b={chan_b} "
+                              f"horizon={horizon} under {self.root}, found {len(matches)}")
+        path = matches[0]
+        if path not in self._sweeps:
+            self._sweeps[path] = SweepIndex(path)
+        return self._sweeps[path]
@@ -0,0 +1,170 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Bit-exact model of the whole ``tt_um_alif_dual_unileak`` top level.
+
+Combines :class:`loader_model.LoaderArray` and
+:class:`neuron_model.NeuronArray` the way src/lif_neuron_system.v wires
+them: on each edge the neuron sees the loader outputs from *before* that
+edge, and reset takes priority over ``ena``.  Inputs and outputs are the
+raw ``ui_in``/``uio_in``/``uo_out``/``uio_out`` pin bytes of src/project.v,
+mapped through pins.py.
+"""
+
+import numpy as np
+
+from loader_model import IDLE, LoaderArray
+from neuron_model import NeuronArray, unpack_state
+from neuron_orbit import TransitionMemo
+from pins import decode_inputs, encode_outputs
+
+
+class SystemModel:
+    """*n* independent copies of the design, starting from reset."""
+
+    def __init__(self, n=1):
+        self.n = n
+        self.loader = LoaderArray(n)
+        # The neuron parameters are views of the loader registers, so they
+        # follow every capture and reset without copying.
+        self.neuron = NeuronArray(n, self.loader.params)
+        self.memo = TransitionMemo()
+
+    @property
+    def uo_out(self):
+        return encode_outputs(self.neuron.spike_out, self.neuron.v_mem_out)[0]
+
+    @property
+    def uio_out(self):
+        return encode_outputs(params_ready=self.loader.params_ready)[1]
+
+    def state(self):
+        """Copies of every register, keyed ``neuron.<reg>`` / ``loader.<reg>``."""
+        regs = {f"neuron.{name}": value for name, value in self.neuron.state().items()}
+        regs.update((f"loader.{name}", value) for name, value in self.loader.state().items())
+        return regs
+
+    def load_state(self, regs):
+        """Restore registers from a :meth:`state` dictionary."""
+        for key, value in regs.items():
+            block, name = key.split(".")
+            if block == "neuron":
+                getattr(self.neuron, name)[:] = value
+            elif name in self.loader.params._fields:
+                self.loader.fields[self.loader.params._fields.index(name)][:] = value
+            else:
+                setattr(self.loader, name, np.array(value, dtype=getattr(self.loader, name).dtype))
+
+    def step(self, ui_in, uio_in=0, rst_n=1, ena=1):
+        """Advance every copy by one clock edge."""
+        input_enable, load_mode, serial_data, chan_a, chan_b = decode_inputs(ui_in, uio_in)
+        reset = np.broadcast_to(np.asarray(rst_n) == 0, (self.n,))
+        enable = (np.asarray(ena) != 0) & ~reset
+        self.neuron.step(chan_a, chan_b, input_enable, enable, self.loader.params_ready)
+        self.loader.step(serial_data, load_mode, enable)
+        if reset.any():
+            self.neuron.reset(reset)
+            self.loader.reset(reset)
+
+    def run(self, ui_in, uio_in=0, rst_n=1, ena=1):
+        """Step once per row of ``ui_in`` (shape ``(cycles,)`` or ``(cycles, n)``).
+
+        Returns ``(uo_out, uio_out)`` arrays of shape ``(cycles, n)``, the
+        outputs after each edge.
+        """
+        ui_in = np.asarray(ui_in, np.uint8)
+        uio_in = np.broadcast_to(np.asarray(uio_in, np.uint8), ui_in.shape)
+        if self.n == 1 and np.ndim(rst_n) == 0 and np.ndim(ena) == 0 and rst_n and ena:
+            uo_out, uio_out = self._run_single(ui_in.reshape(len(ui_in)), uio_in.reshape(len(ui_in)))
+            return uo_out[:, None], uio_out[:, None]
+
+        rst_n = np.broadcast_to(np.asarray(rst_n), ui_in.shape[:1])
+        ena = np.broadcast_to(np.asarray(ena), ui_in.shape[:1])
+        uo_out = np.zeros((len(ui_in), self.n), np.uint8)
+        uio_out = np.zeros((len(ui_in), self.n), np.uint8)
+        for t in range(len(ui_in)):
+            self.step(ui_in[t], uio_in[t], rst_n[t], ena[t])
+            uo_out[t] = self.uo_out
+            uio_out[t] = self.uio_out
+        return uo_out, uio_out
+
+    def history(self, ui_in, uio_in=0):
+        """Run one copy and return its registers before and after every edge.
+
+        The result maps ``neuron.state`` (packed with
+        :func:`neuron_model.pack_state`), ``neuron.spike_out`` and every
+        ``loader.<reg>`` to an array of ``len(ui_in) + 1`` values: row 0 is
+        the state on entry and row ``t + 1`` the state after edge ``t``.
+        """
+        if self.n != 1:
+            raise ValueError("history() records a single copy")
+        ui_in = np.asarray(ui_in, np.uint8).reshape(-1)
+        uio_in = np.broadcast_to(np.asarray(uio_in, np.uint8), ui_in.shape)
+        history = {"neuron.state": np.zeros(len(ui_in) + 1, np.int64),
+                   "neuron.spike_out": np.zeros(len(ui_in) + 1, bool)}
+        history.update((f"loader.{name}", np.zeros(len(ui_in) + 1, np.int16)) for name in self.loader.state())
+        self._record(history, 0)
+        self._run_single(ui_in, uio_in, history)
+        return history
+
+    def _record(self, history, row, end=None):
+        """Copy the current registers into rows ``row:end`` of *history*."""
+        end = row + 1 if end is None else end
+        history["neuron.state"][row:end] = self.neuron.packed()[0]
+        history["neuron.spike_out"][row:end] = self.neuron.spike_out[0]
+        for name, value in self.loader.state().items():
+            history[f"loader.{name}"][row:end] = value[0]
+
+    def _run_single(self, ui_in, uio_in, history=None):
+        """Fast path for one copy out of reset.
+
+        While the loader idles with ``load_mode`` low only the neuron moves,
+        so those stretches are replayed through memoised transitions on the
+        packed state instead of stepping the array models.  *history*, if
+        given, is filled as described in :meth:`history`.
+        """
+        input_enable, load_mode, _, chan_a, chan_b = decode_inputs(ui_in, uio_in)
+        codes = ((input_enable << 6) | (chan_a << 3) | chan_b).tolist()
+        loads = np.flatnonzero(load_mode).tolist() + [len(ui_in)]
+        uo_out = np.zeros(len(ui_in), np.uint8)
+        uio_out = np.zeros(len(ui_in), np.uint8)
+
+        t = 0
+        next_load = 0
+        while t < len(ui_in):
+            while loads[next_load] < t:
+                next_load += 1
+            end = loads[next_load]
+            idle = self.loader.current_state[0] == IDLE and self.loader.params_ready[0]
+            if not idle or end == t:
+                self.step(ui_in[t], uio_in[t])
+                uo_out[t] = self.uo_out[0]
+                uio_out[t] = self.uio_out[0]
+                if history is not None:
+                    self._record(history, t + 1)
+                t += 1
+                continue
+
+            params = tuple(int(field[0]) for field in self.loader.fields)
+            tables = {}
+            state = int(self.neuron.packed()[0])
+            states = []
+            spikes = []
+            for code in codes[t:end]:
+                table = tables.get(code)
+                if table is None:
+                    table = tables[code] = self.memo.transitions(params, (code >> 3) & 7, code & 7, code >> 6)
+                state, spike = table[state]
+                states.append(state)
+                spikes.append(spike)
+            self.neuron.load_packed([state], [spike])
+
+            states = np.array(states, np.int64)
+            v_mem = unpack_state(states)[0]
+            v_mem_out = np.where(v_mem > 0, v_mem & 0x7F, 0)
+            uo_out[t:end], uio_out[t:end] = encode_outputs(spikes, v_mem_out, 1)
+            if history is not None:
+                self._record(history, t + 1, end + 1)
+                history["neuron.state"][t + 1:end + 1] = states
+                history["neuron.spike_out"][t + 1:end + 1] = spikes
+            t = end
+        return uo_out, uio_out
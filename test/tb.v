@@ -5,13 +5,25 @@
    that can be driven / tested by the cocotb test.py.
 */
 module tb ();
-  // Dump the signals to a VCD file. You can view it with gtkwave or surfer.
+  // Waveform dumping is off unless +DUMP_FILE=<path> is given (FST when vvp
+  // runs with -fst). Only the windows where dump_en is high are recorded;
+  // +DUMP_ALL starts with it high. See waves.py.
+  reg [8*256-1:0] dump_file;
+  reg dump_open;
+  reg dump_en;
   initial begin
-    $dumpfile("tb.vcd");
-    $dumpvars(0, tb);
-    #1;
+    dump_open = $value$plusargs("DUMP_FILE=%s", dump_file);
+    dump_en = $test$plusargs("DUMP_ALL");
+    if (dump_open) begin
+      $dumpfile(dump_file);
+      $dumpvars(0, tb);
+      if (!dump_en) $dumpoff;
+    end
   end
 
+  always @(posedge dump_en) if (dump_open) $dumpon;
+  always @(negedge dump_en) if (dump_open) $dumpoff;
+
   // Wire up the inputs and outputs:
   reg clk;
   reg rst_n;
@@ -22,6 +34,16 @@ module tb ();
   wire [7:0] uio_out;
   wire [7:0] uio_oe;
 
+  // Free-running clock, enabled with +CLK_PERIOD_NS=<period>. Without the
+  // plusarg the clock is driven from Python. See tb_clock.py.
+  integer clk_period_ns;
+  initial begin
+    if ($value$plusargs("CLK_PERIOD_NS=%d", clk_period_ns)) begin
+      clk = 0;
+      forever #(clk_period_ns / 2.0) clk = ~clk;
+    end
+  end
+
   // Replace tt_um_example with your module name:
   tt_um_alif_dual_unileak user_project (
       .ui_in  (ui_in),    // Dedicated inputs
@@ -33,4 +55,132 @@ module tb ();
       .clk    (clk),      // clock
       .rst_n  (rst_n)     // not reset
   );
+
+  // Extra copies of the design for batch runs, N_INST in total (make
+  // N_INST=...). Copy i > 0 is driven from byte i of ui_in_all/uio_in_all;
+  // byte 0 of the output buses mirrors the instance above. See multi.py.
+  parameter N_INST = 1;
+  reg  [8*N_INST-1:0] ui_in_all;
+  reg  [8*N_INST-1:0] uio_in_all;
+  wire [8*N_INST-1:0] uo_out_all;
+  wire [8*N_INST-1:0] uio_out_all;
+
+  assign uo_out_all[7:0]  = uo_out;
+  assign uio_out_all[7:0] = uio_out;
+
+  genvar i;
+  generate
+    for (i = 1; i < N_INST; i = i + 1) begin : extra
+      wire [7:0] uio_oe;
+
+      tt_um_alif_dual_unileak user_project (
+          .ui_in  (ui_in_all[8*i+:8]),
+          .uo_out (uo_out_all[8*i+:8]),
+          .uio_in (uio_in_all[8*i+:8]),
+          .uio_out(uio_out_all[8*i+:8]),
+          .uio_oe (uio_oe),
+          .ena    (ena),
+          .clk    (clk),
+          .rst_n  (rst_n)
+      );
+    end
+  endgenerate
+
+`ifndef GL_TEST
+  // Neuron state deposit (RTL only): every change of state_load copies word
+  // i of state_in_all into the neuron registers of copy i, as 25-bit
+  // {v_mem, threshold, refr_cnt, leak_counter} (neuron_model.pack_state).
+  // state_out_all reads the registers back with spike_out on top, 26 bits
+  // per copy. See exhaustive.py.
+  reg  [25*N_INST-1:0] state_in_all;
+  reg                  state_load;
+  wire [26*N_INST-1:0] state_out_all;
+
+  always @(state_load)
+    {user_project.system_inst.neuron.v_mem, user_project.system_inst.neuron.threshold,
+     user_project.system_inst.neuron.refr_cnt, user_project.system_inst.neuron.leak_counter} = state_in_all[24:0];
+
+  assign state_out_all[25:0] = {user_project.system_inst.neuron.spike_out, user_project.system_inst.neuron.v_mem,
+                                user_project.system_inst.neuron.threshold, user_project.system_inst.neuron.refr_cnt,
+                                user_project.system_inst.neuron.leak_counter};
+
+  generate
+    for (i = 1; i < N_INST; i = i + 1) begin : deposit
+      always @(state_load)
+        {extra[i].user_project.system_inst.neuron.v_mem, extra[i].user_project.system_inst.neuron.threshold,
+         extra[i].user_project.system_inst.neuron.refr_cnt,
+         extra[i].user_project.system_inst.neuron.leak_counter} = state_in_all[25*i+:25];
+
+      assign state_out_all[26*i+:26] = {extra[i].user_project.system_inst.neuron.spike_out,
+                                        extra[i].user_project.system_inst.neuron.v_mem,
+                                        extra[i].user_project.system_inst.neuron.threshold,
+                                        extra[i].user_project.system_inst.neuron.refr_cnt,
+                                        extra[i].user_project.system_inst.neuron.leak_counter};
+    end
+  endgenerate
+`endif
+
+  // Stimulus playback: pulsing stim_start loads stim_len words of
+  // {uio_in, ui_in} from STIM_FILE and replays one word per clock, driven
+  // on the falling edge. See playback.py for the Python side. The ROM holds
+  // 2**STIM_ADDR_BITS words (make STIM_ADDR_BITS=...); gate-level builds,
+  // which run far fewer cycles, default to 4096 instead of a 2 MB array.
+`ifdef GL_TEST
+  parameter STIM_ADDR_BITS = 12;
+`else
+  parameter STIM_ADDR_BITS = 20;
+`endif
+  reg [15:0] stim_mem[0:(1 << STIM_ADDR_BITS) - 1];
+  reg [8*256-1:0] stim_file;
+  reg [STIM_ADDR_BITS:0] stim_len;
+  reg [STIM_ADDR_BITS:0] stim_idx;
+  reg stim_start;
+  reg stim_busy;
+
+  initial begin
+    stim_start = 0;
+    stim_busy  = 0;
+    if (!$value$plusargs("STIM_FILE=%s", stim_file)) stim_file = "stimulus.hex";
+  end
+
+  always @(posedge stim_start) begin
+    $readmemh(stim_file, stim_mem, 0, stim_len - 1);
+    stim_idx  = 0;
+    stim_busy = (stim_len != 0);
+  end
+
+  always @(negedge clk) begin
+    if (stim_busy) begin
+      {uio_in, ui_in} <= stim_mem[stim_idx];
+      stim_idx <= stim_idx + 1;
+      if (stim_idx + 1 == stim_len) stim_busy <= 0;
+    end
+  end
+
+  // Response capture: while capture_en is high, {uio_out, uo_out} is
+  // appended to CAPTURE_FILE as one hex word per line on every falling
+  // edge, keeping x/z digits. See capture.py for the Python side.
+  reg [8*256-1:0] capture_file;
+  reg capture_en;
+  reg capture_flush;
+  integer capture_fd;
+
+  initial begin
+    capture_en    = 0;
+    capture_flush = 0;
+    capture_fd    = 0;
+    if (!$value$plusargs("CAPTURE_FILE=%s", capture_file)) capture_file = "capture.hex";
+  end
+
+  always @(posedge capture_en) begin
+    if (capture_fd == 0) capture_fd = $fopen(capture_file, "w");
+  end
+
+  always @(negedge capture_en or posedge capture_flush) begin
+    if (capture_fd != 0) $fflush(capture_fd);
+  end
+
+  always @(negedge clk) begin
+    if (capture_en) $fwrite(capture_fd, "%h%h\n", uio_out, uo_out);
+  end
 endmodule
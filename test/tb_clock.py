@@ -0,0 +1,59 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Clock helpers that avoid scheduling every edge through Python.
+
+Run with ``+CLK_PERIOD_NS=<period>`` (``make CLK_PERIOD_NS=...``) and tb.v
+generates the clock itself; :func:`start_clock` then only records its phase.
+Otherwise it falls back to a cocotb :class:`~cocotb.clock.Clock`.
+
+:func:`wait_cycles` replaces ``ClockCycles(dut.clk, n)``: it sleeps until
+just before the *n*-th rising edge with one timer and then awaits that edge,
+so waiting costs two callbacks instead of *n*.
+"""
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, Timer
+from cocotb.utils import get_sim_time
+
+_PS_PER_UNIT = {"ps": 1, "ns": 10**3, "us": 10**6, "ms": 10**9}
+
+_clock = {}
+
+
+def start_clock(dut, period, units="ns"):
+    """Start the clock with *period*, unless tb.v already generates one."""
+    if "CLK_PERIOD_NS" in cocotb.plusargs:
+        period_ps = int(cocotb.plusargs["CLK_PERIOD_NS"]) * 1000
+        # tb.v starts low and rises half a period in
+        _clock.update(period=period_ps, first_edge=period_ps // 2)
+        dut._log.info(f"Using the HDL clock ({period_ps // 1000} ns)")
+        return
+    period_ps = round(period * _PS_PER_UNIT[units])
+    _clock.update(period=period_ps, first_edge=round(get_sim_time("ps")))
+    cocotb.start_soon(Clock(dut.clk, period, units=units).start())
+
+
+async def wait_cycles(dut, n):
+    """Return on the *n*-th rising edge from now, like ``ClockCycles``.
+
+    An edge in the current timestep counts if the clock has not risen yet,
+    so calling this at the time of an edge but before it (e.g. straight
+    after :func:`start_clock`) agrees with ``ClockCycles`` too.
+    """
+    if n <= 0:
+        return
+    if not _clock:
+        raise RuntimeError("call start_clock() before wait_cycles()")
+    period, first = _clock["period"], _clock["first_edge"]
+    now = round(get_sim_time("ps"))
+    # Rising edges are at first + k * period; count those strictly after now,
+    # and one due now that has not happened yet.
+    passed = (now - first) // period + 1 if now >= first else 0
+    if now >= first and (now - first) % period == 0 and dut.clk.value.binstr != "1":
+        passed -= 1
+    target = first + (passed + n - 1) * period
+    lead = target - now - period // 4
+    if lead > 0:
+        await Timer(lead, "ps")
+    await RisingEdge(dut.clk)
@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""func_coverage bins on short hand-built stimuli."""
+
+import numpy as np
+import pytest
+
+from func_coverage import GOALS, SHAPES, Coverage, label
+from loader_model import FIELD_CYCLES, encode_frames
+from neuron_model import NeuronParams
+from pins import encode_inputs
+from system_model import SystemModel
+from trace_file import TraceWriter
+
+
+def configured(params, cycles, **fields):
+    """A frame loading *params* followed by *cycles* of the given inputs."""
+    ui_in, uio_in = encode_inputs(**{name: np.broadcast_to(value, cycles) for name, value in fields.items()})
+    frame = encode_frames(params)[0]
+    return np.concatenate([frame, ui_in]), np.concatenate([np.zeros_like(frame), uio_in])
+
+
+def test_goals():
+    assert sum(int(goal.sum()) for goal in GOALS.values()) == 325
+    assert int(GOALS["weighted_sum"].sum()) == 115
+    assert not GOALS["leak"][15, 1]
+    assert all(GOALS[name].shape == shape for name, shape in SHAPES.items())
+
+
+def test_products_and_refractory():
+    ui_in, uio_in = configured(NeuronParams(4, 7, 0, 2, 15), 40, input_enable=1, chan_a=3, chan_b=0)
+    coverage = Coverage.from_stimulus(ui_in, uio_in)
+    assert coverage.bins["product_a"][3, 4] and coverage.bins["product_a"].sum() == 1
+    assert coverage.bins["product_b"][0, 7]
+    assert coverage.bins["weighted_sum"][12 + 63]
+    assert coverage.bins["refractory"].all()
+
+
+def test_chan_times_weight_wraps():
+    ui_in, uio_in = configured(NeuronParams(7, 7, 0, 200, 15), 3, input_enable=1, chan_a=7, chan_b=6)
+    coverage = Coverage.from_stimulus(ui_in, uio_in)
+    assert coverage.bins["weighted_sum"][(-15 - (42 - 64)) + 63]
+
+
+def test_leak_bins():
+    ui_in, uio_in = configured(NeuronParams(1, 0, 1, 200, 3), 20, input_enable=1, chan_a=1, chan_b=0)
+    coverage = Coverage.from_stimulus(ui_in, uio_in)
+    assert coverage.bins["leak"][3, 0] and not coverage.bins["leak"][3, 1]
+    # Integration paused with input_enable low lets leak_counter run past leak_cycles.
+    enable = np.r_[np.ones(8, int), np.zeros(10, int), np.ones(4, int)]
+    ui_in, uio_in = configured(NeuronParams(1, 0, 1, 200, 3), len(enable), input_enable=enable, chan_a=1)
+    assert Coverage.from_stimulus(ui_in, uio_in).bins["leak"][3, 1]
+
+
+def test_loader_abort_bin():
+    frame = encode_frames(NeuronParams(1, 2, 3, 4, 5))[0]
+    ui_in = np.concatenate([frame[:1 + 3 * FIELD_CYCLES + 5], np.zeros(3, np.uint8)])
+    coverage = Coverage.from_stimulus(ui_in)
+    assert coverage.bins["loader_abort"].sum() == 1
+    assert coverage.bins["loader_abort"][3, 5]
+    assert label("loader_abort", (3, 5)) == "abort in LOAD_THR_MIN at bit_count=5"
+
+
+def test_from_stimulus_continues_from_model_state():
+    ui_in, uio_in = configured(NeuronParams(4, 0, 0, 20, 15), 40, input_enable=1, chan_a=3)
+    whole = Coverage.from_stimulus(ui_in, uio_in)
+    model = SystemModel(1)
+    first = Coverage.from_stimulus(ui_in[:30], uio_in[:30], model)
+    second = Coverage.from_stimulus(ui_in[30:], uio_in[30:], model)
+    assert first.merge(second) > 0
+    assert all(np.array_equal(first.bins[name], whole.bins[name]) for name in SHAPES)
+
+
+def test_merge_save_load(tmp_path):
+    a = Coverage({"product_a": np.eye(8, dtype=bool)})
+    b = Coverage({"product_a": np.eye(8, dtype=bool)[::-1], "refractory": [1, 0, 0]})
+    assert a.merge(b) == 9
+    assert a.hit == 16 + 1 and not a.complete
+    a.save(tmp_path / "cov.npz")
+    loaded = Coverage.load(tmp_path / "cov.npz")
+    assert loaded.hit == a.hit
+    assert len(loaded.missing()["product_a"]) == 64 - 16
+    assert "product_a        16/64" in loaded.report()
+
+
+def test_from_trace(tmp_path):
+    ui_in, uio_in = configured(NeuronParams(4, 0, 0, 20, 15), 40, input_enable=1, chan_a=3)
+    uo_out, uio_out = (out[:, 0] for out in SystemModel(1).run(ui_in, uio_in))
+    path = tmp_path / "run.trace"
+    with TraceWriter(path) as writer:
+        writer.append(ui_in, uio_in, uo_out, uio_out)
+    coverage = Coverage.from_trace(path)
+    assert all(np.array_equal(coverage.bins[name], Coverage.from_stimulus(ui_in, uio_in).bins[name])
+               for name in SHAPES)
+
+    with TraceWriter(path) as writer:
+        writer.append(ui_in, uio_in, uo_out ^ 1, uio_out)
+    with pytest.raises(ValueError, match="differ from the model at cycle"):
+        Coverage.from_trace(path)
@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""gl_sim.GateLevelSim on small hand-written netlists and a synthesized one.
+
+data/tt_um_alif_dual_unileak_sg13g2.v.gz is the design mapped onto sg13g2
+cell names by Yosys 0.69 (``synth -flatten``, ``dfflibmap``, ``abc`` and
+``hilomap`` against the cell functions of the sg13g2 library), without the
+placement and clock tree of the GDS flow.
+"""
+
+import gzip
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from gl_sim import GateLevelSim, NetlistError, compare_with_model, pack_bits, unpack_bits
+
+NETLIST = Path(__file__).parent / "data" / "tt_um_alif_dual_unileak_sg13g2.v.gz"
+
+# A 2-bit counter with enable, its flip-flops clocked through a buffer and
+# a pair of inverters the way CTS leaves them.
+COUNTER = """
+module tt_um_counter (clk, rst_n, ena, count);
+  input clk;
+  input rst_n;
+  input ena;
+  output [1:0] count;
+  wire clknet_0_clk;
+  wire clknet_1_0__leaf_clk;
+  wire clk_n;
+  wire next0;
+  wire carry;
+  wire next1;
+
+  sg13g2_buf_8 clkbuf_0_clk (.A(clk), .X(clknet_0_clk));
+  sg13g2_inv_1 clkinv_0 (.A(clknet_0_clk), .Y(clk_n));
+  sg13g2_inv_4 clkinv_1 (.A(clk_n), .Y(clknet_1_0__leaf_clk));
+  sg13g2_xor2_1 _1_ (.A(count[0]), .B(ena), .X(next0));
+  sg13g2_and2_1 _2_ (.A(count[0]), .B(ena), .X(carry));
+  sg13g2_xor2_1 _3_ (.A(count[1]), .B(carry), .X(next1));
+  sg13g2_dfrbpq_1 count_0 (.CLK(clknet_0_clk), .D(next0), .RESET_B(rst_n), .Q(count[0]));
+  sg13g2_dfrbpq_1 count_1 (.CLK(clknet_1_0__leaf_clk), .D(next1), .RESET_B(rst_n), .Q(count[1]));
+  sg13g2_fill_2 FILLER_0 ();
+endmodule
+"""
+
+
+def test_counter_through_clock_tree():
+    sim = GateLevelSim(COUNTER)
+    sim.resize(3)
+    assert sim.step(rst_n=0, ena=1)["count"].tolist() == [0, 0, 0]
+    ena = np.array([1, 0, 1])
+    counts = [sim.step(rst_n=1, ena=ena)["count"].tolist() for _ in range(5)]
+    assert counts == [[1, 0, 1], [2, 0, 2], [3, 0, 3], [0, 0, 0], [1, 0, 1]]
+
+
+def test_flop_on_falling_edge_is_rejected():
+    text = COUNTER.replace(".CLK(clknet_1_0__leaf_clk)", ".CLK(clk_n)")
+    with pytest.raises(NetlistError, match="count_1 is clocked on the falling edge"):
+        GateLevelSim(text)
+
+
+def test_flop_off_the_clock_is_rejected():
+    text = COUNTER.replace(".CLK(clknet_0_clk)", ".CLK(ena)")
+    with pytest.raises(NetlistError, match="count_0 is not clocked by clk"):
+        GateLevelSim(text)
+
+
+def test_harmless_directives_are_skipped():
+    sim = GateLevelSim("`timescale 1ns / 1ps\n`default_nettype none\n" + COUNTER)
+    assert sim.name == "tt_um_counter" and list(sim.outputs) == ["count"]
+
+
+@pytest.mark.parametrize("directive", ["`ifdef USE_POWER_PINS", "`include \"cells.v\""])
+def test_conditional_directives_are_rejected(directive):
+    text = COUNTER.replace("  wire clk_n;", f"{directive}\n  wire clk_n;")
+    with pytest.raises(NetlistError, match=f"compiler directive {directive.split()[0]} is not supported"):
+        GateLevelSim(text)
+
+
+@pytest.fixture(scope="module")
+def netlist():
+    return gzip.decompress(NETLIST.read_bytes()).decode()
+
+
+def mismatches(text):
+    sim = GateLevelSim(text)
+    sim.resize(256)
+    return compare_with_model(sim, 300, np.random.default_rng(0), log=lambda line: None)
+
+
+def test_synthesized_netlist_matches_model(netlist):
+    assert mismatches(netlist) == 0
+
+
+def test_model_comparison_catches_a_wrong_cell(netlist):
+    assert mismatches(netlist.replace("sg13g2_nor2_1 ", "sg13g2_nand2_1 ", 1)) > 0
+
+
+def test_pack_bits_round_trip():
+    values = np.random.default_rng(0).integers(0, 1 << 12, 100).astype(np.uint64)
+    planes = pack_bits(values, 12, 2)
+    assert planes.shape == (12, 2)
+    assert np.array_equal(unpack_bits(planes, 100), values)
@@ -0,0 +1,70 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""loader_model frames round-tripped through the loader FSM model."""
+
+import numpy as np
+
+from loader_model import (FIELD_CYCLES, FRAME_CYCLES, IDLE, LOAD_THR_MIN, LOAD_WB, READY, LoaderArray,
+                          decode_frames, encode_frames)
+from neuron_model import DEFAULT_PARAMS, NeuronParams
+from pins import decode_inputs
+
+
+def random_params(rng, n):
+    return NeuronParams(*(rng.integers(0, 1 << bits, n) for bits in (3, 3, 8, 8, 4)))
+
+
+def test_frame_round_trip():
+    params = random_params(np.random.default_rng(0), 500)
+    frames = encode_frames(params)
+    assert frames.shape == (500, FRAME_CYCLES)
+    loaders = LoaderArray(500)
+    decoded = decode_frames(frames, loaders)
+    assert all(np.array_equal(a, b) for a, b in zip(decoded, params))
+    assert loaders.params_ready.all()
+    assert (loaders.current_state == IDLE).all()
+
+
+def test_only_low_field_bits_are_kept():
+    decoded = decode_frames(encode_frames(NeuronParams(0xFF, 0x0A, 0x1FF, 0xC8, 0x3F)))
+    assert [int(field[0]) for field in decoded] == [7, 2, 0xFF, 0xC8, 15]
+
+
+def test_frame_keeps_other_inputs():
+    frames = encode_frames(NeuronParams(1, 2, 3, 4, 5), ui_in_base=0xFF)
+    pins = decode_inputs(frames)
+    assert (pins.input_enable == 1).all() and (pins.chan_a == 7).all()
+    assert pins.load_mode[0].tolist() == [1] * (FRAME_CYCLES - 1) + [0]
+
+
+def test_aborted_frame_keeps_the_fields_captured_so_far():
+    params = NeuronParams(5, 6, 7, 8, 9)
+    frame = encode_frames(params)[0]
+    cut = 1 + 2 * FIELD_CYCLES + 3                  # three bits into LOAD_LEAK_RATE
+    loaders = LoaderArray(1)
+    loaders.run(frame[:cut])
+    assert loaders.current_state[0] == LOAD_WB + 1 and not loaders.params_ready[0]
+    decoded = decode_frames(np.zeros((1, 1), np.uint8), loaders)
+    assert [int(field[0]) for field in decoded] == [5, 6, *DEFAULT_PARAMS[2:]]
+    assert loaders.params_ready[0] and loaders.current_state[0] == IDLE
+
+
+def test_ready_waits_for_load_mode_to_drop():
+    frame = encode_frames(NeuronParams(1, 1, 1, 1, 1))[0]
+    loaders = LoaderArray(1)
+    loaders.run(frame[:-1])
+    assert loaders.current_state[0] == READY and loaders.params_ready[0]
+    loaders.run(np.full(3, frame[-2]))
+    assert loaders.current_state[0] == READY
+    loaders.run(frame[-1:])
+    assert loaders.current_state[0] == IDLE
+
+
+def test_enable_low_freezes_the_loader():
+    frame = encode_frames(NeuronParams(1, 1, 1, 1, 1))[0]
+    loaders = LoaderArray(1)
+    loaders.run(frame[:1 + 3 * FIELD_CYCLES + 1])
+    before = loaders.state()
+    loaders.run(frame[1:9], enable=0)
+    assert loaders.current_state[0] == LOAD_THR_MIN
+    assert all(np.array_equal(before[name], value) for name, value in loaders.state().items())
@@ -0,0 +1,61 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""neuron_jump.JumpTable against cycle-by-cycle stepping."""
+
+import numpy as np
+import pytest
+
+from neuron_jump import JumpTable, reachable, transition
+from neuron_model import NeuronArray, NeuronParams
+from neuron_orbit import reset_state
+
+PARAMS = NeuronParams(weight_a=5, weight_b=2, leak_rate=1, threshold_min=25, leak_cycles=2)
+
+
+@pytest.fixture(scope="module")
+def starts():
+    neurons = NeuronArray(16, PARAMS)
+    states = []
+    for t in range(16):
+        states.append(neurons.packed()[t])
+        neurons.step(np.arange(16) % 8, 1)
+    return np.array(states)
+
+
+def test_jump_matches_stepping(starts):
+    table = JumpTable(PARAMS, 4, 1, states=starts)
+    n = np.arange(0, 16 * 37, 37)
+    states, count, spike_out = table.jump(starts, n)
+    for i, start in enumerate(starts):
+        neurons = NeuronArray(1, PARAMS)
+        neurons.load_packed([start])
+        spikes = [bool(neurons.step(4, 1)[0]) for _ in range(n[i])]
+        assert states[i] == neurons.packed()[0]
+        assert count[i] == sum(spikes)
+        assert spike_out[i] == (spikes[-1] if spikes else False)
+
+
+def test_advance_long_horizon(starts):
+    table = JumpTable(PARAMS, 4, 1, states=[reset_state(PARAMS)])
+    jumped, stepped = NeuronArray(3, PARAMS), NeuronArray(3, PARAMS)
+    count = table.advance(jumped, 5000)
+    assert np.array_equal(count, stepped.run(np.full(5000, 4), 1).sum(axis=0))
+    assert np.array_equal(jumped.packed(), stepped.packed())
+    assert np.array_equal(jumped.spike_out, stepped.spike_out)
+
+
+def test_reachable_is_closed(starts):
+    domain = reachable(starts, PARAMS, 4, 1)
+    assert np.isin(starts, domain).all()
+    assert np.isin(transition(domain, PARAMS, 4, 1)[0], domain).all()
+
+
+def test_rejects_states_and_params_outside_the_table(starts):
+    table = JumpTable(PARAMS, 4, 1, states=starts[:1])
+    outside = np.setdiff1d(starts, table.domain)
+    with pytest.raises(ValueError, match="outside"):
+        table.jump(outside[:1], 5)
+    with pytest.raises(ValueError, match="parameters"):
+        table.advance(NeuronArray(1, PARAMS._replace(leak_rate=2)), 5)
+    with pytest.raises(ValueError, match="jump length"):
+        table.jump(starts[:1], -1)
@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""The width and signedness rules of neuron_model against hand-worked edges."""
+
+import numpy as np
+
+from neuron_model import (REFRAC_PERIOD, NeuronArray, NeuronParams, next_state, pack_state, threshold_max,
+                          unpack_state, weighted_sum)
+
+
+def test_pack_state_round_trip():
+    rng = np.random.default_rng(0)
+    fields = (rng.integers(-256, 256, 1000), rng.integers(0, 256, 1000),
+              rng.integers(0, 16, 1000), rng.integers(0, 16, 1000))
+    packed = pack_state(*fields)
+    assert packed.max() < 1 << 25
+    assert all(np.array_equal(a, b) for a, b in zip(unpack_state(packed), fields))
+
+
+def test_contributions_wrap_in_six_bits():
+    assert weighted_sum(7, 0, 7, 0) == -15
+    assert weighted_sum(4, 0, 7, 0) == 28
+    assert weighted_sum(0, 7, 0, 7) == 15
+
+
+def test_threshold_max_wraps():
+    assert threshold_max(100) == 200
+    assert threshold_max(200) == 144
+
+
+def test_v_mem_overflow_clamps_to_zero():
+    params = NeuronParams(weight_a=3, weight_b=0, leak_rate=0, threshold_min=30, leak_cycles=15)
+    v, thr, refr, leak, spike = next_state(250, 255, 0, 0, 7, 0, params)
+    assert (v, thr, refr, leak, spike) == (0, 255, 0, 1, False)
+
+
+def test_leak_uses_old_counter():
+    params = NeuronParams(weight_a=1, weight_b=0, leak_rate=2, threshold_min=30, leak_cycles=1)
+    assert next_state(10, 40, 0, 0, 1, 0, params)[::3] == (11, 1)
+    assert next_state(10, 40, 0, 1, 1, 0, params)[::3] == (9, 0)
+    # The counter keeps running without input_enable, but no leak is applied.
+    assert next_state(10, 40, 0, 3, 1, 0, params, input_enable=0)[::3] == (10, 4)
+
+
+def test_spike_enters_refractory_and_raises_threshold():
+    params = NeuronParams(weight_a=4, weight_b=0, leak_rate=0, threshold_min=30, leak_cycles=15)
+    v, thr, refr, leak, spike = next_state(20, 30, 0, 0, 3, 0, params)
+    assert (v, thr, refr, spike) == (0, 34, REFRAC_PERIOD, True)
+    v, thr, refr, leak, spike = next_state(0, 34, REFRAC_PERIOD, 1, 3, 0, params)
+    assert (v, thr, refr, spike) == (0, 34, REFRAC_PERIOD - 1, False)
+
+
+def test_array_reset_and_enable():
+    params = NeuronParams(weight_a=1, weight_b=0, leak_rate=0, threshold_min=[3, 90], leak_cycles=15)
+    neurons = NeuronArray(2, params)
+    assert neurons.threshold.tolist() == [3, 90]
+    neurons.step(2, 0)
+    assert neurons.step(2, 0, enable=[0, 1]).tolist() == [False, False]
+    assert neurons.v_mem.tolist() == [2, 4]
+    assert neurons.step(2, 0, enable=[1, 0]).tolist() == [True, False]
+    assert neurons.v_mem.tolist() == [0, 4]
+    neurons.step(2, 0, params_ready=0)
+    assert neurons.state()["refr_cnt"].tolist() == [REFRAC_PERIOD, 0]
+    neurons.reset(np.array([False, True]))
+    assert neurons.state()["v_mem"].tolist() == [0, 0]
+    assert neurons.state()["refr_cnt"].tolist() == [REFRAC_PERIOD, 0]
+
+
+def test_run_matches_step():
+    params = NeuronParams(weight_a=5, weight_b=3, leak_rate=1, threshold_min=20, leak_cycles=2)
+    rng = np.random.default_rng(1)
+    chan_a, chan_b = rng.integers(0, 8, (2, 200, 4))
+    stepped = NeuronArray(4, params)
+    expected = np.array([stepped.step(chan_a[t], chan_b[t]).copy() for t in range(200)])
+    assert np.array_equal(NeuronArray(4, params).run(chan_a, chan_b), expected)
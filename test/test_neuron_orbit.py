@@ -0,0 +1,55 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""neuron_orbit skip-ahead against cycle-by-cycle stepping."""
+
+import numpy as np
+import pytest
+
+from neuron_model import NeuronArray, NeuronParams
+from neuron_orbit import Orbit, TransitionMemo, reset_state, skip_ahead
+
+PARAMS = NeuronParams(weight_a=[5, 3, 7, 0, 2, 6], weight_b=[1, 2, 0, 3, 2, 7], leak_rate=[2, 1, 0, 3, 1, 4],
+                      threshold_min=[30, 20, 200, 10, 5, 60], leak_cycles=[1, 0, 15, 2, 3, 4])
+
+
+def stepped(neurons, n, chan_a, chan_b, input_enable=1):
+    count = np.zeros(neurons.n, np.int64)
+    for _ in range(n):
+        count += neurons.step(chan_a, chan_b, input_enable)
+    return count
+
+
+@pytest.mark.parametrize("n", [0, 1, 7, 100, 1000])
+def test_skip_ahead_matches_stepping(n):
+    chan_a, chan_b = np.array([3, 7, 2, 5, 4, 6]), np.array([1, 0, 7, 2, 3, 5])
+    reference = NeuronArray(6, PARAMS)
+    stepped(reference, 13, chan_a, chan_b)
+    expected = stepped(reference, n, chan_a, chan_b)
+
+    fast = NeuronArray(6, PARAMS)
+    skip_ahead(fast, 13, chan_a, chan_b)
+    assert np.array_equal(skip_ahead(fast, n, chan_a, chan_b), expected)
+    assert all(np.array_equal(a, b) for a, b in zip(fast.state().values(), reference.state().values()))
+
+
+def test_skip_ahead_without_input_enable():
+    reference, fast = NeuronArray(6, PARAMS), NeuronArray(6, PARAMS)
+    stepped(reference, 50, 7, 0, input_enable=0)
+    skip_ahead(fast, 50, 7, 0, input_enable=0)
+    assert np.array_equal(fast.packed(), reference.packed())
+
+
+def test_orbit_period_and_rate():
+    orbit = Orbit((4, 0, 0, 30, 15), 3, 0)
+    assert orbit.states[0] == reset_state((4, 0, 0, 30, 15))
+    assert orbit.state_at(orbit.transient + orbit.period) == orbit.states[orbit.transient]
+    assert orbit.spike_count(orbit.period, orbit.transient) == orbit.spikes_per_period
+    assert 0 < orbit.rate <= 1 / 5
+
+
+def test_transition_memo_matches_orbit():
+    params = (5, 1, 2, 30, 1)
+    orbit = Orbit(params, 3, 1)
+    table = TransitionMemo().transitions(params, 3, 1)
+    for i, state in enumerate(orbit.states[:-1]):
+        assert table[state] == (orbit.states[i + 1], orbit.spikes[i])
@@ -0,0 +1,42 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""pins.py codecs against the pin table."""
+
+import numpy as np
+
+from pins import check_info_yaml, decode_inputs, decode_outputs, encode_inputs, encode_outputs, input_mask
+
+
+def test_inputs_round_trip_every_pin_byte():
+    ui_in, uio_in = np.meshgrid(np.arange(256, dtype=np.uint8), np.array([0, 1], np.uint8), indexing="ij")
+    fields = decode_inputs(ui_in, uio_in)
+    assert np.array_equal(fields.chan_a, (ui_in >> 3) & 7)
+    assert np.array_equal(fields.chan_b, ((ui_in >> 6) << 1) | uio_in)
+    ui_out, uio_out = encode_inputs(*fields)
+    assert np.array_equal(ui_out, ui_in)
+    assert np.array_equal(uio_out, uio_in)
+
+
+def test_outputs_round_trip():
+    uo_out, uio_out = np.meshgrid(np.arange(256, dtype=np.uint8), np.array([0, 1], np.uint8), indexing="ij")
+    fields = decode_outputs(uo_out, uio_out)
+    assert np.array_equal(fields.spike_out, uo_out & 1)
+    assert np.array_equal(fields.v_mem_out, uo_out >> 1)
+    assert np.array_equal(fields.params_ready, uio_out)
+    assert all(np.array_equal(a, b) for a, b in zip(encode_outputs(*fields), (uo_out, uio_out)))
+
+
+def test_encode_broadcasts_scalars():
+    ui_in, uio_in = encode_inputs(input_enable=1, chan_a=np.arange(8), chan_b=5)
+    assert ui_in.shape == uio_in.shape == (8,)
+    assert decode_inputs(ui_in, uio_in).chan_a.tolist() == list(range(8))
+    assert set(uio_in.tolist()) == {1}
+
+
+def test_input_mask():
+    assert [int(mask) for mask in input_mask("load_mode", "serial_data")] == [0b110, 0]
+    assert [int(mask) for mask in input_mask("chan_b")] == [0b1100_0000, 1]
+
+
+def test_info_yaml_pinout_matches():
+    assert check_info_yaml() == {}
@@ -0,0 +1,45 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""rate_map tables against simulated spike trains, and the on-disk cache."""
+
+import numpy as np
+
+import rate_map
+from neuron_model import NeuronArray, NeuronParams
+from rate_map import RateMap, cache_key, compute_rate_map
+
+PARAMS = NeuronParams(weight_a=5, weight_b=3, leak_rate=1, threshold_min=25, leak_cycles=2)
+
+
+def test_rate_map_matches_simulation():
+    table = compute_rate_map(PARAMS)
+    chan_a, chan_b = np.meshgrid(np.arange(8), np.arange(8), indexing="ij")
+    neurons = NeuronArray(64, PARAMS)
+    spikes = neurons.run(np.broadcast_to(chan_a.ravel(), (2000, 64)), chan_b.ravel()).T.reshape(8, 8, -1)
+    for a in range(8):
+        for b in range(8):
+            entry, train = table[a, b], spikes[a, b]
+            times = np.flatnonzero(train)
+            assert entry["first_spike"] == (times[0] + 1 if len(times) else -1)
+            steady = train[entry["transient"]:entry["transient"] + entry["period"]]
+            assert steady.sum() == entry["spikes_per_period"]
+            assert entry["rate"] == entry["spikes_per_period"] / entry["period"]
+    assert table[4, 0]["rate"] > 0 and table[7, 0]["rate"] == 0    # 7 x 5 wraps negative
+    assert table[0, 7]["rate"] == 0 and table[0, 7]["isi"] == np.inf
+
+
+def test_cache_round_trip(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(rate_map, "compute_rate_map", lambda *args: calls.append(args) or compute_rate_map(*args))
+    first = RateMap(tmp_path).table(PARAMS)
+    assert len(list((tmp_path / "rate_map").glob("*.npy"))) == 1
+    again = RateMap(tmp_path)
+    assert np.array_equal(again.table(PARAMS), first)
+    assert again.lookup(PARAMS, 3, 1) == first[3, 1]
+    assert len(calls) == 1
+
+
+def test_cache_key_tracks_rtl_and_inputs():
+    assert cache_key(PARAMS, source_hash="a") != cache_key(PARAMS, source_hash="b")
+    assert cache_key(PARAMS, 1, "a") != cache_key(PARAMS, 0, "a")
+    assert cache_key(PARAMS, source_hash="a") == cache_key(tuple(PARAMS), source_hash="a")
@@ -0,0 +1,73 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""The generated RTL model against system_model.SystemModel.
+
+Uses a fresh Yosys export when ``yosys`` is on PATH, otherwise the export
+checked in under data/ (Yosys 0.69, ``prep -flatten``).
+"""
+
+import gzip
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from rtl_codegen import CompiledSystem, generate, load_model, model_key, run_yosys
+
+EXPORT = Path(__file__).parent / "data" / "alif_dual_unileak_system.json.gz"
+
+REGISTERS = {
+    "neuron.v_mem", "neuron.threshold", "neuron.refr_cnt", "neuron.leak_counter", "neuron.spike_out",
+    "loader.current_state", "loader.shift_reg", "loader.bit_count", "loader.weight_a", "loader.weight_b",
+    "loader.leak_rate", "loader.threshold_min", "loader.leak_cycles", "loader.params_ready",
+}
+
+
+@pytest.fixture(scope="module")
+def export(tmp_path_factory):
+    path = tmp_path_factory.mktemp("export") / "system.json"
+    if shutil.which("yosys"):
+        run_yosys(path)
+    else:
+        path.write_bytes(gzip.decompress(EXPORT.read_bytes()))
+    return path
+
+
+@pytest.fixture(scope="module")
+def model(export, tmp_path_factory):
+    return load_model(export, model_dir=tmp_path_factory.mktemp("rtl_model"))
+
+
+def test_register_names(model):
+    assert set(model.STATE) == REGISTERS
+
+
+def test_register_names_ignore_netname_order(export):
+    netlist = json.loads(export.read_text())
+    netnames = netlist["modules"]["alif_dual_unileak_system"]["netnames"]
+    netlist["modules"]["alif_dual_unileak_system"]["netnames"] = dict(reversed(netnames.items()))
+    assert generate(netlist) == generate(json.loads(export.read_text()))
+
+
+def test_matches_system_model(model):
+    from rtl_codegen import compare_with_model
+
+    log = []
+    assert compare_with_model(256, 400, np.random.default_rng(1), model, log=log.append), log
+
+
+def test_compiled_system_steps_every_instance(model):
+    system = CompiledSystem(3, model)
+    out = system.step(clk=0, reset=1, enable=1)
+    assert out["params_ready"].tolist() == [1, 1, 1]
+    assert system.state["loader.threshold_min"].tolist() == [30, 30, 30]
+
+
+def test_explicit_json_bypasses_rtl_cache(export, tmp_path):
+    stale = tmp_path / f"{model_key()}.py"
+    stale.write_text("raise AssertionError('the RTL-keyed model was imported')\n")
+    model = load_model(export, model_dir=tmp_path)
+    assert Path(model.__file__) != stale
+    assert stale.read_text().startswith("raise")
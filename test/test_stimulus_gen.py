@@ -0,0 +1,71 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""stimulus_gen: constrained segments and coverage closure on the model."""
+
+import numpy as np
+import pytest
+
+from func_coverage import GOALS, SHAPES, Coverage, label
+from loader_model import FRAME_CYCLES
+from pins import decode_inputs
+from system_model import SystemModel
+from stimulus_gen import constrain, generate, segment
+
+
+@pytest.fixture(scope="module")
+def directed():
+    return generate(rng=np.random.default_rng(0))
+
+
+def test_generate_reaches_every_goal_bin(directed):
+    assert directed.coverage.complete
+    assert len(directed.ui_in) <= 20000 + max(len(part.ui_in) for part in directed.segments)
+    # The kept segments replay to the same coverage from reset.
+    assert Coverage.from_stimulus(directed.ui_in, directed.uio_in).complete
+
+
+def test_generate_skips_what_is_already_hit(directed):
+    done = Coverage({name: GOALS[name] for name in SHAPES})
+    assert len(generate(done, np.random.default_rng(1)).segments) == 0
+    partial = Coverage({name: GOALS[name] for name in SHAPES if name != "loader_abort"})
+    rest = generate(partial, np.random.default_rng(1))
+    assert rest.coverage.complete
+    assert {part.target.split(" ")[0] for part in rest.segments} == {"abort"}
+    assert partial.hit == partial.goal - int(GOALS["loader_abort"].sum())
+
+
+@pytest.mark.parametrize("group, index", [("product_a", (5, 7)), ("weighted_sum", (63 - 22,)),
+                                          ("leak", (0, 0)), ("threshold_max", (6,))])
+def test_constraints(group, index):
+    rng = np.random.default_rng(2)
+    for _ in range(20):
+        params, inputs, abort = constrain(group, index, rng)
+        assert abort is None
+        if group == "product_a":
+            assert (params["weight_a"], inputs["chan_a"]) == (7, 5)
+        elif group == "weighted_sum":
+            sum_ = (inputs["chan_a"] * params["weight_a"] + 32) % 64 - 32
+            sum_ -= (inputs["chan_b"] * params["weight_b"] + 32) % 64 - 32
+            assert sum_ == -22
+        elif group == "leak":
+            assert params["leak_cycles"] == 0
+        else:
+            assert params["threshold_min"] >> 5 == 6 and params["leak_cycles"] == 15
+
+
+def test_abort_segment_cuts_the_frame():
+    part = segment("loader_abort", (2, 3), np.random.default_rng(3))
+    assert part.target == label("loader_abort", (2, 3))
+    pins = decode_inputs(part.ui_in, part.uio_in)
+    cut = 1 + 8 * 2 + 3
+    assert pins.load_mode[:cut].all() and not pins.load_mode[cut:].any()
+    assert Coverage.from_stimulus(part.ui_in, part.uio_in).bins["loader_abort"][2, 3]
+    full = segment("product_b", (1, 1), np.random.default_rng(3))
+    assert decode_inputs(full.ui_in, full.uio_in).load_mode[:FRAME_CYCLES].sum() == FRAME_CYCLES - 1
+
+
+def test_segments_record_the_loaded_params(directed):
+    model = SystemModel(1)
+    for part in directed.segments:
+        model.run(part.ui_in, part.uio_in)
+        assert part.params == tuple(int(field[0]) for field in model.loader.fields)
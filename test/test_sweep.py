@@ -0,0 +1,42 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""sweep.simulate_shard against single neurons run cycle by cycle."""
+
+import numpy as np
+import pytest
+
+from neuron_model import NeuronArray
+from sweep import COLUMNS, SHARD_COUNT, SWEEP_SHAPE, config_params, shard_slice, simulate_shard
+
+HORIZON = 300
+
+
+def test_shards_cover_the_sweep_once():
+    hits = np.zeros(SWEEP_SHAPE[:3], int)
+    for shard in range(SHARD_COUNT):
+        hits[shard_slice(shard)] += 1
+    assert SHARD_COUNT == 1024
+    assert (hits == 1).all()
+
+
+@pytest.mark.parametrize("shard", [0, 333, 1023])
+def test_shard_metrics(shard):
+    rng = np.random.default_rng(shard)
+    metrics = simulate_shard(shard, 3, 1, HORIZON)
+    index = shard_slice(shard)
+    for name, dtype in COLUMNS.items():
+        assert metrics[name].dtype == dtype
+        assert metrics[name].shape == np.zeros(SWEEP_SHAPE)[index].shape
+
+    for local in zip(*(rng.integers(0, size, 20) for size in metrics["spike_count"].shape)):
+        flat = np.ravel_multi_index((index[0], index[1], index[2].start + local[0], *local[1:]), SWEEP_SHAPE)
+        spikes = np.flatnonzero(NeuronArray(1, config_params(flat)).run(np.full(HORIZON, 3), 1)[:, 0])
+        isi = np.diff(spikes)
+        assert metrics["spike_count"][local] == len(spikes)
+        assert metrics["first_spike"][local] == (spikes[0] + 1 if len(spikes) else -1)
+        assert metrics["first_isi"][local] == (isi[0] if len(isi) else -1)
+        assert metrics["last_isi"][local] == (isi[-1] if len(isi) else -1)
+        if len(isi):
+            assert metrics["adaptation"][local] == np.float32(isi[-1] / isi[0])
+        else:
+            assert np.isnan(metrics["adaptation"][local])
@@ -0,0 +1,92 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""sweep_store.SweepIndex range queries on a small synthetic sweep directory."""
+
+import json
+
+import numpy as np
+import pytest
+
+from sweep import COLUMNS
+from sweep_store import SweepIndex, SweepStore
+
+SIZE = 1000
+
+
+@pytest.fixture
+def sweep_dir(tmp_path):
+    rng = np.random.default_rng(0)
+    spike_count = rng.integers(0, 30, SIZE)
+    first_isi = np.where(spike_count >= 2, rng.integers(1, 40, SIZE), -1)
+    last_isi = np.where(spike_count >= 2, rng.integers(1, 40, SIZE), -1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        adaptation = np.where(first_isi > 0, last_isi / first_isi, np.nan)
+    columns = {
+        "spike_count": spike_count,
+        "first_spike": np.where(spike_count > 0, rng.integers(1, 100, SIZE), -1),
+        "first_isi": first_isi,
+        "last_isi": last_isi,
+        "adaptation": adaptation,
+    }
+    path = tmp_path / "a3_b0"
+    path.mkdir()
+    for name, dtype in COLUMNS.items():
+        np.save(path / f"{name}.npy", columns[name].astype(dtype))
+    np.save(path / "done.npy", np.ones(4, np.uint8))
+    (path / "meta.json").write_text(json.dumps({"chan_a": 3, "chan_b": 0, "horizon": 100, "input_enable": 1}))
+    return path
+
+
+def brute_force(index, **ranges):
+    keep = np.ones(index.size, bool)
+    for name, (low, high) in ranges.items():
+        values = np.asarray(index.columns[name])
+        keep &= (values >= 0) if values.dtype.kind == "i" else ~np.isnan(values)
+        values = values.astype(np.float64) if values.dtype.kind == "f" else values
+        if low is not None:
+            keep &= values >= low
+        if high is not None:
+            keep &= values <= high
+    return np.flatnonzero(keep)
+
+
+@pytest.mark.parametrize("ranges", [
+    {"spike_count": (10, 20)},
+    {"spike_count": (None, 3)},
+    {"first_spike": (None, 50)},
+    {"first_spike": (None, None)},
+    {"adaptation": (1.0, None)},
+    {"adaptation": (None, 0.5)},
+    {"adaptation": (0.5, 2.0), "first_spike": (None, 20)},
+    {"first_isi": (None, 10)},
+    {"first_isi": (None, 10), "spike_count": (5, None)},
+    {"spike_count": (2.5, 7.5)},
+    {"first_spike": (-5, 3)},
+    {"spike_count": (None, 1e12)},
+    {"spike_count": (5, 2**40)},
+    {"spike_count": (2**40, None)},
+    {"first_isi": (-2**40, 10), "spike_count": (-1e12, None)},
+    {"adaptation": (-1e300, 1e300)},
+])
+def test_query_matches_brute_force(sweep_dir, ranges):
+    index = SweepIndex(sweep_dir)
+    assert np.array_equal(index.query(**ranges), brute_force(index, **ranges))
+
+
+def test_open_ranges_skip_sentinels(sweep_dir):
+    index = SweepIndex(sweep_dir)
+    assert not np.isnan(index.values(index.query(adaptation=(1.0, None)))["adaptation"]).any()
+    assert (index.values(index.query(first_spike=(None, 50)))["first_spike"] >= 0).all()
+
+
+def test_store_finds_sweep_by_stimulus(sweep_dir):
+    store = SweepStore(sweep_dir.parent)
+    assert store.sweep(chan_a=3, chan_b=0).path == sweep_dir
+    with pytest.raises(LookupError):
+        store.sweep(chan_a=1, chan_b=0)
+
+
+def test_unfinished_sweep_is_rejected(sweep_dir):
+    np.save(sweep_dir / "done.npy", np.array([1, 0, 1, 1], np.uint8))
+    with pytest.raises(ValueError, match="not finished"):
+        SweepIndex(sweep_dir)
@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""trace_file writer/reader round trips."""
+
+import numpy as np
+import pytest
+
+from neuron_model import NeuronParams
+from trace_file import RAW, ZLIB, TraceError, TraceReader, TraceWriter
+
+PARAMS = NeuronParams(weight_a=5, weight_b=3, leak_rate=17, threshold_min=200, leak_cycles=9)
+
+
+def random_pins(rng, cycles):
+    return rng.integers(0, 256, (4, cycles)).astype(np.uint8)
+
+
+@pytest.mark.parametrize("codec", [RAW, ZLIB])
+def test_round_trip(tmp_path, codec):
+    pins = random_pins(np.random.default_rng(0), 1000)
+    path = tmp_path / "run.trace"
+    with TraceWriter(path, PARAMS, rtl_hash="abc123", chunk_cycles=256, codec=codec) as writer:
+        for lo in range(0, 1000, 300):
+            writer.append(*pins[:, lo:lo + 300])
+    with TraceReader(path) as reader:
+        assert len(reader) == 1000 and reader.chunks == 4
+        assert reader.header.rtl_hash == "abc123"
+        assert reader.header.params == PARAMS
+        assert np.array_equal(np.stack(reader.read()), pins)
+        assert np.array_equal(np.stack(reader[250:700]), pins[:, 250:700])
+        assert np.array_equal(np.stack(reader[999:]), pins[:, 999:])
+        assert len(reader[600:600].ui_in) == 0
+
+
+def test_scalars_broadcast(tmp_path):
+    path = tmp_path / "run.trace"
+    with TraceWriter(path) as writer:
+        writer.append(np.arange(5), 1, 2, 3)
+    with TraceReader(path) as reader:
+        assert reader.read().ui_in.tolist() == [0, 1, 2, 3, 4]
+        assert reader.read().uio_out.tolist() == [3] * 5
+
+
+def test_flush_and_refresh(tmp_path):
+    pins = random_pins(np.random.default_rng(1), 100)
+    path = tmp_path / "run.trace"
+    writer = TraceWriter(path, chunk_cycles=64)
+    writer.append(*pins[:, :70])
+    reader = TraceReader(path)
+    assert len(reader) == 64
+    writer.flush()
+    reader.refresh()
+    assert len(reader) == 70
+    writer.append(*pins[:, 70:])
+    writer.close()
+    reader.refresh()
+    assert np.array_equal(np.stack(reader.read()), pins)
+    reader.close()
+
+
+def test_append_drops_a_torn_chunk(tmp_path):
+    pins = random_pins(np.random.default_rng(2), 300)
+    path = tmp_path / "run.trace"
+    with TraceWriter(path, PARAMS, chunk_cycles=100) as writer:
+        writer.append(*pins[:, :200])
+    with open(path, "ab") as f:
+        f.write(b"\x64\0\0\0\xff\0\0\0torn")
+    with TraceWriter(path, PARAMS, chunk_cycles=100, append=True) as writer:
+        assert writer.cycles == 200
+        writer.append(*pins[:, 200:])
+    with TraceReader(path) as reader:
+        assert np.array_equal(np.stack(reader.read()), pins)
+
+
+def test_append_with_another_header_replaces(tmp_path):
+    path = tmp_path / "run.trace"
+    with TraceWriter(path, PARAMS) as writer:
+        writer.append(1, 2, 3, 4)
+    with TraceWriter(path, PARAMS._replace(leak_cycles=1), append=True) as writer:
+        assert writer.cycles == 0
+    with TraceReader(path) as reader:
+        assert len(reader) == 0
+
+
+def test_corruption_is_detected(tmp_path):
+    path = tmp_path / "run.trace"
+    with TraceWriter(path, codec=RAW) as writer:
+        writer.append(*random_pins(np.random.default_rng(3), 10))
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with TraceReader(path) as reader, pytest.raises(TraceError, match="checksum"):
+        reader.read()
+    path.write_bytes(b"not a trace" * 10)
+    with pytest.raises(TraceError, match="not a trace"):
+        TraceReader(path)
@@ -0,0 +1,101 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""trace_reader on a small hand-written VCD dump."""
+
+import numpy as np
+import pytest
+
+from trace_reader import per_cycle, read_trace, rising_edges
+
+VCD = b"""$date today $end
+$timescale 1ns $end
+$scope module tb $end
+$var wire 1 ! clk $end
+$scope module dut $end
+$var wire 1 ! clk_alias $end
+$var reg 9 "# v_mem [8:0] $end
+$var reg 1 a spike_out $end
+$var reg 4 #" count [3:0] $end
+$upscope $end
+$upscope $end
+$enddefinitions $end
+#0
+$dumpvars
+0!
+bx "#
+xa
+b0 #"
+$end
+#5
+1!
+b101 "#
+0a
+#10
+0!
+b1 #"
+#15
+1!
+b111111111 "#
+1a
+b10 #"
+#20
+0!
+#25
+1!
+bz1 "#
+0a
+b10 #"
+b11 #"
+"""
+
+SIGNALS = {"clk": "tb.clk", "alias": "tb.dut.clk_alias", "v_mem": "tb.dut.v_mem",
+           "spike_out": "tb.dut.spike_out", "count": "tb.dut.count"}
+
+
+@pytest.fixture(params=[1 << 16, 7], ids=["one block", "tiny blocks"])
+def traces(request, tmp_path):
+    path = tmp_path / "dump.vcd"
+    path.write_bytes(VCD)
+    timescale, traces = read_trace(path, SIGNALS, block_bytes=request.param)
+    assert timescale == "1ns"
+    return traces
+
+
+def test_value_changes(traces):
+    v_mem = traces["v_mem"]
+    assert v_mem.times.tolist() == [0, 5, 15, 25]
+    assert v_mem.values.tolist() == [0, 5, 511, 1]
+    assert v_mem.xz.tolist() == [511, 0, 0, 510]
+    assert v_mem.signed().tolist() == [0, 5, -1, 1]
+    assert traces["spike_out"].values.tolist() == [0, 0, 1, 0]
+    assert traces["spike_out"].xz.tolist() == [1, 0, 0, 0]
+    assert traces["count"].times.tolist() == [0, 10, 15, 25, 25]
+    assert np.array_equal(traces["alias"].values, traces["clk"].values)
+
+
+def test_sample_resolves_last_change(traces):
+    values, xz = traces["count"].sample(np.array([-1, 0, 12, 25, 99]))
+    assert values.tolist() == [0, 0, 1, 3, 3]
+    assert xz.tolist() == [15, 0, 0, 0, 0]
+
+
+def test_per_cycle(traces):
+    assert rising_edges(traces["clk"]).tolist() == [5, 15, 25]
+    rows = per_cycle({name: traces[name] for name in ("clk", "v_mem", "spike_out")})
+    assert rows["v_mem"][0].tolist() == [0, 5, 511]
+    assert rows["v_mem"][1].tolist() == [511, 0, 0]
+    assert rows["spike_out"][0].tolist() == [0, 0, 1]
+
+
+def test_crlf_line_endings(tmp_path):
+    path = tmp_path / "dump.vcd"
+    path.write_bytes(VCD.replace(b"\n", b"\r\n"))
+    _, traces = read_trace(path, SIGNALS)
+    assert traces["v_mem"].values.tolist() == [0, 5, 511, 1]
+
+
+def test_missing_signal(tmp_path):
+    path = tmp_path / "dump.vcd"
+    path.write_bytes(VCD)
+    with pytest.raises(KeyError, match="tb.dut.nope"):
+        read_trace(path, {"x": "tb.dut.nope"})
@@ -0,0 +1,294 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compact binary traces of per-cycle pins, written while simulating.
+
+A trace stores ``ui_in``, ``uio_in``, ``uo_out`` and ``uio_out`` as uint8
+columns, one row per cycle, in independently compressed chunks.  That is
+4 bytes per cycle before compression, against well over 100 for the same
+signals in a VCD.  Layout (little endian)::
+
+    offset  size  field
+    0       8     magic b"LIFTRACE"
+    8       2     format version (1)
+    10      1     codec: 0 raw, 1 zlib
+    11      1     reserved (0)
+    12      4     cycles per full chunk
+    16      64    RTL hash (sources.rtl_hash, ASCII hex)
+    80      2     config bitstream length in bits
+    82      2     reserved (0)
+    84      4     config bitstream length in bytes (n)
+    88      n     config bitstream: the loader serial bits, MSB first, packed
+    88+n    ...   chunks
+
+    chunk:  4 cycles (c), 4 stored payload bytes (s), 4 CRC-32 of the raw
+            payload, 4 reserved, then s bytes holding the 4 x c raw
+            payload (ui_in, uio_in, uo_out, uio_out; column after column)
+
+Chunks are only ever appended, so :class:`TraceWriter` can add cycles
+while the simulation runs (and reopen a trace to continue it), and a
+reader ignores a final chunk that is still incomplete.  :class:`TraceReader`
+memory-maps the file and decompresses only the chunks a slice touches;
+raw-codec chunks are returned as views into the mapping.  X/Z output bits
+are not represented and read back as 0.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import zlib
+from typing import NamedTuple
+
+import numpy as np
+
+from loader_model import FIELD_BITS, FIELD_CYCLES, frame_bits
+from neuron_model import NeuronParams
+
+MAGIC = b"LIFTRACE"
+VERSION = 1
+RAW, ZLIB = 0, 1
+CHUNK_CYCLES = 1 << 16
+
+_HEADER = struct.Struct("<8sHBBI64sHHI")
+_CHUNK = struct.Struct("<IIII")
+
+COLUMNS = ("ui_in", "uio_in", "uo_out", "uio_out")
+
+
+class TraceError(ValueError):
+    """The file is not a trace, or a chunk fails its checksum."""
+
+
+class Pins(NamedTuple):
+    ui_in: np.ndarray
+    uio_in: np.ndarray
+    uo_out: np.ndarray
+    uio_out: np.ndarray
+
+
+class TraceHeader(NamedTuple):
+    version: int
+    codec: int
+    chunk_cycles: int
+    rtl_hash: str
+    config_bits: np.ndarray     # serial loader bits, one per element
+
+    @property
+    def params(self):
+        """The :class:`neuron_model.NeuronParams` a full config bitstream loads."""
+        fields = self.config_bits.reshape(-1, FIELD_CYCLES) @ (1 << np.arange(FIELD_CYCLES - 1, -1, -1))
+        return NeuronParams(*(int(v) & ((1 << bits) - 1) for v, bits in zip(fields, FIELD_BITS)))
+
+    def pack(self):
+        config = np.packbits(self.config_bits.astype(np.uint8)).tobytes()
+        return _HEADER.pack(MAGIC, self.version, self.codec, 0, self.chunk_cycles, self.rtl_hash.encode(),
+                            len(self.config_bits), 0, len(config)) + config
+
+    @classmethod
+    def unpack(cls, data):
+        """Parse a header from the start of *data*; returns ``(header, size in bytes)``."""
+        if len(data) < _HEADER.size:
+            raise TraceError("file is too short for a trace header")
+        magic, version, codec, _, chunk_cycles, rtl_hash, bits, _, size = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise TraceError("not a trace file")
+        if version != VERSION:
+            raise TraceError(f"trace format version {version} is not supported")
+        config = np.unpackbits(np.frombuffer(data, np.uint8, size, _HEADER.size))[:bits]
+        return cls(version, codec, chunk_cycles, rtl_hash.rstrip(b"\0").decode(), config), _HEADER.size + size
+
+
+def config_bits(params):
+    """Serial loader bits for one parameter set, as stored in the header."""
+    return frame_bits(params)[0]
+
+
+class TraceWriter:
+    """Append cycles to a trace, compressing every *chunk_cycles* rows.
+
+    With *append*, an existing trace with the same header is continued
+    (dropping a torn final chunk); otherwise the file is replaced.  Call
+    :meth:`flush` to make buffered cycles visible to readers (as a short
+    chunk) and :meth:`close` when done.
+    """
+
+    def __init__(self, path, params=None, rtl_hash="", chunk_cycles=CHUNK_CYCLES, codec=ZLIB, level=6,
+                 append=False):
+        bits = config_bits(params) if params is not None else np.zeros(0, np.uint8)
+        self.header = TraceHeader(VERSION, codec, chunk_cycles, rtl_hash, bits)
+        self.level = level
+        self._pending = []
+        self._buffered = 0
+        self.cycles = 0
+
+        existing = None
+        if append and os.path.exists(path) and os.path.getsize(path):
+            try:
+                existing = TraceReader(path)
+            except TraceError:
+                existing = None
+        if existing is not None and existing.header.pack() == self.header.pack():
+            self.cycles = len(existing)
+            end = existing.end
+            existing.close()
+            self.file = open(path, "r+b")
+            self.file.truncate(end)
+            self.file.seek(end)
+        else:
+            if existing is not None:
+                existing.close()
+            self.file = open(path, "wb")
+            self.file.write(self.header.pack())
+            self.file.flush()
+
+    def append(self, ui_in, uio_in, uo_out, uio_out):
+        """Queue rows (scalars broadcast against the longest column)."""
+        columns = np.broadcast_arrays(*(np.atleast_1d(np.asarray(c, np.uint8)) for c in
+                                        (ui_in, uio_in, uo_out, uio_out)))
+        self._pending.append(np.stack(columns))
+        self._buffered += columns[0].shape[0]
+        while self._buffered >= self.header.chunk_cycles:
+            self._write_chunk(self.header.chunk_cycles)
+
+    def _write_chunk(self, cycles):
+        block = np.concatenate(self._pending, axis=1) if len(self._pending) > 1 else self._pending[0]
+        chunk, rest = block[:, :cycles], block[:, cycles:]
+        self._pending = [rest] if rest.shape[1] else []
+        self._buffered -= cycles
+        raw = np.ascontiguousarray(chunk).tobytes()
+        payload = zlib.compress(raw, self.level) if self.header.codec == ZLIB else raw
+        self.file.write(_CHUNK.pack(cycles, len(payload), zlib.crc32(raw), 0) + payload)
+        # Complete chunks are visible to readers without waiting for flush().
+        self.file.flush()
+        self.cycles += cycles
+
+    def flush(self):
+        if self._buffered:
+            self._write_chunk(self._buffered)
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    """Random access to the cycles of a trace through a memory map.
+
+    ``len(reader)`` is the number of cycles in complete chunks, and
+    ``reader[start:stop]`` returns :class:`Pins` columns.  :meth:`refresh`
+    picks up chunks appended since the file was opened.
+    """
+
+    def __init__(self, path, verify=True):
+        self.path = path
+        self.verify = verify
+        self._file = open(path, "rb")
+        self._map = None
+        self._cache = (None, None)
+        self.refresh()
+
+    def refresh(self):
+        self._release()
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ) if size else b""
+        self.header, offset = TraceHeader.unpack(self._map)
+        offsets, cycles, stored, crcs = [], [], [], []
+        while offset + _CHUNK.size <= size:
+            count, length, crc, _ = _CHUNK.unpack_from(self._map, offset)
+            if offset + _CHUNK.size + length > size:
+                break
+            offsets.append(offset + _CHUNK.size)
+            cycles.append(count)
+            stored.append(length)
+            crcs.append(crc)
+            offset += _CHUNK.size + length
+        self.end = offset
+        self._offsets, self._stored, self._crcs = offsets, stored, crcs
+        self._starts = np.concatenate(([0], np.cumsum(cycles, dtype=np.int64)))
+        self._cache = (None, None)
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    @property
+    def chunks(self):
+        return len(self._offsets)
+
+    def chunk(self, index):
+        """The ``(4, cycles)`` uint8 block of chunk *index*."""
+        if self._cache[0] == index:
+            return self._cache[1]
+        offset, length = self._offsets[index], self._stored[index]
+        cycles = int(self._starts[index + 1] - self._starts[index])
+        payload = memoryview(self._map)[offset:offset + length]
+        raw = zlib.decompress(payload) if self.header.codec == ZLIB else payload
+        if self.verify and zlib.crc32(raw) != self._crcs[index]:
+            raise TraceError(f"{self.path}: chunk {index} fails its checksum")
+        block = np.frombuffer(raw, np.uint8).reshape(len(COLUMNS), cycles)
+        self._cache = (index, block)
+        return block
+
+    def read(self, start=0, stop=None):
+        """:class:`Pins` for cycles ``start:stop``."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return Pins(*np.zeros((len(COLUMNS), 0), np.uint8))
+        first = int(np.searchsorted(self._starts, start, side="right")) - 1
+        last = int(np.searchsorted(self._starts, stop, side="left"))
+        parts = [self.chunk(i)[:, max(start - self._starts[i], 0):stop - self._starts[i]]
+                 for i in range(first, last)]
+        block = parts[0] if len(parts) == 1 else np.concatenate(parts, axis=1)
+        return Pins(*block)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise TypeError("traces are indexed with contiguous slices")
+        start, stop, _ = index.indices(len(self))
+        return self.read(start, stop)
+
+    def _release(self):
+        self._cache = (None, None)
+        if isinstance(self._map, mmap.mmap):
+            try:
+                self._map.close()
+            except BufferError:
+                # Raw-codec arrays still view the old mapping; it is freed with them.
+                pass
+
+    def close(self):
+        self._release()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("trace")
+    parser.add_argument("--npz", help="also write the columns to this .npz file")
+    args = parser.parse_args()
+
+    with TraceReader(args.trace) as reader:
+        header = reader.header
+        size = os.path.getsize(args.trace)
+        print(f"{len(reader)} cycles in {reader.chunks} chunks, {size} bytes "
+              f"({size / max(len(reader), 1):.2f} bytes/cycle), codec {'zlib' if header.codec else 'raw'}")
+        print(f"RTL hash {header.rtl_hash or '(none)'}")
+        if len(header.config_bits) == FIELD_CYCLES * len(FIELD_BITS):
+            print(f"config {tuple(header.params)}")
+        if args.npz:
+            np.savez(args.npz, **reader.read()._asdict())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Stream neuron signals out of VCD/FST dumps into NumPy arrays.
+
+:func:`read_trace` reads a dump in fixed-size blocks and extracts only the
+requested signals; memory use is bounded by the block size plus the value
+changes that are kept.  Each block is scanned with array operations
+(newline positions, per-line first characters, right-aligned digit and bit
+gathers), so no Python code runs per line of the file.
+
+Results are run-length encoded: every :class:`SignalTrace` holds the times
+at which a signal changed and the values it took, and
+:meth:`SignalTrace.sample` turns that into dense per-cycle arrays.  FST
+files are converted on the fly by piping them through ``fst2vcd`` from
+GTKWave.
+"""
+
+import re
+import shutil
+import subprocess
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+NEURON_SCOPE = "tb.user_project.system_inst.neuron"
+
+NEURON_SIGNALS = {
+    "spike_out": f"{NEURON_SCOPE}.spike_out",
+    "v_mem_out": f"{NEURON_SCOPE}.v_mem_out",
+    "v_mem": f"{NEURON_SCOPE}.v_mem",
+    "threshold": f"{NEURON_SCOPE}.threshold",
+    "refr_cnt": f"{NEURON_SCOPE}.refr_cnt",
+    "leak_counter": f"{NEURON_SCOPE}.leak_counter",
+}
+
+CLOCK = "tb.clk"
+
+BLOCK_BYTES = 1 << 24
+
+_END_OF_HEADER = re.compile(rb"\$enddefinitions\s+\$end")
+
+_VALUE_CHARS = np.zeros(256, bool)
+_VALUE_CHARS[list(b"01xXzZ")] = True
+_UNKNOWN_CHARS = np.zeros(256, bool)
+_UNKNOWN_CHARS[list(b"xXzZ")] = True
+
+
+class VcdVar(NamedTuple):
+    path: str
+    code: bytes
+    width: int
+
+
+class SignalTrace(NamedTuple):
+    """Value changes of one signal; ``xz`` has a bit set where that bit was x/z."""
+
+    width: int
+    times: np.ndarray
+    values: np.ndarray
+    xz: np.ndarray
+
+    def sample(self, times):
+        """Values (and x/z masks) in effect at each of *times*.
+
+        Several changes at the same time resolve to the last one.  Times
+        before the first change read as all-x.
+        """
+        index = np.searchsorted(self.times, times, side="right") - 1
+        values = np.zeros(len(index), np.uint64)
+        xz = np.full(len(index), (1 << self.width) - 1, np.uint64)
+        known = index >= 0
+        values[known] = self.values[index[known]]
+        xz[known] = self.xz[index[known]]
+        return values, xz
+
+    def signed(self, values=None):
+        """Two's complement reading of *values* (the change values by default)."""
+        values = np.asarray(self.values if values is None else values, np.int64)
+        return np.where(values >> (self.width - 1) & 1, values - (1 << self.width), values)
+
+
+def parse_header(stream):
+    """Read declarations up to ``$enddefinitions``.
+
+    Returns ``(variables by path, timescale text, bytes read past the header)``.
+    """
+    data = b""
+    match = None
+    while match is None:
+        block = stream.read(1 << 16)
+        if not block:
+            raise ValueError("VCD header is incomplete")
+        data += block
+        match = _END_OF_HEADER.search(data)
+    head_end = match.end()
+    tokens = data[:head_end].split()
+
+    variables = {}
+    scope = []
+    timescale = ""
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        end = tokens.index(b"$end", i + 1) if token.startswith(b"$") and token != b"$end" else i
+        body = tokens[i + 1:end]
+        if token == b"$scope":
+            scope.append(body[1].decode())
+        elif token == b"$upscope":
+            scope.pop()
+        elif token == b"$timescale":
+            timescale = b"".join(body).decode()
+        elif token == b"$var":
+            width, code, name = int(body[1]), body[2], body[3].decode()
+            variables[".".join(scope + [name])] = VcdVar(".".join(scope + [name]), code, width)
+        i = end + 1
+    return variables, timescale, data[head_end:]
+
+
+def _parse_uint(buf, starts, ends):
+    """Decimal numbers in ``buf[starts:ends]`` per row, right-aligned."""
+    values = np.zeros(len(starts), np.int64)
+    if not len(starts):
+        return values
+    digits = int((ends - starts).max())
+    for column in range(digits):
+        index = ends - digits + column
+        valid = index >= starts
+        values = np.where(valid, values * 10 + (buf[np.where(valid, index, 0)].astype(np.int64) - 48), values)
+    return values
+
+
+def _parse_bits(buf, starts, ends, width):
+    """Binary values in ``buf[starts:ends]`` as ``(values, xz)``, VCD-extended to *width*."""
+    values = np.zeros(len(starts), np.uint64)
+    xz = np.zeros(len(starts), np.uint64)
+    leading = buf[starts]
+    fill = np.where(_UNKNOWN_CHARS[leading], leading, ord("0"))
+    for column in range(width):
+        index = ends - width + column
+        chars = np.where(index >= starts, buf[np.maximum(index, 0)], fill)
+        values = (values << np.uint64(1)) | (chars == ord("1"))
+        xz = (xz << np.uint64(1)) | _UNKNOWN_CHARS[chars]
+    return values, xz
+
+
+def _matches(buf, positions, code):
+    """Rows where ``buf[positions:positions + len(code)] == code``."""
+    match = np.ones(len(positions), bool)
+    for offset, char in enumerate(code):
+        match &= buf[positions + offset] == char
+    return match
+
+
+class _Scanner:
+    """Extracts value changes for a set of VCD identifier codes block by block."""
+
+    def __init__(self, variables):
+        self.variables = variables
+        self.time = 0
+        self.parts = {var.code: [] for var in variables}
+
+    def scan(self, block):
+        buf = np.frombuffer(block, np.uint8)
+        ends = np.flatnonzero(buf == ord("\n"))
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        keep = ends > starts
+        starts, ends = starts[keep], ends[keep]
+        # Drop the \r of CRLF files
+        ends = ends - (buf[ends - 1] == ord("\r"))
+        first = buf[starts]
+        lengths = ends - starts
+
+        time_rows = np.flatnonzero(first == ord("#"))
+        times = _parse_uint(buf, starts[time_rows] + 1, ends[time_rows])
+        vector = first == ord("b")
+        scalar = _VALUE_CHARS[first]
+
+        for var in self.variables:
+            size = len(var.code)
+            code_at = np.maximum(ends - size, 0)
+            rows = np.flatnonzero(vector & (lengths >= size + 3) & (buf[np.maximum(code_at - 1, 0)] == ord(" ")))
+            rows = rows[_matches(buf, code_at[rows], var.code)]
+            values, xz = _parse_bits(buf, starts[rows] + 1, code_at[rows] - 1, var.width)
+
+            bits = np.flatnonzero(scalar & (lengths == size + 1))
+            bits = bits[_matches(buf, starts[bits] + 1, var.code)]
+            if len(bits):
+                chars = buf[starts[bits]]
+                rows = np.concatenate((rows, bits))
+                values = np.concatenate((values, (chars == ord("1")).astype(np.uint64)))
+                xz = np.concatenate((xz, _UNKNOWN_CHARS[chars].astype(np.uint64)))
+                order = np.argsort(rows, kind="stable")
+                rows, values, xz = rows[order], values[order], xz[order]
+            if not len(rows):
+                continue
+
+            slot = np.searchsorted(time_rows, rows) - 1
+            change_times = np.where(slot >= 0, times[np.maximum(slot, 0)] if len(times) else 0, self.time)
+            self.parts[var.code].append((change_times.astype(np.int64), values, xz))
+
+        if len(times):
+            self.time = int(times[-1])
+
+    def result(self, var):
+        parts = self.parts[var.code]
+        if not parts:
+            empty = np.zeros(0, np.uint64)
+            return SignalTrace(var.width, np.zeros(0, np.int64), empty, empty)
+        return SignalTrace(var.width, *(np.concatenate(column) for column in zip(*parts)))
+
+
+def _open(path):
+    """A binary stream of VCD text for *path*, converting FST through fst2vcd."""
+    if Path(path).suffix != ".fst":
+        return open(path, "rb"), None
+    tool = shutil.which("fst2vcd")
+    if tool is None:
+        raise FileNotFoundError("reading FST needs fst2vcd (part of GTKWave) on PATH")
+    process = subprocess.Popen([tool, str(path)], stdout=subprocess.PIPE)
+    return process.stdout, process
+
+
+def read_trace(path, signals=None, block_bytes=BLOCK_BYTES):
+    """Extract *signals* from a VCD or FST file.
+
+    *signals* maps result names to hierarchical paths (by default the neuron
+    signals in ``NEURON_SIGNALS`` plus the clock as ``clk``).  Returns ``(timescale, {name: SignalTrace})``.
+    """
+    signals = {**NEURON_SIGNALS, "clk": CLOCK} if signals is None else signals
+    stream, process = _open(path)
+    try:
+        variables, timescale, rest = parse_header(stream)
+        missing = [p for p in signals.values() if p not in variables]
+        if missing:
+            raise KeyError(f"signals not in {path}: {', '.join(missing)}")
+        # Aliased nets share one identifier code; scan each code once.
+        scanner = _Scanner({variables[p].code: variables[p] for p in signals.values()}.values())
+
+        while True:
+            block = stream.read(block_bytes)
+            data = rest + block
+            cut = data.rfind(b"\n") + 1 if block else len(data)
+            if data[:cut]:
+                scanner.scan(data[:cut] if data[:cut].endswith(b"\n") else data[:cut] + b"\n")
+            rest = data[cut:]
+            if not block:
+                break
+    finally:
+        stream.close()
+        if process is not None:
+            process.wait()
+    return timescale, {name: scanner.result(variables[p]) for name, p in signals.items()}
+
+
+def rising_edges(clock):
+    """Times at which a :class:`SignalTrace` of a clock goes from 0 to 1."""
+    high = (clock.values == 1) & (clock.xz == 0)
+    low = (clock.values == 0) & (clock.xz == 0)
+    return clock.times[1:][high[1:] & low[:-1]]
+
+
+def per_cycle(traces, clock="clk"):
+    """Dense ``{name: (values, xz)}`` sampled just before each rising edge of ``traces[clock]``.
+
+    Row *i* holds the register values left by rising edge *i* - 1, which is
+    what the design samples at edge *i*.
+    """
+    edges = rising_edges(traces[clock]) - 1
+    return {name: trace.sample(edges) for name, trace in traces.items() if name != clock}
@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Record waveforms only in the cycle windows being debugged.
+
+tb.v opens a dump only when run with ``+DUMP_FILE=<path>`` (``make
+DUMP=tb.fst``, which also selects FST output) and records only while
+``dump_en`` is high.  Tests open windows with :func:`dump_on` /
+:func:`dump_off`, or hand a list of ``(start, stop)`` cycle windows to
+:func:`schedule_windows`.  ``+DUMP_WINDOWS=<start>:<stop>,...`` (``make
+DUMP_WINDOWS=...``) supplies windows from the command line, which is how a
+scoreboard mismatch is re-run with the cycles leading up to it traced.
+"""
+
+import cocotb
+
+from tb_clock import wait_cycles
+
+
+def dump_requested():
+    """True when the simulator was started with a dump file."""
+    return "DUMP_FILE" in cocotb.plusargs
+
+
+def dump_on(dut):
+    dut.dump_en.value = 1
+
+
+def dump_off(dut):
+    dut.dump_en.value = 0
+
+
+def around(cycle, before=1000, after=100):
+    """The window from *before* cycles ahead of *cycle* to *after* cycles past it."""
+    return max(0, cycle - before), cycle + after
+
+
+def merge_windows(windows):
+    """Sort ``(start, stop)`` windows and merge overlapping ones."""
+    merged = []
+    for start, stop in sorted(windows):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(stop, merged[-1][1]))
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+def plusarg_windows():
+    """Windows from ``+DUMP_WINDOWS=<start>:<stop>,...``, or an empty list."""
+    text = cocotb.plusargs.get("DUMP_WINDOWS", "")
+    return [tuple(int(edge) for edge in window.split(":")) for window in text.split(",") if window]
+
+
+async def _run_windows(dut, windows):
+    now = 0
+    for start, stop in windows:
+        await wait_cycles(dut, start - now)
+        dump_on(dut)
+        await wait_cycles(dut, stop - start)
+        dump_off(dut)
+        now = stop
+
+
+def schedule_windows(dut, windows):
+    """Record each ``(start, stop)`` window, in rising edges counted from now.
+
+    Cycle *c* covers the time between rising edges *c* and *c* + 1, so a
+    window starting at 0 opens immediately.  Requires the clock to have been
+    started with :func:`tb_clock.start_clock`.  Returns the background task,
+    or None when no dump file was requested.
+    """
+    windows = merge_windows(windows)
+    if not windows or not dump_requested():
+        return None
+    return cocotb.start_soon(_run_windows(dut, windows))